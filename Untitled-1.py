@@ -1,5 +1,7 @@
 import random
 
+from catalogue import Catalogue
+
 # 여행지 데이터 (예시)
 travel_data = [
     {"name": "제주도", "region": "한국", "season": "여름", "theme": "힐링", "description": "바다와 자연을 즐길 수 있는 섬"},
@@ -14,33 +16,18 @@ travel_data = [
     {"name": "하와이", "region": "미국", "season": "겨울", "theme": "힐링", "description": "따뜻한 날씨와 해변 휴양지"}
 ]
 
+# 계절/테마/지역 색인 (catalogue.py)
+catalogue = Catalogue(travel_data)
+
 def get_user_input():
     season = input("어느 계절에 여행가고 싶나요? (봄/여름/가을/겨울): ").strip()
     theme = input("여행 목적을 고르세요 (힐링/액티비티/문화/쇼핑): ").strip()
     user_type = input("사용자 유형을 선택하세요 (힐링형/액티비티형/문화형): ").strip()
     return season, theme, user_type
 
-def recommend_travel(data, season, theme, user_type):
-    results = []
-
-    for t in data:
-        score = 0
-        if t["season"] == season:
-            score += 2
-        elif t["season"] == "사계절":
-            score += 1
-
-        if t["theme"] == theme:
-            score += 3
-
-        if user_type.lower() in t["theme"].lower():
-            score += 2
-
-        if score > 0:
-            results.append((score, t))
-
-    results.sort(reverse=True, key=lambda x: x[0])
-    top_results = [r[1] for r in results[:3]]
+def recommend_travel(catalogue, season, theme, user_type):
+    # 계절 일치 +2 (사계절 +1), 테마 일치 +3, 사용자 유형이 테마에 포함 +2
+    top_results = catalogue.recommend(season=season, theme=theme, user_type=user_type, k=3)
     random.shuffle(top_results)
     return top_results
 
@@ -54,5 +41,5 @@ def print_results(results, season, theme):
 
 if __name__ == "__main__":
     season, theme, user_type = get_user_input()
-    recs = recommend_travel(travel_data, season, theme, user_type)
+    recs = recommend_travel(catalogue, season, theme, user_type)
     print_results(recs, season, theme)
\ No newline at end of file
@@ -1,14 +1,93 @@
 import os
-import requests
 import google.generativeai as genai
-from flask import Flask, request, jsonify, render_template
+from google.api_core import exceptions as google_exceptions
+from flask import Flask, Response, g, request, jsonify, render_template, stream_with_context
+from flask_cors import CORS
+import datetime
 import json
-import re
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from amadeus import Client as AmadeusClient, ResponseError
 from dotenv import load_dotenv
+from batcher import MicroBatcher
+from cache import StaleWhileRevalidateCache, TTLCache, cache_key
+from semantic_cache import SemanticCache, scope_key, set_key
+import http_client
+from geocoder import geocoder
+from city_store import CITY_STORE_PATH, CityInfoStore
+from countries import country_cities
+from destinations import LEARNED_DESTINATIONS_PATH, DestinationCatalogue
+from regions import LAST_MODIFIED as REGIONS_LAST_MODIFIED, encoded_subtree
+from geo_index import city_index, parse_point
+from hotels import HotelList
+from iata import IataResolver
+from llm_json import JsonArrayStream, parse_array, parse_object
+from polyline import MAX_ZOOM, simplify_encoded
+import metrics
+import resilience
+from resilience import ConcurrencyLimiter, UpstreamUnavailable
 
 app = Flask(__name__)
 
+# ==============================
+# 🔹 요청 처리 시간 기록 (/metrics)
+# 라벨은 URL 규칙(/api/regions/<continent>)이라서 경로 값마다 늘어나지 않습니다.
+# ==============================
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_duration(response):
+    started = g.get("request_started")
+    if started is not None:
+        metrics.REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            route=request.url_rule.rule if request.url_rule else "<unmatched>",
+            method=request.method,
+            status=response.status_code,
+        )
+    return response
+
+# ==============================
+# 🔹 부하 차단 / 업스트림 거절 처리
+# 동시에 처리 중인 요청이 MAX_CONCURRENT_REQUESTS를 넘으면 기다리지 않고 503으로 돌려보냅니다.
+# 핸들러가 fallback 없이 resilience.UpstreamUnavailable을 만나면
+# 속도 제한은 429, 서킷 열림은 503 (+ Retry-After)로 바로 응답합니다.
+# ==============================
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "64"))
+SHED_EXEMPT_PATHS = {"/api/cache_stats", "/api/upstream_stats", "/metrics"}
+
+request_limiter = ConcurrencyLimiter(MAX_CONCURRENT_REQUESTS)
+
+@app.before_request
+def shed_load():
+    if request.path in SHED_EXEMPT_PATHS:
+        return None
+    if not request_limiter.try_enter():
+        response = jsonify({"error": "요청이 많아 잠시 후 다시 시도해주세요."})
+        response.status_code = 503
+        response.headers["Retry-After"] = "1"
+        return response
+    g.admitted = True
+    return None
+
+@app.teardown_request
+def release_request_slot(error=None):
+    if g.pop("admitted", False):
+        request_limiter.exit()
+
+@app.errorhandler(UpstreamUnavailable)
+def upstream_unavailable(e):
+    response = jsonify({"error": str(e)})
+    response.status_code = 429 if e.reason == "rate_limited" else 503
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response
+
 @app.route('/kyoto')
 def kyoto():
     return render_template('kyoto.html')
@@ -57,15 +136,185 @@ if not gemini_key or not unsplash_key:
 if not amadeus_client_id or not amadeus_client_secret:
     raise ValueError("❌ Amadeus API 키가 설정되지 않았습니다!")
 
+# 외부 API 주소 (벤치마크에서 로컬 대역 서버로 바꿀 때만 지정, bench/README.md 참고)
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")
+AMADEUS_BASE_URL = os.getenv("AMADEUS_BASE_URL", "https://test.api.amadeus.com")
+UNSPLASH_API_URL = os.getenv("UNSPLASH_API_URL", "https://api.unsplash.com")
+
+def configure_gemini():
+    """Gemini API 설정 (GEMINI_API_ENDPOINT가 있으면 그 서버에 REST로 연결)"""
+    if GEMINI_API_ENDPOINT:
+        genai.configure(
+            api_key=gemini_key, transport="rest", client_options={"api_endpoint": GEMINI_API_ENDPOINT}
+        )
+    else:
+        genai.configure(api_key=gemini_key)
+
+def amadeus_client_options():
+    """AMADEUS_BASE_URL을 지정했으면 SDK(항공편/도시 검색)도 같은 서버로"""
+    if "AMADEUS_BASE_URL" not in os.environ:
+        return {}
+    url = urlsplit(AMADEUS_BASE_URL)
+    ssl = url.scheme == "https"
+    return {"host": url.hostname, "ssl": ssl, "port": url.port or (443 if ssl else 80)}
+
 # Gemini API 설정
-genai.configure(api_key=gemini_key)
+configure_gemini()
 
 # Amadeus 클라이언트 설정
+# SDK 기본 urlopen에는 타임아웃이 없어서 응답이 없으면 스레드가 무한정 기다림
+AMADEUS_TIMEOUT = float(os.getenv("AMADEUS_TIMEOUT", "10"))  # 초
+# SDK 메서드에는 타임아웃 인자가 없으므로 마감 시간은 스레드별로 넘김 (search_flight_offers)
+amadeus_deadline = threading.local()
+
+def amadeus_urlopen(request):
+    timeout = AMADEUS_TIMEOUT
+    deadline = getattr(amadeus_deadline, "value", None)
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("amadeus 마감 시간 초과")
+        timeout = min(timeout, remaining)
+    return urlopen(request, timeout=timeout)
+
 amadeus = AmadeusClient(
     client_id=amadeus_client_id,
-    client_secret=amadeus_client_secret
+    client_secret=amadeus_client_secret,
+    http=amadeus_urlopen,
+    **amadeus_client_options()
 )
 
+# ==============================
+# 🔹 Gemini 응답 캐시
+# 같은 테마/대륙/국가, 같은 도시/국가 요청이 반복되므로
+# 정규화된 파라미터를 키로 파싱 결과를 저장해 둡니다.
+# CACHE_DB_PATH를 지정하면 SQLite 파일에도 저장되어 재시작 후에도 유지됩니다.
+# ==============================
+LLM_CACHE_TTL = {
+    "recommend": 6 * 60 * 60,       # 추천 결과: 6시간
+    "city_info": 7 * 24 * 60 * 60,  # 도시 설명: 거의 변하지 않으므로 7일
+    "plan_trip": 60 * 60,           # 일정: 1시간
+    "unsplash": 24 * 60 * 60,       # 이미지 URL: 1일
+}
+
+llm_cache = TTLCache(
+    maxsize=int(os.getenv("LLM_CACHE_SIZE", "2048")),
+    ttls=LLM_CACHE_TTL,
+    db_path=os.getenv("CACHE_DB_PATH") or None,
+)
+
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "30"))  # 초. 없으면 응답이 올 때까지 무한정 대기
+
+def gemini_failure(error):
+    """서킷 브레이커에 실패로 셀 Gemini 예외: 전송 오류와 5xx/429만
+    (스트리밍 중 모델 출력을 읽다가 난 ValueError 같은 출력 문제, 요청 자체의 4xx는 제외)"""
+    if isinstance(error, google_exceptions.GoogleAPICallError):
+        return error.code is None or error.code >= 500 or resilience.is_failure_status(error.code)
+    return isinstance(error, (google_exceptions.GoogleAPIError, OSError))  # OSError: 연결/타임아웃 (requests 포함)
+
+def generate(prompt, parse, timeout=None):
+    """Gemini를 호출해 parse 결과를 돌려줌 (캐시 없음). timeout: 기본 GEMINI_TIMEOUT보다 짧게 할 때"""
+    model = genai.GenerativeModel("gemini-2.5-flash")
+    with resilience.call("gemini", gemini_failure):
+        response = model.generate_content(
+            prompt, request_options={"timeout": min(timeout or GEMINI_TIMEOUT, GEMINI_TIMEOUT)}
+        )
+    metrics.observe_llm(prompt, response.text)
+    return parse(response.text)
+
+# 정확한 키가 없을 때 표현만 조금 다른 이전 요청의 응답을 찾는 캐시 (semantic_cache.py)
+# similar: 비교할 요청 필드, scope: 반드시 같아야 하는 값 (예: 여행 기간, 추천 지역)
+semantic_cache = SemanticCache(
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+    maxsize=int(os.getenv("SEMANTIC_CACHE_SIZE", "1024")),
+    ttls=LLM_CACHE_TTL,
+)
+
+def lookup_cached(namespace, key, similar=None, scope=""):
+    """(값, "cache" / "semantic"), 없으면 (None, None)"""
+    cached = llm_cache.get(namespace, key)
+    if cached is not None:
+        return cached, "cache"
+    if similar is not None:
+        cached = semantic_cache.get(namespace, similar, scope)
+        if cached is not None:
+            llm_cache.set(namespace, key, cached)  # 같은 요청이 또 오면 정확한 키로 바로
+            return cached, "semantic"
+    return None, None
+
+def store_cached(namespace, key, value, similar=None, scope=""):
+    llm_cache.set(namespace, key, value)
+    if similar is not None:
+        semantic_cache.set(namespace, similar, value, scope)
+
+def cached_generate(namespace, key, prompt, parse, similar=None, scope="", timeout=None):
+    """캐시를 먼저 보고, 없으면 Gemini를 호출해 parse 결과를 캐시에 저장"""
+    cached, _ = lookup_cached(namespace, key, similar, scope)
+    if cached is not None:
+        return cached
+
+    result = generate(prompt, parse, timeout)
+    # 파싱에 실패한 빈 결과는 저장하지 않음 (fallback이 TTL 동안 굳지 않도록)
+    if result:
+        store_cached(namespace, key, result, similar, scope)
+    return result
+
+@app.route("/api/cache_stats")
+def cache_stats():
+    return jsonify({
+        **llm_cache.stats(),
+        "_semantic": semantic_cache.stats(),
+        "_city_info_batches": city_info_batcher.stats(),
+        "_routes": route_cache.stats(),
+    })
+
+@app.route("/api/upstream_stats")
+def upstream_stats():
+    return jsonify({
+        **http_client.latency_stats(),
+        "_resilience": resilience.stats(),
+        "_requests": request_limiter.stats(),
+    })
+
+# ==============================
+# 🔹 Prometheus 지표 (/metrics)
+# 요청/업스트림 시간, LLM 프롬프트/응답 크기, JSON 파싱 실패는 호출할 때 기록하고
+# 캐시 적중률, 서킷 상태처럼 이미 세고 있는 값은 /metrics를 읽을 때 가져옵니다.
+# ==============================
+@metrics.register_collector
+def collect_cache_metrics():
+    families = []
+    for name, stats in (
+        ("llm", llm_cache.stats()),
+        ("semantic", semantic_cache.stats()),
+        ("routes", route_cache.stats()),
+        ("flights", {"flights": flight_cache.stats()}),
+        ("hotels", {"hotels": hotel_cache.stats()}),
+    ):
+        families.extend(metrics.cache_families(name, stats))
+    return families
+
+@metrics.register_collector
+def collect_resilience_metrics():
+    upstreams = resilience.stats()
+    limiter = request_limiter.stats()
+    batches = city_info_batcher.stats()
+    return [
+        ("upstream_rejected_total", "counter", "속도 제한 / 서킷 열림으로 보내지 않은 호출 수",
+         [({"upstream": name, "reason": reason}, stats[reason])
+          for name, stats in upstreams.items() for reason in ("rate_limited", "short_circuited")]),
+        ("upstream_circuit_open", "gauge", "서킷 상태 (0: 닫힘, 0.5: 시험 중, 1: 열림)",
+         [({"upstream": name}, {"closed": 0, "half_open": 0.5, "open": 1}[stats["state"]])
+          for name, stats in upstreams.items()]),
+        ("http_requests_in_flight", "gauge", "처리 중인 요청 수", [({}, limiter["active"])]),
+        ("http_requests_shed_total", "counter", "동시 요청 상한으로 거절한 요청 수", [({}, limiter["rejected"])]),
+        ("city_info_batch_size", "gauge", "도시 설명 배치 평균 크기", [({}, batches["avg_batch_size"])]),
+    ]
+
+@app.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 # ==============================
 # 🌟 추가: IATA 항공사 코드 -> 이름 매핑
 # Amadeus API에서 carrierCode를 'KE', 'OZ', 'TW' 등으로 반환하므로,
@@ -106,6 +355,73 @@ def theme():
 def region():
     return render_template("region.html")
 
+# ==============================
+# 🔹 지역 데이터 API (region.html용)
+# /api/regions                        → 대륙 → 국가 (좌표만)
+# /api/regions/<continent>            → 국가 (좌표만)
+# /api/regions/<continent>/<country>  → 국가 좌표 + 도시
+# countries.json은 시작 시 한 번만 읽고, 압축본과 ETag도 미리 만들어 둡니다.
+# ==============================
+@app.route("/api/regions")
+@app.route("/api/regions/<continent>")
+@app.route("/api/regions/<continent>/<country>")
+def regions_api(continent=None, country=None):
+    encoded = encoded_subtree(continent, country)
+    if encoded is None:
+        return jsonify({"error": "지역을 찾을 수 없음"}), 404
+
+    body, encoding, etag = encoded.body_for(request.headers.get("Accept-Encoding"))
+    response = Response(body, mimetype="application/json")
+    if encoding:
+        response.content_encoding = encoding
+    response.set_etag(etag)
+    response.last_modified = REGIONS_LAST_MODIFIED
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    response.vary.add("Accept-Encoding")
+    # If-None-Match / If-Modified-Since가 맞으면 304
+    return response.make_conditional(request)
+
+# ==============================
+# 🔹 좌표 → 도시 API (geo_index.py)
+# /api/geo/nearest?lat=&lng=&n=5          → 가까운 도시 n개
+# /api/geo/within?lat=&lng=&radius_km=100 → 반경 안의 도시
+# /api/geo/reverse?lat=&lng=              → 좌표가 속한 대륙/국가 (가장 가까운 도시)
+# 지도 클릭이나 GPS 위치를 지오코딩 없이 알려진 여행지로 맞출 때 씁니다.
+# ==============================
+GEO_MAX_RESULTS = 50
+GEO_MAX_RADIUS_KM = 5000
+
+def geo_point_arg():
+    return parse_point(request.args.get("lat"), request.args.get("lng"))
+
+@app.route("/api/geo/nearest", methods=["GET"])
+def geo_nearest():
+    point = geo_point_arg()
+    if point is None:
+        return jsonify({"error": "올바른 lat, lng 파라미터 필요"}), 400
+    n = min(request.args.get("n", 5, type=int), GEO_MAX_RESULTS)
+    return jsonify(city_index.nearest(*point, n=n))
+
+@app.route("/api/geo/within", methods=["GET"])
+def geo_within():
+    point = geo_point_arg()
+    radius_km = request.args.get("radius_km", type=float)
+    if point is None or radius_km is None or radius_km < 0:
+        return jsonify({"error": "올바른 lat, lng, radius_km 파라미터 필요"}), 400
+    radius_km = min(radius_km, GEO_MAX_RADIUS_KM)
+    return jsonify(city_index.within(*point, radius_km, limit=GEO_MAX_RESULTS))
+
+@app.route("/api/geo/reverse", methods=["GET"])
+def geo_reverse():
+    point = geo_point_arg()
+    if point is None:
+        return jsonify({"error": "올바른 lat, lng 파라미터 필요"}), 400
+    place = city_index.locate(*point)
+    if place is None:
+        return jsonify({"error": "도시 데이터 없음"}), 404
+    return jsonify(place)
+
 # ==============================
 # 🔹 ✈ 항공 페이지 (air.html)
 # ==============================
@@ -113,18 +429,80 @@ def region():
 def flight():
     return render_template("air.html")  # templates/air.html 필요
 
+# ==============================
+# 🔹 Unsplash 이미지 검색
+# 여러 장소의 이미지를 스레드 풀에서 동시에 조회해서
+# 가장 느린 한 건만큼만 기다리도록 합니다.
+# ==============================
+PLACEHOLDER_IMAGE = "https://via.placeholder.com/400x250?text=No+Image"
+UNSPLASH_TIMEOUT = 4  # 이미지 한 건당 최대 대기 시간(초)
+
+image_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="unsplash")
+
+def fetch_unsplash_image(query):
+    """검색어에 맞는 첫 번째 이미지 URL, 실패하면 placeholder"""
+    key = cache_key(query)
+    cached = llm_cache.get("unsplash", key)
+    if cached is not None:
+        return cached
+
+    try:
+        res = http_client.get(
+            "unsplash",
+            f"{UNSPLASH_API_URL}/search/photos",
+            params={"query": query, "client_id": unsplash_key, "per_page": 1},
+        )
+        if res.status_code != 200:
+            return PLACEHOLDER_IMAGE
+        results = res.json().get("results")
+        if not results:
+            return PLACEHOLDER_IMAGE
+        image_url = results[0]["urls"]["regular"]
+    except Exception:
+        return PLACEHOLDER_IMAGE
+
+    llm_cache.set("unsplash", key, image_url)
+    return image_url
+
+def fetch_unsplash_images(queries):
+    """여러 검색어의 이미지를 동시에 조회 (순서 유지)"""
+    futures = [image_executor.submit(fetch_unsplash_image, q) for q in queries]
+    deadline = time.monotonic() + UNSPLASH_TIMEOUT
+    images = []
+    for future in futures:
+        try:
+            images.append(future.result(timeout=max(0, deadline - time.monotonic())))
+        except Exception:
+            images.append(PLACEHOLDER_IMAGE)
+    return images
+
 # ==============================
 # 🔹 AI 여행지 추천 API
-# (변경 없음)
+# 1단계: 추천 카탈로그 (destinations.py, 색인 조회)
+# 2단계: Gemini 응답 캐시
+#        (정확한 키 → 표현만 다른 비슷한 요청 순서)
+# 3단계: Gemini 호출 → 결과를 캐시와 카탈로그에 저장
+# 어느 단계에서 답했는지는 X-Recommend-Tier 헤더(catalogue / cache / semantic / llm / fallback)로 알려줍니다.
 # ==============================
-@app.route("/recommend", methods=["POST"])
-def recommend():
-    data = request.get_json()
-    theme = data.get("theme")
-    continent = data.get("continent")
-    subregion = data.get("subregion")
-    country = data.get("country")
+RECOMMEND_COUNT = 3
+
+destination_catalogue = DestinationCatalogue(
+    learned_path=os.getenv("LEARNED_DESTINATIONS_PATH", LEARNED_DESTINATIONS_PATH),
+)
+
+RECOMMEND_SCHEMA = {"name": str, "country": str}
+
+def parse_recommendations(text):
+    return parse_array(text, RECOMMEND_SCHEMA)
+
+DEFAULT_RECOMMENDATIONS = [
+    {"name": "파리", "country": "프랑스", "description": "설명 없음"},
+    {"name": "로마", "country": "이탈리아", "description": "설명 없음"},
+    {"name": "바르셀로나", "country": "스페인", "description": "설명 없음"}
+]
 
+def build_recommend_prompt(theme, continent, subregion, country):
+    """추천용 Gemini 프롬프트"""
     prompt_parts = []
     if theme: prompt_parts.append(f"{theme} 테마")
     if continent: prompt_parts.append(f"대륙: {continent}")
@@ -145,37 +523,58 @@ def recommend():
   {{"name": "여행지명", "country": "나라", "description": "간단한 설명"}}
 ]
 """
+    return prompt
+
+def recommend_fields(theme, continent, subregion, country):
+    """유사 요청 캐시에서 비교할 필드와 scope
+    지역(대륙/하위 지역/국가)은 비슷한 이름이어도 다른 답이 나와야 하므로 scope로만 비교 (북유럽 ≠ 남유럽)"""
+    return {"theme": theme}, scope_key(continent, subregion, country)
+
+def recommend_places(theme, continent, subregion, country):
+    """(추천 여행지 목록, 답한 단계)"""
+    places = destination_catalogue.pick(theme, continent, subregion, country, k=RECOMMEND_COUNT)
+    if places:
+        return places, "catalogue"
+
+    key = cache_key(theme, continent, subregion, country)
+    similar, scope = recommend_fields(theme, continent, subregion, country)
+    cached, tier = lookup_cached("recommend", key, similar, scope)
+    if cached is not None:
+        return cached, tier
+
     try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        text = response.text.strip().replace("'", '"').replace("\n", " ")
-        match = re.search(r'\[.*\]', text, re.DOTALL)
-        travel_data = json.loads(match.group(0)) if match else []
-
-        if not travel_data:
-            travel_data = [
-                {"name": "파리", "country": "프랑스", "description": "설명 없음"},
-                {"name": "로마", "country": "이탈리아", "description": "설명 없음"},
-                {"name": "바르셀로나", "country": "스페인", "description": "설명 없음"}
-            ]
-
-        # Unsplash 이미지 추가
-        for place in travel_data:
-            query = f"{place['name']} {place['country']}"
-            try:
-                res = requests.get(
-                    "https://api.unsplash.com/search/photos",
-                    params={"query": query, "client_id": unsplash_key, "per_page": 1}
-                )
-                place["image"] = (
-                    res.json()["results"][0]["urls"]["regular"]
-                    if res.status_code == 200 and res.json().get("results")
-                    else "https://via.placeholder.com/400x250?text=No+Image"
-                )
-            except:
-                place["image"] = "https://via.placeholder.com/400x250?text=No+Image"
+        places = generate(build_recommend_prompt(theme, continent, subregion, country), parse_recommendations)
+    except UpstreamUnavailable:
+        return DEFAULT_RECOMMENDATIONS, "fallback"  # Gemini 서킷이 열려 있으면 기다리지 않고 기본 목록
+    if not places:
+        return DEFAULT_RECOMMENDATIONS, "fallback"  # 빈 목록이나 파싱 실패는 캐시하지 않음
+    store_cached("recommend", key, places, similar, scope)
+    destination_catalogue.learn(places, theme, continent, subregion)
+    return places, "llm"
+
+@app.route("/recommend", methods=["POST"])
+def recommend():
+    data = request.get_json()
+    theme = data.get("theme")
+    continent = data.get("continent")
+    subregion = data.get("subregion")
+    country = data.get("country")
+
+    try:
+        travel_data, tier = recommend_places(theme, continent, subregion, country)
+        # 캐시된 리스트를 건드리지 않도록 복사해서 이미지 추가
+        travel_data = [dict(place) for place in travel_data]
+
+        # Unsplash 이미지 추가 (동시 조회)
+        images = fetch_unsplash_images(
+            [f"{place.get('name', '')} {place.get('country', '')}" for place in travel_data]
+        )
+        for place, image in zip(travel_data, images):
+            place["image"] = image
 
-        return jsonify(travel_data)
+        response = jsonify(travel_data)
+        response.headers["X-Recommend-Tier"] = tier
+        return response
 
     except Exception as e:
         return jsonify([{
@@ -187,8 +586,89 @@ def recommend():
 
 # ==============================
 # 🔹 지역별 도시 상세 설명 API
-# (변경 없음)
+# city_info.jsonl(warmup_city_info.py로 생성)에 있으면 그대로 쓰고,
+# 없는 도시만 Gemini/Unsplash를 호출합니다.
+# 짧은 시간 안에 들어온 도시 설명 요청은 MicroBatcher로 모아
+# 프롬프트 하나로 Gemini를 한 번만 부르고, 결과를 도시별로 캐시합니다.
 # ==============================
+CITY_INFO_SCHEMA = {"description": str}
+CITY_INFO_BATCH_WINDOW = 0.05  # 초. 이 시간 동안 들어온 도시를 한 번에 요청
+CITY_INFO_BATCH_SIZE = 8       # 프롬프트 하나에 넣을 최대 도시 수
+CITY_INFO_BATCH_LIMIT = 50     # /api/city_info/batch 한 번에 받을 최대 도시 수
+
+def parse_city_description(text):
+    parsed = parse_object(text, CITY_INFO_SCHEMA)
+    return parsed["description"] if parsed else ""
+
+def parse_city_descriptions(text):
+    """{"1": "설명", "2": "설명"} → {1: "설명", 2: "설명"}"""
+    parsed = parse_object(text) or {}
+    return {
+        int(number): description
+        for number, description in parsed.items()
+        if number.strip().isdigit() and isinstance(description, str) and description
+    }
+
+def build_city_info_batch_prompt(pairs):
+    cities = "\n".join(f"{i}. {city}, {country}" for i, (city, country) in enumerate(pairs, 1))
+    return f"""
+다음 도시 각각에 대한 2~3문장 여행 설명을 작성해줘.
+{cities}
+- 반드시 번호를 키로 하는 JSON 객체 하나로 반환
+- 문자열은 큰따옴표(") 사용, 내부 특수문자와 줄바꿈은 JSON-safe하게 처리
+- 형식: {{"1": "설명", "2": "설명"}}
+"""
+
+def describe_cities(pairs):
+    """[(도시, 국가), ...] 설명을 Gemini 한 번으로 만들어 캐시. {cache_key(도시, 국가): 설명}"""
+    if len(pairs) == 1:
+        city, country = pairs[0]
+        description = generate(build_city_info_prompt(city, country), parse_city_description)
+        descriptions = {1: description} if description else {}
+    else:
+        descriptions = generate(build_city_info_batch_prompt(pairs), parse_city_descriptions)
+
+    results = {}
+    for i, (city, country) in enumerate(pairs, 1):
+        description = descriptions.get(i)
+        if description:
+            key = cache_key(city, country)
+            llm_cache.set("city_info", key, description)
+            results[key] = description
+    return results
+
+city_info_batcher = MicroBatcher(
+    describe_cities,
+    key=lambda pair: cache_key(*pair),
+    window=CITY_INFO_BATCH_WINDOW,
+    max_batch=CITY_INFO_BATCH_SIZE,
+)
+
+def city_description_future(city, country):
+    """도시 설명 Future. 캐시에 있으면 이미 끝난 Future, 없으면 배처에 넣음
+
+    결과가 None이면 설명을 만들지 못한 것
+    """
+    cached = llm_cache.get("city_info", cache_key(city, country))
+    if cached is not None:
+        future = Future()
+        future.set_result(cached)
+        return future
+    return city_info_batcher.submit((city, country))
+
+city_store = CityInfoStore(os.getenv("CITY_STORE_PATH", CITY_STORE_PATH))
+
+def stored_city_info(stored):
+    return {
+        "name": stored["city"],
+        "country": stored["country"],
+        "description": stored["description"],
+        "image": stored["image"]
+    }
+
+def build_city_info_prompt(city, country):
+    return f"{city}, {country}에 대한 2~3문장 여행 설명을 JSON-safe하게 작성해줘. 형식: {{\"description\": \"...\"}}"
+
 @app.route("/getCityInfo", methods=["POST"])
 def get_city_info():
     data = request.get_json()
@@ -198,35 +678,21 @@ def get_city_info():
     if not city or not country:
         return jsonify({"error": "city와 country 필수"}), 400
 
-    prompt = f"{city}, {country}에 대한 2~3문장 여행 설명을 JSON-safe하게 작성해줘. 형식: {{\"description\": \"...\"}}"
+    # warm-up으로 미리 만든 도시는 바로 응답
+    stored = city_store.get(city, country)
+    if stored:
+        return jsonify(stored_city_info(stored))
 
-    try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        text = response.text.strip().replace("\n", " ").replace("'", '"')
+    # Unsplash 이미지는 Gemini 호출과 동시에 조회
+    image_future = image_executor.submit(fetch_unsplash_image, f"{city} {country}")
 
-        match = re.search(r'\{.*"description".*?\}', text)
-        description = ""
-        if match:
-            try:
-                description_json = json.loads(match.group(0))
-                description = description_json.get("description", "")
-            except:
-                description = ""
+    try:
+        description = city_description_future(city, country).result() or ""
 
-        # Unsplash 이미지
         try:
-            res = requests.get(
-                "https://api.unsplash.com/search/photos",
-                params={"query": f"{city} {country}", "client_id": unsplash_key, "per_page": 1}
-            )
-            image_url = (
-                res.json()["results"][0]["urls"]["regular"]
-                if res.status_code == 200 and res.json().get("results")
-                else "https://via.placeholder.com/400x250?text=No+Image"
-            )
-        except:
-            image_url = "https://via.placeholder.com/400x250?text=No+Image"
+            image_url = image_future.result(timeout=UNSPLASH_TIMEOUT)
+        except Exception:
+            image_url = PLACEHOLDER_IMAGE
 
         return jsonify({
             "name": city,
@@ -243,8 +709,50 @@ def get_city_info():
             "image": "https://via.placeholder.com/400x250"
         })
 
+@app.route("/api/city_info/batch", methods=["POST"])
+def get_city_info_batch():
+    """
+    여러 도시 설명을 한 번에 (응답: /getCityInfo 결과의 배열, 요청 순서대로)
+    {"country": "일본"}                            → countries.json에 있는 그 나라 도시 전체
+    {"cities": [{"city": "서울", "country": "한국"}, ...]}
+    """
+    data = request.get_json() or {}
+    if data.get("cities"):
+        pairs = [(item.get("city"), item.get("country")) for item in data["cities"]]
+    else:
+        pairs = [(city, data.get("country")) for city in country_cities(data.get("country"))]
+
+    if not pairs or not all(city and country for city, country in pairs):
+        return jsonify({"error": "cities(city, country) 또는 countries.json에 있는 country 필수"}), 400
+    if len(pairs) > CITY_INFO_BATCH_LIMIT:
+        return jsonify({"error": f"한 번에 최대 {CITY_INFO_BATCH_LIMIT}개 도시"}), 400
+
+    # 저장소에 없는 도시만 설명(배처)과 이미지를 동시에 요청
+    missing = [pair for pair in dict.fromkeys(pairs) if not city_store.get(*pair)]
+    descriptions = {pair: city_description_future(*pair) for pair in missing}
+    images = dict(zip(missing, fetch_unsplash_images([f"{city} {country}" for city, country in missing])))
+
+    results = []
+    for city, country in pairs:
+        stored = city_store.get(city, country)
+        if stored:
+            results.append(stored_city_info(stored))
+            continue
+        try:
+            description = descriptions[(city, country)].result() or ""
+        except Exception as e:
+            description = f"⚠ AI 호출 실패: {e}"
+        results.append({
+            "name": city,
+            "country": country,
+            "description": description,
+            "image": images[(city, country)]
+        })
+    return jsonify(results)
+
 # ==============================
-# 🔹 IATA 코드 변환 함수 (기존 유지)
+# 🔹 IATA 코드 변환 함수 (iata.py)
+# iata_cities.json → 유사도 매칭 → (캐시된) Amadeus 위치 검색 순서
 # ==============================
 CITY_TO_IATA = {
     "서울": "ICN",
@@ -262,24 +770,112 @@ CITY_TO_IATA = {
     # 필요하면 계속 추가
 }
 
-def get_iata_code(city_name):
-    # 1️⃣ 직접 매핑 테이블에서 찾기
-    iata = CITY_TO_IATA.get(city_name)
-    if iata:
-        return iata
+def amadeus_failure(error):
+    """서킷 브레이커에 실패로 셀 Amadeus SDK 예외 (검색 결과 없음 같은 4xx는 제외)"""
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return status is None or status >= 500 or resilience.is_failure_status(status)
 
-    # 2️⃣ Amadeus API로 검색
-    try:
+def amadeus_city_lookup(city_name):
+    """Amadeus 위치 검색 (에러는 호출한 쪽으로 전달 → 실패 결과는 캐시하지 않음)"""
+    with resilience.call("amadeus", amadeus_failure):
         response = amadeus.reference_data.locations.get(
             keyword=city_name,
             subType="CITY"
         )
-        if response.data:
-            return response.data[0]["iataCode"]
+    if response.data:
+        return response.data[0]["iataCode"]
+    return None
+
+iata_resolver = IataResolver(
+    amadeus_city_lookup,
+    TTLCache(maxsize=4096, db_path=os.getenv("IATA_CACHE_DB", "iata_cache.sqlite3") or None),
+    overrides=CITY_TO_IATA,
+)
+
+def get_iata_code(city_name):
+    try:
+        return iata_resolver.resolve(city_name)
     except Exception as e:
         print(f"IATA 코드 변환 에러: {e}")
+        return None
 
-    return None
+def get_iata_codes(origin, destination):
+    """출발지/도착지 IATA 코드를 동시에 변환"""
+    try:
+        return iata_resolver.resolve_pair(origin, destination)
+    except Exception as e:
+        print(f"IATA 코드 변환 에러: {e}")
+        return get_iata_code(origin), get_iata_code(destination)
+
+# ==============================
+# 🔹 항공권 검색 결과 캐시
+# 같은 구간/날짜 검색이 많아서 IATA 코드 + 날짜를 키로 짧게 캐시합니다.
+# - FLIGHT_FRESH_TTL 이내: 캐시 그대로
+# - FLIGHT_STALE_TTL 이내: 캐시를 먼저 주고 백그라운드에서 갱신
+# - 같은 검색이 동시에 들어오면 Amadeus 호출은 한 번만
+# 응답 헤더 Age / X-Cache 로 데이터가 얼마나 오래됐는지 알려줍니다.
+# ==============================
+FLIGHT_FRESH_TTL = 5 * 60
+FLIGHT_STALE_TTL = 30 * 60
+
+flight_cache = StaleWhileRevalidateCache(
+    FLIGHT_FRESH_TTL,
+    FLIGHT_STALE_TTL,
+    ThreadPoolExecutor(max_workers=4, thread_name_prefix="flight-refresh"),
+)
+
+def format_flight_offers(data):
+    """Amadeus flight-offers 응답의 data → 화면용 항공편 목록 (출발/도착 도시명 제외)"""
+    offers = []
+    for offer in data:
+        price = offer["price"]["total"]
+        itineraries = offer["itineraries"][0]["segments"]
+        first = itineraries[0]
+        last = itineraries[-1]
+        carrier_code = first["carrierCode"]
+
+        # 🌟 수정된 부분: IATA 코드 -> 항공사 이름 변환
+        airline_name = CARRIER_CODE_TO_NAME.get(carrier_code, carrier_code)
+
+        offers.append({
+            "departure_time": first["departure"]["at"],
+            "arrival_time": last["arrival"]["at"],
+            "airline": airline_name, # 🌟 변환된 항공사 이름 사용
+            "flight_number": first["number"],
+            "price": f"${price}"
+        })
+    return offers
+
+def search_flight_offers(from_code, to_code, depart_date, return_date, deadline=None):
+    """Amadeus 항공편 검색 → 화면용 항공편 목록 (출발/도착 도시명 제외)
+    deadline(time.monotonic() 기준)을 주면 SDK의 HTTP 호출(토큰 발급 포함)도 그때까지만 기다림"""
+    if deadline is not None and deadline <= time.monotonic():
+        raise TimeoutError("amadeus 마감 시간 초과")
+    amadeus_deadline.value = deadline
+    try:
+        with resilience.call("amadeus", amadeus_failure):
+            response = amadeus.shopping.flight_offers_search.get(
+                originLocationCode=from_code,
+                destinationLocationCode=to_code,
+                departureDate=depart_date,
+                returnDate=return_date,
+                adults=1,
+                currencyCode="USD",
+                max=5
+            )
+    finally:
+        amadeus_deadline.value = None
+
+    return format_flight_offers(response.data)
+
+def get_flight_offers(from_code, to_code, depart_date, return_date, deadline=None):
+    """캐시를 거친 항공편 검색 → (offers, age_seconds, status)
+    deadline은 요청을 기다리는 쪽의 마감 시간. 이미 지난 뒤에 도는 백그라운드 갱신에는 적용하지 않음"""
+    key = cache_key(from_code, to_code, depart_date, return_date)
+    def load():
+        active = deadline if deadline is not None and deadline > time.monotonic() else None
+        return search_flight_offers(from_code, to_code, depart_date, return_date, active)
+    return flight_cache.get_or_load(key, load)
 
 # ==============================
 # 🔹 항공권 검색 API (air.html용) - 수정됨!
@@ -297,44 +893,26 @@ def search_flight():
             return jsonify({"error": "출발지와 도착지를 입력하세요."}), 400
 
         # IATA 코드 변환
-        from_code = get_iata_code(origin)
-        to_code = get_iata_code(destination)
+        from_code, to_code = get_iata_codes(origin, destination)
         if not from_code or not to_code:
             return jsonify({"error": "도시명을 IATA 코드로 변환할 수 없습니다."}), 400
 
-        # Amadeus 항공편 검색 API
-        response = amadeus.shopping.flight_offers_search.get(
-            originLocationCode=from_code,
-            destinationLocationCode=to_code,
-            departureDate=depart_date,
-            returnDate=return_date,
-            adults=1,
-            currencyCode="USD",
-            max=5
-        )
+        # Amadeus 항공편 검색 API (캐시 사용)
+        offers, age, status = get_flight_offers(from_code, to_code, depart_date, return_date)
 
-        flights = []
-        for offer in response.data:
-            price = offer["price"]["total"]
-            itineraries = offer["itineraries"][0]["segments"]
-            first = itineraries[0]
-            last = itineraries[-1]
-            carrier_code = first["carrierCode"]
-            
-            # 🌟 수정된 부분: IATA 코드 -> 항공사 이름 변환
-            airline_name = CARRIER_CODE_TO_NAME.get(carrier_code, carrier_code)
-            
-            flights.append({
+        flights = [
+            {
                 "from": origin, # IATA 코드 대신 원본 도시명을 다시 사용
                 "to": destination, # IATA 코드 대신 원본 도시명을 다시 사용
-                "departure_time": first["departure"]["at"],
-                "arrival_time": last["arrival"]["at"],
-                "airline": airline_name, # 🌟 변환된 항공사 이름 사용
-                "flight_number": first["number"],
-                "price": f"${price}"
-            })
+                **offer
+            }
+            for offer in offers
+        ]
 
-        return jsonify(flights)
+        response = jsonify(flights)
+        response.headers["Age"] = str(int(age))
+        response.headers["X-Cache"] = status
+        return response
 
     except ResponseError as e:
         return jsonify({"error": str(e)}), 500
@@ -342,88 +920,254 @@ def search_flight():
         return jsonify({"error": f"예외 발생: {e}"}), 500
 
 
-
-
-from flask import Flask, request, jsonify, render_template
-import requests
-
 # ==============================
 # 🔹 HOTEL SEARCH API (Amadeus 통합)
 # ==============================
-TOKEN_URL = "https://test.api.amadeus.com/v1/security/oauth2/token"
-HOTEL_URL = "https://test.api.amadeus.com/v1/reference-data/locations/hotels/by-city"
+TOKEN_URL = f"{AMADEUS_BASE_URL}/v1/security/oauth2/token"
+HOTEL_URL = f"{AMADEUS_BASE_URL}/v1/reference-data/locations/hotels/by-city"
 AMADEUS_API_KEY = amadeus_client_id
 AMADEUS_API_SECRET = amadeus_client_secret
 
-def get_access_token():
-    """Amadeus API용 Access Token 발급"""
+TOKEN_REFRESH_MARGIN = 60  # 만료 60초 전부터 미리 갱신
+
+def request_access_token():
+    """Amadeus 토큰 엔드포인트 호출 → (access_token, expires_in) 또는 (None, 0)"""
     data = {
         "grant_type": "client_credentials",
         "client_id": AMADEUS_API_KEY,
         "client_secret": AMADEUS_API_SECRET
     }
     try:
-        response = requests.post(TOKEN_URL, data=data)
+        response = http_client.post("amadeus", TOKEN_URL, data=data)
         if response.status_code == 200:
-            return response.json().get("access_token")
+            body = response.json()
+            return body.get("access_token"), int(body.get("expires_in", 0))
         else:
             print("❌ 토큰 발급 실패:", response.text)
-            return None
+            return None, 0
     except Exception as e:
         print("❌ 토큰 발급 에러:", e)
-        return None
+        return None, 0
 
-@app.route("/hotel")
-def hotel_page():
-    return render_template("hotel.html")
+class AccessTokenCache:
+    """프로세스 전체에서 공유하는 Amadeus 토큰 캐시
 
-@app.route("/api/hotel", methods=["GET"])
-def get_hotels():
-    city = request.args.get("city")
-    if not city:
-        return jsonify({"error": "city 파라미터 필요"}), 400
+    - 유효한 토큰은 그대로 재사용
+    - 만료 TOKEN_REFRESH_MARGIN초 전부터는 한 스레드만 갱신하고
+      나머지는 아직 유효한 기존 토큰을 계속 사용
+    - 토큰이 없거나 만료됐으면 한 스레드만 발급하고 나머지는 기다렸다가 결과를 공유
+    """
+
+    def __init__(self, fetch, margin=TOKEN_REFRESH_MARGIN):
+        self._fetch = fetch
+        self._margin = margin
+        self._token = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        now = time.monotonic()
+        token, expires_at = self._token, self._expires_at
+        if token and now < expires_at - self._margin:
+            return token
+
+        if token and now < expires_at:
+            # 갱신 구간: 이미 누가 갱신 중이면 기존 토큰 사용
+            if not self._lock.acquire(blocking=False):
+                return token
+            try:
+                self._refresh()
+            finally:
+                self._lock.release()
+            return self._token or token
+
+        with self._lock:
+            # 기다리는 동안 다른 스레드가 발급했으면 그대로 사용
+            if self._token and time.monotonic() < self._expires_at:
+                return self._token
+            self._refresh()
+            return self._token
+
+    def invalidate(self, token):
+        """401 응답 등으로 토큰이 거부됐을 때 버린다"""
+        with self._lock:
+            if self._token == token:
+                self._token, self._expires_at = None, 0.0
+
+    def _refresh(self):
+        requested_at = time.monotonic()
+        token, expires_in = self._fetch()
+        if token:
+            self._token = token
+            self._expires_at = requested_at + expires_in
+
+access_token_cache = AccessTokenCache(request_access_token)
+
+def get_access_token():
+    """Amadeus API용 Access Token (캐시 사용)"""
+    return access_token_cache.get()
 
+# ==============================
+# 🔹 도시별 호텔 목록 캐시
+# by-city 응답은 도시의 호텔 전체라서 cityCode별로 HotelList에 담아 두고
+# 페이지/이름 검색/체인 필터는 캐시된 목록에서 처리합니다.
+# - HOTEL_FRESH_TTL 이내: 캐시 그대로
+# - HOTEL_STALE_TTL 이내: 캐시를 먼저 주고 백그라운드에서 갱신
+# 다음 페이지 cursor와 전체 수는 응답 헤더 X-Next-Cursor / X-Total-Count로 알려줍니다.
+# ==============================
+HOTEL_FRESH_TTL = int(os.getenv("HOTEL_FRESH_TTL", 6 * 3600))
+HOTEL_STALE_TTL = int(os.getenv("HOTEL_STALE_TTL", 24 * 3600))
+HOTEL_PAGE_SIZE = 10
+HOTEL_MAX_PAGE_SIZE = 100
+
+hotel_cache = StaleWhileRevalidateCache(
+    HOTEL_FRESH_TTL,
+    HOTEL_STALE_TTL,
+    ThreadPoolExecutor(max_workers=2, thread_name_prefix="hotel-refresh"),
+    maxsize=256,
+)
+
+class HotelFetchError(Exception):
+    """Amadeus 호텔 목록 호출 실패 (error: 화면용 메시지, message: 원본 응답)"""
+
+    def __init__(self, error, message=None):
+        super().__init__(error)
+        self.error = error
+        self.message = message
+
+    def payload(self):
+        return {"error": self.error, **({"message": self.message} if self.message else {})}
+
+def fetch_hotel_list(city_code, deadline=None):
+    """Amadeus hotels/by-city → HotelList (실패하면 HotelFetchError)"""
     token = get_access_token()
     if not token:
-        return jsonify({"error": "토큰 발급 실패"}), 500
+        raise HotelFetchError("토큰 발급 실패")
+
+    params = {"cityCode": city_code}
+    response = http_client.get(
+        "amadeus", HOTEL_URL, headers={"Authorization": f"Bearer {token}"}, params=params, deadline=deadline
+    )
+    if response.status_code == 401:
+        # 캐시된 토큰이 서버에서 먼저 만료된 경우 한 번만 다시 발급
+        access_token_cache.invalidate(token)
+        token = get_access_token()
+        if not token:
+            raise HotelFetchError("토큰 발급 실패")
+        response = http_client.get(
+            "amadeus", HOTEL_URL, headers={"Authorization": f"Bearer {token}"}, params=params, deadline=deadline
+        )
+    if response.status_code != 200:
+        raise HotelFetchError("호텔 API 호출 실패", response.text)
+    return HotelList.from_api(response.json().get("data", []))
+
+def get_hotel_list(city_code, deadline=None):
+    """캐시를 거친 도시별 호텔 목록 → (HotelList, age_seconds, status)
+    deadline은 요청을 기다리는 쪽의 마감 시간. 이미 지난 뒤에 도는 백그라운드 갱신에는 적용하지 않음"""
+    def load():
+        active = deadline if deadline is not None and deadline > time.monotonic() else None
+        return fetch_hotel_list(city_code, active)
+    return hotel_cache.get_or_load(city_code, load)
+
+def hotel_page_args(args):
+    """/api/hotel 쿼리 → (cityCode, limit, cursor, 이름 앞글자, 체인 코드 목록). 잘못된 값이면 ValueError"""
+    city = (args.get("city") or "").strip().upper()
+    if not city:
+        raise ValueError("city 파라미터 필요")
+    try:
+        limit = int(args.get("limit", HOTEL_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit은 숫자여야 합니다.")
+    if not 1 <= limit <= HOTEL_MAX_PAGE_SIZE:
+        raise ValueError(f"limit은 1~{HOTEL_MAX_PAGE_SIZE} 사이여야 합니다.")
+    chains = [code.strip() for code in (args.get("chain") or "").split(",") if code.strip()]
+    return city, limit, args.get("cursor") or None, (args.get("q") or "").strip(), chains
+
+def hotel_page_headers(next_cursor, total, age, status):
+    headers = {"X-Total-Count": str(total), "Age": str(int(age)), "X-Cache": status}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return headers
 
-    headers = {"Authorization": f"Bearer {token}"}
-    params = {"cityCode": city.upper()}
+@app.route("/hotel")
+def hotel_page():
+    return render_template("hotel.html")
 
+@app.route("/api/hotel", methods=["GET"])
+def get_hotels():
+    """?city=PAR[&limit=10][&cursor=...][&q=이름 앞글자][&chain=HI,MC]"""
     try:
-        response = requests.get(HOTEL_URL, headers=headers, params=params)
-        if response.status_code != 200:
-            return jsonify({"error": "호텔 API 호출 실패", "message": response.text}), 500
+        city, limit, cursor, prefix, chains = hotel_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        data = response.json()
-        hotels = data.get("data", [])
-
-        results = []
-        for h in hotels[:10]:
-            results.append({
-                "hotelName": h.get("name", "N/A"),
-                "hotelId": h.get("hotelId", "N/A"),
-                "chainCode": h.get("chainCode", "N/A"),
-            })
-
-        return jsonify(results)
+    try:
+        hotels, age, status = get_hotel_list(city)
+    except HotelFetchError as e:
+        return jsonify(e.payload()), 500
     except Exception as e:
         return jsonify({"error": f"호텔 API 호출 실패: {e}"}), 500
+
+    try:
+        items, next_cursor, total = hotels.page(limit, cursor, prefix, chains)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = jsonify(items)
+    response.headers.update(hotel_page_headers(next_cursor, total, age, status))
+    return response
         
 # ==============================
 # 🚦 교통(Traffic/Transit) 기능 시작
 # ==============================
 
-import requests
-from flask import Flask, request, jsonify, render_template
-
 
 
 # GraphHopper API 키
 GRAPHHOPPER_KEY = "c87794e5-7930-458b-965b-1c782e438d7c"
 
 # OTP 서버 URL (자체 설치 기준)
-OTP_SERVER_URL = "http://localhost:8080/otp/routers/default/plan"
+OTP_SERVER_URL = os.getenv("OTP_SERVER_URL", "http://localhost:8080/otp/routers/default/plan")
+GRAPHHOPPER_URL = os.getenv("GRAPHHOPPER_URL", "https://graphhopper.com/api/1/route")
+
+# ==============================
+# 🔹 경로 캐시
+# 공항 → 시내처럼 자주 찾는 경로는 업스트림을 다시 부르지 않도록
+# 출발/도착 좌표를 격자(ROUTE_GRID_DEG, 기본 약 100m)에 맞춘 값으로 키를 만듭니다.
+# - GraphHopper: 좌표 + 이동 수단, 인코딩된 points 문자열을 그대로 저장
+# - OTP: 좌표 + 날짜 + 15분 단위 출발 시간
+# ==============================
+ROUTE_GRID_DEG = float(os.getenv("ROUTE_GRID_DEG", "0.001"))
+OTP_TIME_BUCKET_MIN = 15
+ROUTE_CACHE_TTL = {
+    "graphhopper": 24 * 60 * 60,  # 도로 경로는 잘 안 바뀜: 1일
+    "otp": 60 * 60,               # 대중교통 일정: 1시간
+}
+
+route_cache = TTLCache(
+    maxsize=int(os.getenv("ROUTE_CACHE_SIZE", "4096")),
+    ttls=ROUTE_CACHE_TTL,
+)
+
+def snap_point(point):
+    """"위도,경도" 또는 (위도, 경도) → 격자에 맞춘 "위도,경도" 문자열"""
+    lat, lng = point.split(",", 1) if isinstance(point, str) else point
+    return (f"{round(float(lat) / ROUTE_GRID_DEG) * ROUTE_GRID_DEG:.5f},"
+            f"{round(float(lng) / ROUTE_GRID_DEG) * ROUTE_GRID_DEG:.5f}")
+
+def time_bucket(value):
+    """"HH:MM" → OTP_TIME_BUCKET_MIN분 단위로 내림 ("09:07" → "09:00"). 형식이 다르면 그대로"""
+    try:
+        hour, minute = (int(part) for part in value.split(":")[:2])
+    except (AttributeError, ValueError):
+        return value
+    return f"{hour:02d}:{minute - minute % OTP_TIME_BUCKET_MIN:02d}"
+
+def graphhopper_cache_key(start, end, vehicle):
+    return cache_key(snap_point(start), snap_point(end), vehicle)
+
+def otp_cache_key(start, end, date, time_of_day):
+    return cache_key(snap_point(start), snap_point(end), date, time_bucket(time_of_day))
 
 # ==============================
 # 🔹 교통 페이지 라우트
@@ -433,23 +1177,45 @@ def traffic_page():
     return render_template("traffic.html")  # templates/traffic.html 필요
 
 # ==============================
-# 🔹 Nominatim 주소 → 위도/경도
+# 🔹 주소 → 위도/경도 (geocoder.py)
 # ==============================
 def geocode_address(address):
-    url = "https://nominatim.openstreetmap.org/search"
-    params = {"q": address, "format": "json", "limit": 1}
-    try:
-        resp = requests.get(url, params=params, headers={"User-Agent": "FlaskApp"})
-        data = resp.json()
-        if data:
-            return data[0]['lat'], data[0]['lon']
-        return None, None
-    except:
-        return None, None
+    """countries.json 로컬 인덱스 → (없으면) 캐시된 Nominatim"""
+    return geocoder.geocode(address)
 
 # ==============================
 # 🔹 GraphHopper 경로 탐색 API
 # ==============================
+def graphhopper_url(start, end, vehicle):
+    return f"{GRAPHHOPPER_URL}?point={start}&point={end}&vehicle={vehicle}&locale=ko&calc_points=true&key={GRAPHHOPPER_KEY}"
+
+def format_graphhopper_path(data):
+    path = data["paths"][0]
+    return {
+        "distance": path.get("distance"),
+        "time": path.get("time"),
+        "points": path.get("points")
+    }
+
+def polyline_args(args):
+    """(zoom 또는 None, full 여부) — ?zoom=12 : 그 줌에 맞게 줄임, ?full=1 : 원본 그대로"""
+    try:
+        zoom = min(max(int(args.get("zoom")), 0), MAX_ZOOM)
+    except (TypeError, ValueError):
+        zoom = None
+    return zoom, args.get("full") == "1"
+
+def display_points(item, zoom=None, full=False):
+    """points가 있으면 지도 표시용으로 줄인 사본 (full이면 그대로)
+
+    zoom이 없으면 경로 전체가 한 화면에 들어가는 줌 기준. 캐시된 원본은 건드리지 않는다.
+    """
+    points = item.get("points")
+    if full or not isinstance(points, str):
+        return item
+    simplified, total, kept = simplify_encoded(points, zoom)
+    return {**item, "points": simplified, "point_count": kept, "full_point_count": total}
+
 @app.route("/api/graphhopper_route", methods=["GET"])
 def graphhopper_route():
     start = request.args.get("start")  # 주소 또는 "위도,경도"
@@ -462,28 +1228,31 @@ def graphhopper_route():
     # 주소 입력이면 위도/경도로 변환
     if "," not in start:
         lat, lon = geocode_address(start)
-        if not lat:
+        if lat is None:  # 위도 0.0도 올바른 값
             return jsonify({"error": f"출발지 주소를 찾을 수 없음: {start}"}), 400
         start = f"{lat},{lon}"
 
     if "," not in end:
         lat, lon = geocode_address(end)
-        if not lat:
+        if lat is None:
             return jsonify({"error": f"도착지 주소를 찾을 수 없음: {end}"}), 400
         end = f"{lat},{lon}"
 
-    url = f"https://graphhopper.com/api/1/route?point={start}&point={end}&vehicle={vehicle}&locale=ko&calc_points=true&key={GRAPHHOPPER_KEY}"
+    url = graphhopper_url(start, end, vehicle)
+    zoom, full = polyline_args(request.args)
 
     try:
-        resp = requests.get(url)
+        key = graphhopper_cache_key(start, end, vehicle)
+        cached = route_cache.get("graphhopper", key)
+        if cached is not None:
+            return jsonify(display_points(cached, zoom, full))
+
+        resp = http_client.get("graphhopper", url)
         data = resp.json()
         if "paths" in data:
-            path = data["paths"][0]
-            return jsonify({
-                "distance": path.get("distance"),
-                "time": path.get("time"),
-                "points": path.get("points")
-            })
+            path = format_graphhopper_path(data)
+            route_cache.set("graphhopper", key, path)
+            return jsonify(display_points(path, zoom, full))
         return jsonify({"error": "경로를 찾을 수 없음", "details": data}), 500
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -491,6 +1260,37 @@ def graphhopper_route():
 # ==============================
 # 🔹 OpenTripPlanner 경로 탐색 API (대중교통)
 # ==============================
+def otp_params(from_lat, from_lon, to_lat, to_lon, date, time):
+    return {
+        "fromPlace": f"{from_lat},{from_lon}",
+        "toPlace": f"{to_lat},{to_lon}",
+        "mode": "TRANSIT,WALK",
+        "date": date,
+        "time": time,
+        "maxWalkDistance": 1000
+    }
+
+def format_otp_plan(data):
+    itineraries = data["plan"].get("itineraries", [])
+    results = []
+    for itin in itineraries:
+        legs = []
+        for leg in itin.get("legs", []):
+            legs.append({
+                "mode": leg.get("mode"),
+                "startTime": leg.get("startTime"),
+                "endTime": leg.get("endTime"),
+                "from": leg.get("from", {}).get("name"),
+                "to": leg.get("to", {}).get("name"),
+                "distance": leg.get("distance"),
+                "route": leg.get("route")
+            })
+        results.append({
+            "duration": itin.get("duration"),
+            "legs": legs
+        })
+    return results
+
 @app.route("/api/otp_route", methods=["GET"])
 def otp_route():
     from_addr = request.args.get("from")  # 주소 또는 "위도,경도"
@@ -512,56 +1312,214 @@ def otp_route():
     else:
         to_lat, to_lon = map(str, to_addr.split(","))
 
-    if not all([from_lat, from_lon, to_lat, to_lon]):
+    if any(value in (None, "") for value in (from_lat, from_lon, to_lat, to_lon)):  # 0.0은 올바른 좌표
         return jsonify({"error": "주소를 위도/경도로 변환할 수 없음"}), 400
 
-    params = {
-        "fromPlace": f"{from_lat},{from_lon}",
-        "toPlace": f"{to_lat},{to_lon}",
-        "mode": "TRANSIT,WALK",
-        "date": date,
-        "time": time,
-        "maxWalkDistance": 1000
-    }
+    params = otp_params(from_lat, from_lon, to_lat, to_lon, date, time)
 
     try:
-        response = requests.get(OTP_SERVER_URL, params=params)
+        key = otp_cache_key((from_lat, from_lon), (to_lat, to_lon), date, time)
+        cached = route_cache.get("otp", key)
+        if cached is not None:
+            return jsonify(cached)
+
+        response = http_client.get("otp", OTP_SERVER_URL, params=params)
         if response.status_code != 200:
             return jsonify({"error": "OTP 서버 호출 실패", "status": response.status_code, "text": response.text}), 500
         data = response.json()
         if "plan" in data:
-            itineraries = data["plan"].get("itineraries", [])
-            results = []
-            for itin in itineraries:
-                legs = []
-                for leg in itin.get("legs", []):
-                    legs.append({
-                        "mode": leg.get("mode"),
-                        "startTime": leg.get("startTime"),
-                        "endTime": leg.get("endTime"),
-                        "from": leg.get("from", {}).get("name"),
-                        "to": leg.get("to", {}).get("name"),
-                        "distance": leg.get("distance"),
-                        "route": leg.get("route")
-                    })
-                results.append({
-                    "duration": itin.get("duration"),
-                    "legs": legs
-                })
-            return jsonify(results)
+            plan = format_otp_plan(data)
+            route_cache.set("otp", key, plan)
+            return jsonify(plan)
         return jsonify({"error": "대중교통 경로를 찾을 수 없음", "details": data}), 500
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 # ==============================
-# 🚦 교통 기능 종료
+# 🔹 통합 경로 검색 API (traffic.html)
+# /api/routes?from=&to=&vehicles=car,bike,foot&date=&time=&stream=1&zoom=&full=1
+# 출발지/도착지는 한 번만 지오코딩하고, GraphHopper(이동 수단별)와
+# OTP(date, time이 있을 때)를 동시에 호출합니다.
+# 제공자마다 마감 시간이 있어서 느린 쪽이 전체 응답을 붙잡지 않습니다.
+# - 기본: 모두 끝나거나 마감되면 소요 시간 순으로 합친 결과
+#   {"from": [lat, lng], "to": [lat, lng], "routes": [...], "errors": [...]}
+# - stream=1: NDJSON. 첫 줄 {"from", "to"}, 이후 경로 또는 오류가 도착하는 대로 한 줄씩
+# 경로 항목: {"provider", "mode", "duration_s", "distance_m", "points" 또는 "legs"}
 # ==============================
+ROUTE_VEHICLES = ("car", "bike", "foot")
+ROUTE_DEADLINES = {"graphhopper": 8, "otp": 12}  # 제공자별 마감 시간(초)
+
+route_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="routes")
+
+def route_error(provider, mode, message):
+    return {"provider": provider, "mode": mode, "error": message}
+
+def graphhopper_path(data):
+    """GraphHopper 응답 → format_graphhopper_path 결과. 경로가 없으면 ValueError"""
+    if "paths" not in data:
+        raise ValueError(data.get("message") or "경로를 찾을 수 없음")
+    return format_graphhopper_path(data)
+
+def otp_plan(data):
+    """OTP 응답 → format_otp_plan 결과. 경로가 없으면 ValueError"""
+    if "plan" not in data:
+        raise ValueError("대중교통 경로를 찾을 수 없음")
+    return format_otp_plan(data)
+
+def graphhopper_options(path, vehicle):
+    """format_graphhopper_path 결과 → 경로 항목 목록"""
+    return [{
+        "provider": "graphhopper",
+        "mode": vehicle,
+        "duration_s": round((path["time"] or 0) / 1000),
+        "distance_m": path["distance"],
+        "points": path["points"]
+    }]
+
+def otp_options(plan):
+    """format_otp_plan 결과 → 경로 항목 목록 (일정마다 하나)"""
+    return [{
+        "provider": "otp",
+        "mode": "transit",
+        "duration_s": itin["duration"],
+        "distance_m": sum(leg["distance"] or 0 for leg in itin["legs"]),
+        "legs": itin["legs"]
+    } for itin in plan]
+
+def merge_routes(start, end, items):
+    """경로는 소요 시간 순으로, 오류는 따로"""
+    routes = [item for item in items if "error" not in item]
+    routes.sort(key=lambda item: item["duration_s"] if item["duration_s"] is not None else float("inf"))
+    return {
+        "from": list(start),
+        "to": list(end),
+        "routes": routes,
+        "errors": [item for item in items if "error" in item]
+    }
 
-from flask import Flask, jsonify, request, render_template
-from flask_cors import CORS
-import google.generativeai as genai
-import os, json, re
+def route_request_args(args):
+    """(from, to, 이동 수단 목록, date, time) 또는 오류 메시지 문자열"""
+    from_addr, to_addr = args.get("from"), args.get("to")
+    if not from_addr or not to_addr:
+        return "from과 to 파라미터 필요"
+    vehicles = [v for v in args.get("vehicles", ",".join(ROUTE_VEHICLES)).split(",") if v in ROUTE_VEHICLES]
+    date, time_of_day = args.get("date"), args.get("time")
+    if not vehicles and not (date and time_of_day):
+        return "vehicles(car, bike, foot) 또는 date와 time 필요"
+    return from_addr, to_addr, vehicles, date, time_of_day
+
+def resolve_route_point(value):
+    """"위도,경도" 또는 주소 → (lat, lng). 못 찾으면 None"""
+    if "," in value:
+        point = parse_point(*value.split(",", 1))
+        if point is not None:
+            return point
+    lat, lng = geocode_address(value)
+    return (float(lat), float(lng)) if lat is not None else None
+
+def fetch_graphhopper_options(start, end, vehicle, deadline=None):
+    key = graphhopper_cache_key(start, end, vehicle)
+    path = route_cache.get("graphhopper", key)
+    if path is None:
+        url = graphhopper_url(f"{start[0]},{start[1]}", f"{end[0]},{end[1]}", vehicle)
+        path = graphhopper_path(http_client.get("graphhopper", url, deadline=deadline).json())
+        route_cache.set("graphhopper", key, path)
+    return graphhopper_options(path, vehicle)
+
+def fetch_otp_options(start, end, date, time_of_day, deadline=None):
+    key = otp_cache_key(start, end, date, time_of_day)
+    plan = route_cache.get("otp", key)
+    if plan is None:
+        response = http_client.get(
+            "otp", OTP_SERVER_URL, params=otp_params(*start, *end, date, time_of_day), deadline=deadline
+        )
+        if response.status_code != 200:
+            raise ValueError(f"OTP 서버 호출 실패 ({response.status_code})")
+        plan = otp_plan(response.json())
+        route_cache.set("otp", key, plan)
+    return otp_options(plan)
+
+def iter_with_deadlines(executor, jobs):
+    """jobs: [(label, 마감 시간(초), fn)]를 동시에 실행하고
+    끝나거나 마감되는 대로 (label, 결과, 오류 메시지)를 내보냄"""
+    started = time.monotonic()
+    futures = {executor.submit(fn): (label, started + deadline) for label, deadline, fn in jobs}
+    pending = set(futures)
+    try:
+        while pending:
+            timeout = max(0, min(futures[f][1] for f in pending) - time.monotonic())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                label = futures[future][0]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    yield label, None, str(e)
+                else:
+                    yield label, result, None
+            now = time.monotonic()
+            for future in [f for f in pending if futures[f][1] <= now]:
+                pending.discard(future)
+                future.cancel()  # 이미 실행 중이면 결과만 버림 (실행 중인 호출은 각 fn이 마감 시간에 맞춘 타임아웃으로 끝냄)
+                yield futures[future][0], None, "시간 초과"
+    finally:
+        for future in pending:  # 클라이언트가 스트림을 끊은 경우: 아직 시작 안 한 작업은 실행하지 않음
+            future.cancel()
+
+def iter_route_results(start, end, vehicles, date, time_of_day):
+    """모든 제공자를 동시에 호출하고, 끝나거나 마감되는 대로 경로/오류 항목을 내보냄
+    업스트림 호출 타임아웃도 마감 시간에 맞춰 줄여서, 마감된 호출이 route_executor 스레드를 계속 붙잡지 않게 함"""
+    started = time.monotonic()
+    gh_deadline, otp_deadline = started + ROUTE_DEADLINES["graphhopper"], started + ROUTE_DEADLINES["otp"]
+    jobs = [(("graphhopper", vehicle), ROUTE_DEADLINES["graphhopper"],
+             lambda v=vehicle: fetch_graphhopper_options(start, end, v, gh_deadline))
+            for vehicle in vehicles]
+    if date and time_of_day:
+        jobs.append((("otp", "transit"), ROUTE_DEADLINES["otp"],
+                     lambda: fetch_otp_options(start, end, date, time_of_day, otp_deadline)))
+
+    for (provider, mode), options, error in iter_with_deadlines(route_executor, jobs):
+        if error is None:
+            yield from options
+        else:
+            yield route_error(provider, mode, error)
+
+@app.route("/api/routes", methods=["GET"])
+def routes():
+    parsed = route_request_args(request.args)
+    if isinstance(parsed, str):
+        return jsonify({"error": parsed}), 400
+    from_addr, to_addr, vehicles, date, time_of_day = parsed
+
+    # 출발지/도착지 지오코딩은 한 번씩만 (동시에)
+    start_future = route_executor.submit(resolve_route_point, from_addr)
+    end = resolve_route_point(to_addr)
+    start = start_future.result()
+    if start is None:
+        return jsonify({"error": f"출발지 주소를 찾을 수 없음: {from_addr}"}), 400
+    if end is None:
+        return jsonify({"error": f"도착지 주소를 찾을 수 없음: {to_addr}"}), 400
+
+    zoom, full = polyline_args(request.args)
+    results = (display_points(item, zoom, full)
+               for item in iter_route_results(start, end, vehicles, date, time_of_day))
+    if request.args.get("stream") != "1":
+        return jsonify(merge_routes(start, end, list(results)))
+
+    def ndjson():
+        yield json.dumps({"from": list(start), "to": list(end)}) + "\n"
+        for item in results:
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    return Response(
+        stream_with_context(ndjson()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
+# ==============================
+# 🚦 교통 기능 종료
+# ==============================
 
 CORS(app)
 
@@ -569,7 +1527,7 @@ CORS(app)
 # 🔹 API Keys
 # ==============================
 gemini_key = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=gemini_key)
+configure_gemini()
 
 # ==============================
 # 🔹 기본 페이지
@@ -586,28 +1544,21 @@ def schedule():
 # ==============================
 # 🔹 여행 일정 생성 API
 # ==============================
-@app.route("/api/plan_trip", methods=["POST"])
-def plan_trip():
-    """
-    사용자 입력 JSON 예시:
-    {
-        "places": ["서울", "부산"],
-        "days": 3,
-        "budget": 300000
-    }
-    """
+ITINERARY_SCHEMA = {"day": int, "schedule": list}
 
-    data = request.get_json()
-    places = data.get("places", [])
-    days = data.get("days", 1)
-    budget = data.get("budget", None)   # 🔥 원화 기반 예산
+def parse_itinerary(text):
+    return parse_array(text, ITINERARY_SCHEMA)
 
-    if not places:
-        return jsonify({"error": "여행지를 하나 이상 입력하세요."}), 400
+def plan_scope(places, days, budget):
+    """일정은 여행지 집합과 기간이 같고 예산이 비슷할 때(유효숫자 2자리)만 다른 요청의 결과를 씀"""
+    try:
+        budget = f"{float(budget):.2g}"
+    except (TypeError, ValueError):
+        budget = ""
+    return f"{days}|{budget}|{set_key(places)}"
 
-    # ==============================
-    # 🔹 Gemini 프롬프트
-    # ==============================
+def build_plan_prompt(places, days, budget):
+    """일정 생성용 Gemini 프롬프트"""
     prompt_places = ", ".join(places)
     prompt = f"""
 사용자가 입력한 여행지: {prompt_places}
@@ -632,14 +1583,34 @@ def plan_trip():
   }}
 ]
 """
+    return prompt
 
-    try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
+@app.route("/api/plan_trip", methods=["POST"])
+def plan_trip():
+    """
+    사용자 입력 JSON 예시:
+    {
+        "places": ["서울", "부산"],
+        "days": 3,
+        "budget": 300000
+    }
+    """
 
-        text = response.text.strip().replace("\n", " ").replace("'", '"')
-        match = re.search(r'\[.*\]', text, re.DOTALL)
-        itinerary = json.loads(match.group(0)) if match else []
+    data = request.get_json()
+    places = data.get("places", [])
+    days = data.get("days", 1)
+    budget = data.get("budget", None)   # 🔥 원화 기반 예산
+
+    if not places:
+        return jsonify({"error": "여행지를 하나 이상 입력하세요."}), 400
+
+    prompt = build_plan_prompt(places, days, budget)
+
+    try:
+        itinerary = cached_generate(
+            "plan_trip", cache_key(places, days, budget), prompt, parse_itinerary,
+            similar={"places": places}, scope=plan_scope(places, days, budget),
+        )
 
         # 🔥 이미지 관련 로직 완전 삭제됨
 
@@ -660,8 +1631,210 @@ def plan_trip():
         ])
 
 
+# ==============================
+# 🔹 여행 일정 생성 API (스트리밍)
+# 응답 형식: NDJSON (한 줄에 하루치 {"day": n, "schedule": [...]})
+# Gemini 출력을 스트리밍으로 받으면서 하루치 객체가 완성될 때마다 바로 보냅니다.
+# 실패하면 {"error": "..."} 줄을 보내고 끝냅니다.
+# ==============================
+@app.route("/api/plan_trip/stream", methods=["POST"])
+def plan_trip_stream():
+    data = request.get_json()
+    places = data.get("places", [])
+    days = data.get("days", 1)
+    budget = data.get("budget", None)
+
+    if not places:
+        return jsonify({"error": "여행지를 하나 이상 입력하세요."}), 400
+
+    key = cache_key(places, days, budget)
+    similar, scope = {"places": places}, plan_scope(places, days, budget)
+    prompt = build_plan_prompt(places, days, budget)
+
+    def ndjson(obj):
+        return json.dumps(obj, ensure_ascii=False) + "\n"
+
+    def stream():
+        cached, _ = lookup_cached("plan_trip", key, similar, scope)
+        if cached is not None:
+            for day in cached:
+                yield ndjson(day)
+            return
+
+        itinerary = []
+        try:
+            model = genai.GenerativeModel("gemini-2.5-flash")
+            parser = JsonArrayStream(ITINERARY_SCHEMA)
+            with resilience.call("gemini", gemini_failure):
+                chunks = model.generate_content(
+                    prompt, stream=True, request_options={"timeout": GEMINI_TIMEOUT}
+                )
+                text = []
+                for chunk in chunks:
+                    text.append(chunk.text)
+                    for day in parser.feed(chunk.text):
+                        itinerary.append(day)
+                        yield ndjson(day)
+            metrics.observe_llm(prompt, "".join(text), mode="stream")
+        except Exception as e:
+            yield ndjson({"error": str(e)})
+            return
+
+        if itinerary:
+            store_cached("plan_trip", key, itinerary, similar, scope)
+        else:
+            yield ndjson({"error": "AI 일정 생성 실패"})
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ==============================
+# 🔹 여행 묶음 API (항공권 + 숙소 + 일정)
+# air.html / hotel.html / schedule.html을 차례로 부르지 않고 한 번에 받습니다.
+# IATA 코드는 한 번만 변환하고, 세 가지를 동시에 실행합니다 (각자 마감 시간).
+# 전체 소요 시간은 가장 느린 한 가지 정도입니다.
+#
+# 요청 JSON: {"from": "서울", "to": "파리", "depart_date": "2025-05-01",
+#            "return_date": "2025-05-05", "budget": 1500000}
+#   (선택) "days": 기본은 출발일~귀국일, "places": 기본은 [to]
+# 응답: {"flights": {...}, "hotels": {...}, "itinerary": {...}, "errors": {...}}
+# ?stream=1 이면 NDJSON으로 끝나는 대로 한 줄씩 {"leg": "flights", ...}
+# ==============================
+TRIP_BUNDLE_LEGS = ("flights", "hotels", "itinerary")
+TRIP_BUNDLE_DEADLINES = {"flights": 15, "hotels": 10, "itinerary": 30}  # 초
+
+bundle_executor = ThreadPoolExecutor(max_workers=12, thread_name_prefix="trip-bundle")
+
+def trip_days(depart_date, return_date):
+    """출발일~귀국일 → 여행 일수 (날짜가 없거나 잘못되면 1)"""
+    try:
+        return max(1, (datetime.date.fromisoformat(return_date) - datetime.date.fromisoformat(depart_date)).days + 1)
+    except (TypeError, ValueError):
+        return 1
+
+def trip_bundle_args(data):
+    """요청 JSON → (from, to, depart_date, return_date, days, budget, places). 잘못된 값이면 ValueError"""
+    origin, destination = data.get("from"), data.get("to")
+    if not origin or not destination:
+        raise ValueError("출발지와 도착지를 입력하세요.")
+    depart_date, return_date = data.get("depart_date"), data.get("return_date")
+    if not depart_date:
+        raise ValueError("depart_date 필요")
+    days = data.get("days") or trip_days(depart_date, return_date)
+    places = data.get("places") or [destination]
+    return origin, destination, depart_date, return_date, days, data.get("budget"), places
+
+def bundle_flights(from_code, to_code, origin, destination, depart_date, return_date, deadline=None):
+    if not from_code or not to_code:
+        raise ValueError("도시명을 IATA 코드로 변환할 수 없습니다.")
+    offers, age, status = get_flight_offers(from_code, to_code, depart_date, return_date, deadline)
+    return {
+        "from_code": from_code,
+        "to_code": to_code,
+        "data": [{"from": origin, "to": destination, **offer} for offer in offers],
+        "age": int(age),
+        "cache": status,
+    }
+
+def bundle_hotels(city_code, deadline=None):
+    """첫 페이지만 (다음 페이지는 /api/hotel?city=...&cursor=next_cursor)"""
+    if not city_code:
+        raise ValueError("도시명을 IATA 코드로 변환할 수 없습니다.")
+    hotels, age, status = get_hotel_list(city_code, deadline)
+    items, next_cursor, total = hotels.page(HOTEL_PAGE_SIZE)
+    return {
+        "city": city_code,
+        "data": items,
+        "total": total,
+        "next_cursor": next_cursor,
+        "age": int(age),
+        "cache": status,
+    }
+
+def bundle_itinerary(places, days, budget, deadline=None):
+    itinerary = cached_generate(
+        "plan_trip", cache_key(places, days, budget), build_plan_prompt(places, days, budget),
+        parse_itinerary, similar={"places": places}, scope=plan_scope(places, days, budget),
+        timeout=max(1, deadline - time.monotonic()) if deadline is not None else None,
+    )
+    if not itinerary:
+        raise ValueError("AI 일정 생성 실패")
+    return {"data": itinerary}
+
+def bundle_leg(leg, result=None, error=None):
+    return {"leg": leg, "error": error} if error is not None else {"leg": leg, **result}
+
+def merge_trip_bundle(origin, destination, days, items):
+    bundle = {"from": origin, "to": destination, "days": days, "errors": {}}
+    for leg in TRIP_BUNDLE_LEGS:
+        bundle[leg] = None
+    for item in items:
+        item = dict(item)
+        leg = item.pop("leg")
+        if "error" in item:
+            bundle["errors"][leg] = item["error"]
+        else:
+            bundle[leg] = item
+    return bundle
+
+def bundle_codes(codes, deadline):
+    """IATA 변환 Future의 결과를 마감 시간까지만 기다림 (못 받으면 작업 스레드를 바로 놓아줌)"""
+    try:
+        return codes.result(timeout=max(0, deadline - time.monotonic()))
+    except FutureTimeoutError:
+        raise TimeoutError("IATA 코드 변환 시간 초과")
+
+def iter_trip_bundle(origin, destination, depart_date, return_date, days, budget, places):
+    """세 가지를 동시에 실행하고 끝나거나 마감되는 대로 {"leg": ..., ...}를 내보냄
+    각 작업의 업스트림 호출도 마감 시간 안에 끝나도록 타임아웃을 줄임 (마감된 작업이 스레드를 붙잡지 않게)"""
+    started = time.monotonic()
+    deadlines = {leg: started + seconds for leg, seconds in TRIP_BUNDLE_DEADLINES.items()}
+    # 항공권과 숙소가 같이 기다리는 IATA 변환 (먼저 넣어서 작업들보다 먼저 실행됨)
+    codes = bundle_executor.submit(get_iata_codes, origin, destination)
+    jobs = [
+        ("itinerary", TRIP_BUNDLE_DEADLINES["itinerary"],
+         lambda: bundle_itinerary(places, days, budget, deadlines["itinerary"])),
+        ("flights", TRIP_BUNDLE_DEADLINES["flights"],
+         lambda: bundle_flights(*bundle_codes(codes, deadlines["flights"]), origin, destination,
+                                depart_date, return_date, deadlines["flights"])),
+        ("hotels", TRIP_BUNDLE_DEADLINES["hotels"],
+         lambda: bundle_hotels(bundle_codes(codes, deadlines["hotels"])[1], deadlines["hotels"])),
+    ]
+    for leg, result, error in iter_with_deadlines(bundle_executor, jobs):
+        yield bundle_leg(leg, result, error)
+
+@app.route("/api/trip_bundle", methods=["POST"])
+def trip_bundle():
+    try:
+        origin, destination, depart_date, return_date, days, budget, places = \
+            trip_bundle_args(request.get_json() or {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    results = iter_trip_bundle(origin, destination, depart_date, return_date, days, budget, places)
+    if request.args.get("stream") != "1":
+        return jsonify(merge_trip_bundle(origin, destination, days, results))
+
+    def ndjson():
+        yield json.dumps({"from": origin, "to": destination, "days": days}, ensure_ascii=False) + "\n"
+        for item in results:
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    return Response(
+        stream_with_context(ndjson()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ==============================
 # 🔹 서버 실행
+# 개발용: python app.py
+# 운영용(async): uvicorn asgi:app  → asgi.py 참고
 # ==============================
 if __name__ == "__main__":
     app.run(debug=True)
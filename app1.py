@@ -1,4 +1,5 @@
- from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template
+from catalogue import Catalogue
 
 app = Flask(__name__)
 
@@ -8,6 +9,9 @@ travel_data = [
     {"name": "부산 해운대", "region": "한국", "theme": "액티비티", "description": "해수욕과 다양한 해양 스포츠"}
 ]
 
+# 지역/테마 역색인 (catalogue.py)
+catalogue = Catalogue(travel_data)
+
 # 메인 페이지 (index.html 반환)
 @app.route('/')
 def index():
@@ -21,7 +25,7 @@ def recommend():
     theme = data.get('theme', '')
 
     # 조건 일치하는 데이터만 필터링
-    results = [t for t in travel_data if t['region'] == country and t['theme'] == theme]
+    results = catalogue.filter(region=country, theme=theme)
 
     return jsonify(results)  # JSON 응답
 
@@ -0,0 +1,685 @@
+# ==============================
+# 🔹 ASGI 서빙 모드 (운영용)
+# ==============================
+# 실행 예:  uvicorn asgi:app --host 0.0.0.0 --port 8000
+# 필요 패키지: uvicorn, httpx, asgiref
+#
+# 요청 시간 대부분이 Gemini/Unsplash/Amadeus/GraphHopper/OTP/Nominatim 응답을
+# 기다리는 시간이라서, 이 API들은 async 핸들러로 처리합니다.
+# 기다리는 동안 스레드를 붙잡지 않으므로 한 프로세스가 느린 LLM 요청 수백 개를
+# 동시에 들고 있을 수 있습니다.
+# URL과 JSON 형식은 app.py와 같고, 프롬프트/파싱/캐시도 app.py의 것을 그대로 씁니다.
+# 여기에 없는 경로(페이지, 통계 등)는 기존 Flask 앱으로 넘깁니다.
+#
+# Amadeus SDK(항공편 검색, 도시 검색)는 동기 라이브러리라서 스레드에서 실행합니다.
+# (항공편 검색은 캐시가 대부분을 받아 줍니다.)
+
+import asyncio
+import json
+import os
+import time
+from urllib.parse import parse_qs
+
+import google.generativeai as genai
+from asgiref.wsgi import WsgiToAsgi
+
+import app as core
+import http_client
+import metrics
+import resilience
+from cache import cache_key
+from llm_json import JsonArrayStream
+
+CORS_HEADERS = {"Access-Control-Allow-Origin": "*"}  # flask_cors 기본값과 동일
+
+
+# ==============================
+# 🔹 요청 / 응답
+# ==============================
+class Request:
+    def __init__(self, scope, body):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        query = parse_qs(scope.get("query_string", b"").decode("utf-8"))
+        self.args = {key: values[0] for key, values in query.items()}
+        self._body = body
+
+    def get_json(self):
+        try:
+            return json.loads(self._body) if self._body else None
+        except ValueError:
+            return None
+
+
+class JSONResponse:
+    def __init__(self, payload, status=200, headers=None):
+        self.body = json.dumps(payload).encode("utf-8")
+        self.status = status
+        self.headers = dict(headers or {})
+
+
+class NDJSONResponse:
+    """async generator가 내는 객체를 한 줄씩 보내는 응답"""
+
+    def __init__(self, items, headers=None):
+        self.items = items
+        self.headers = dict(headers or {})
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def send_response(send, response):
+    if isinstance(response, NDJSONResponse):
+        headers = {
+            "content-type": "application/x-ndjson",
+            "cache-control": "no-cache",
+            **response.headers,
+        }
+        await send({"type": "http.response.start", "status": 200, "headers": _encode(headers)})
+        async for item in response.items:
+            line = json.dumps(item, ensure_ascii=False) + "\n"
+            await send({"type": "http.response.body", "body": line.encode("utf-8"), "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+        return
+
+    headers = {
+        "content-type": "application/json",
+        "content-length": str(len(response.body)),
+        **response.headers,
+    }
+    await send({"type": "http.response.start", "status": response.status, "headers": _encode(headers)})
+    await send({"type": "http.response.body", "body": response.body})
+
+
+def _encode(headers):
+    merged = {**{k.lower(): v for k, v in CORS_HEADERS.items()}, **headers}
+    return [(k.lower().encode("latin-1"), str(v).encode("latin-1")) for k, v in merged.items()]
+
+
+# ==============================
+# 🔹 비동기 업스트림 호출
+# ==============================
+async def generate_async(prompt, parse):
+    """app.generate의 비동기 버전"""
+    model = genai.GenerativeModel("gemini-2.5-flash")
+    async with resilience.acall("gemini", core.gemini_failure):
+        response = await model.generate_content_async(
+            prompt, request_options={"timeout": core.GEMINI_TIMEOUT}
+        )
+    metrics.observe_llm(prompt, response.text)
+    return parse(response.text)
+
+
+async def cached_generate_async(namespace, key, prompt, parse, similar=None, scope=""):
+    """app.cached_generate의 비동기 버전 (같은 캐시 사용)"""
+    cached, _ = core.lookup_cached(namespace, key, similar, scope)
+    if cached is not None:
+        return cached
+
+    result = await generate_async(prompt, parse)
+    if result:
+        core.store_cached(namespace, key, result, similar, scope)
+    return result
+
+
+async def fetch_unsplash_image_async(query):
+    key = cache_key(query)
+    cached = core.llm_cache.get("unsplash", key)
+    if cached is not None:
+        return cached
+
+    try:
+        res = await asyncio.wait_for(
+            http_client.aget(
+                "unsplash",
+                f"{core.UNSPLASH_API_URL}/search/photos",
+                params={"query": query, "client_id": core.unsplash_key, "per_page": 1},
+            ),
+            timeout=core.UNSPLASH_TIMEOUT,
+        )
+        if res.status_code != 200:
+            return core.PLACEHOLDER_IMAGE
+        results = res.json().get("results")
+        if not results:
+            return core.PLACEHOLDER_IMAGE
+        image_url = results[0]["urls"]["regular"]
+    except Exception:
+        return core.PLACEHOLDER_IMAGE
+
+    core.llm_cache.set("unsplash", key, image_url)
+    return image_url
+
+
+async def geocode_async(address):
+    """로컬 인덱스는 바로, Nominatim fallback(속도 제한 대기 포함)은 스레드에서"""
+    hit = core.geocoder.local.lookup(address)
+    if hit is not None:
+        return hit
+    return await asyncio.to_thread(core.geocode_address, address)
+
+
+async def resolve_point(value):
+    """주소 또는 "위도,경도" → (lat, lon). 변환 실패 시 (None, None)"""
+    if "," in value:
+        lat, lon = value.split(",", 1)
+        return lat, lon
+    return await geocode_async(value)
+
+
+async def recommend_places_async(theme, continent, subregion, country):
+    """app.recommend_places의 비동기 버전 (카탈로그 → 캐시 → Gemini)"""
+    places = core.destination_catalogue.pick(theme, continent, subregion, country, k=core.RECOMMEND_COUNT)
+    if places:
+        return places, "catalogue"
+
+    key = cache_key(theme, continent, subregion, country)
+    similar, scope = core.recommend_fields(theme, continent, subregion, country)
+    cached, tier = core.lookup_cached("recommend", key, similar, scope)
+    if cached is not None:
+        return cached, tier
+
+    try:
+        places = await generate_async(
+            core.build_recommend_prompt(theme, continent, subregion, country), core.parse_recommendations
+        )
+    except resilience.UpstreamUnavailable:
+        return core.DEFAULT_RECOMMENDATIONS, "fallback"
+    if not places:
+        return core.DEFAULT_RECOMMENDATIONS, "fallback"
+    core.store_cached("recommend", key, places, similar, scope)
+    await asyncio.to_thread(core.destination_catalogue.learn, places, theme, continent, subregion)
+    return places, "llm"
+
+
+# ==============================
+# 🔹 API 핸들러 (app.py와 같은 URL / JSON)
+# ==============================
+async def recommend(req):
+    data = req.get_json() or {}
+    theme = data.get("theme")
+    continent = data.get("continent")
+    subregion = data.get("subregion")
+    country = data.get("country")
+
+    try:
+        travel_data, tier = await recommend_places_async(theme, continent, subregion, country)
+        travel_data = [dict(place) for place in travel_data]
+
+        images = await asyncio.gather(*[
+            fetch_unsplash_image_async(f"{place.get('name', '')} {place.get('country', '')}")
+            for place in travel_data
+        ])
+        for place, image in zip(travel_data, images):
+            place["image"] = image
+        return JSONResponse(travel_data, headers={"X-Recommend-Tier": tier})
+
+    except Exception as e:
+        return JSONResponse([{
+            "name": "추천 여행지",
+            "country": "해외",
+            "description": f"⚠ AI 호출 실패: {e}",
+            "image": "https://via.placeholder.com/400x250"
+        }])
+
+
+async def get_city_info(req):
+    data = req.get_json() or {}
+    city = data.get("city")
+    country = data.get("country")
+
+    if not city or not country:
+        return JSONResponse({"error": "city와 country 필수"}, 400)
+
+    stored = core.city_store.get(city, country)
+    if stored:
+        return JSONResponse(core.stored_city_info(stored))
+
+    image_task = asyncio.ensure_future(fetch_unsplash_image_async(f"{city} {country}"))
+    try:
+        # 같은 시간대의 다른 도시 요청과 묶어서 Gemini 한 번 (app.city_info_batcher)
+        description = await asyncio.wrap_future(core.city_description_future(city, country)) or ""
+        image_url = await image_task
+        return JSONResponse({
+            "name": city,
+            "country": country,
+            "description": description,
+            "image": image_url
+        })
+
+    except Exception as e:
+        image_task.cancel()
+        return JSONResponse({
+            "name": city,
+            "country": country,
+            "description": f"⚠ AI 호출 실패: {e}",
+            "image": "https://via.placeholder.com/400x250"
+        })
+
+
+async def plan_trip(req):
+    data = req.get_json() or {}
+    places = data.get("places", [])
+    days = data.get("days", 1)
+    budget = data.get("budget", None)
+
+    if not places:
+        return JSONResponse({"error": "여행지를 하나 이상 입력하세요."}, 400)
+
+    prompt = core.build_plan_prompt(places, days, budget)
+    try:
+        itinerary = await cached_generate_async(
+            "plan_trip", cache_key(places, days, budget), prompt, core.parse_itinerary,
+            similar={"places": places}, scope=core.plan_scope(places, days, budget),
+        )
+        return JSONResponse(itinerary)
+
+    except Exception as e:
+        return JSONResponse([
+            {
+                "day": 1,
+                "schedule": [{"time": "09:00", "activity": "AI 일정 생성 실패"}],
+                "error": str(e)
+            }
+        ])
+
+
+async def plan_trip_stream(req):
+    data = req.get_json() or {}
+    places = data.get("places", [])
+    days = data.get("days", 1)
+    budget = data.get("budget", None)
+
+    if not places:
+        return JSONResponse({"error": "여행지를 하나 이상 입력하세요."}, 400)
+
+    key = cache_key(places, days, budget)
+    similar, scope = {"places": places}, core.plan_scope(places, days, budget)
+    prompt = core.build_plan_prompt(places, days, budget)
+
+    async def stream():
+        cached, _ = core.lookup_cached("plan_trip", key, similar, scope)
+        if cached is not None:
+            for day in cached:
+                yield day
+            return
+
+        itinerary = []
+        try:
+            model = genai.GenerativeModel("gemini-2.5-flash")
+            parser = JsonArrayStream(core.ITINERARY_SCHEMA)
+            async with resilience.acall("gemini", core.gemini_failure):
+                response = await model.generate_content_async(
+                    prompt, stream=True, request_options={"timeout": core.GEMINI_TIMEOUT}
+                )
+                text = []
+                async for chunk in response:
+                    text.append(chunk.text)
+                    for day in parser.feed(chunk.text):
+                        itinerary.append(day)
+                        yield day
+            metrics.observe_llm(prompt, "".join(text), mode="stream")
+        except Exception as e:
+            yield {"error": str(e)}
+            return
+
+        if itinerary:
+            core.store_cached("plan_trip", key, itinerary, similar, scope)
+        else:
+            yield {"error": "AI 일정 생성 실패"}
+
+    return NDJSONResponse(stream(), headers={"X-Accel-Buffering": "no"})
+
+
+async def iata_codes_async(origin, destination):
+    from_code = core.iata_resolver.resolve_local(origin)
+    to_code = core.iata_resolver.resolve_local(destination)
+    if from_code and to_code:
+        return from_code, to_code
+    return await asyncio.to_thread(core.get_iata_codes, origin, destination)
+
+
+async def search_flight(req):
+    try:
+        data = req.get_json() or {}
+        origin = data.get("from")
+        destination = data.get("to")
+        depart_date = data.get("depart_date")
+        return_date = data.get("return_date")
+
+        if not origin or not destination:
+            return JSONResponse({"error": "출발지와 도착지를 입력하세요."}, 400)
+
+        from_code, to_code = await iata_codes_async(origin, destination)
+        if not from_code or not to_code:
+            return JSONResponse({"error": "도시명을 IATA 코드로 변환할 수 없습니다."}, 400)
+
+        offers, age, status = await asyncio.to_thread(
+            core.get_flight_offers, from_code, to_code, depart_date, return_date
+        )
+        flights = [{"from": origin, "to": destination, **offer} for offer in offers]
+        return JSONResponse(flights, headers={"Age": str(int(age)), "X-Cache": status})
+
+    except core.ResponseError as e:
+        return JSONResponse({"error": str(e)}, 500)
+    except Exception as e:
+        return JSONResponse({"error": f"예외 발생: {e}"}, 500)
+
+
+async def get_hotels(req):
+    try:
+        city, limit, cursor, prefix, chains = core.hotel_page_args(req.args)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, 400)
+
+    try:
+        hotels, age, status = await asyncio.to_thread(core.get_hotel_list, city)
+    except core.HotelFetchError as e:
+        return JSONResponse(e.payload(), 500)
+    except Exception as e:
+        return JSONResponse({"error": f"호텔 API 호출 실패: {e}"}, 500)
+
+    try:
+        items, next_cursor, total = hotels.page(limit, cursor, prefix, chains)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, 400)
+    return JSONResponse(items, headers=core.hotel_page_headers(next_cursor, total, age, status))
+
+
+async def graphhopper_route(req):
+    start = req.args.get("start")
+    end = req.args.get("end")
+    vehicle = req.args.get("vehicle", "car")
+
+    if not start or not end:
+        return JSONResponse({"error": "start와 end 파라미터 필요"}, 400)
+
+    (start_lat, start_lon), (end_lat, end_lon) = await asyncio.gather(
+        resolve_point(start), resolve_point(end)
+    )
+    if start_lat is None:  # 위도 0.0도 올바른 값
+        return JSONResponse({"error": f"출발지 주소를 찾을 수 없음: {start}"}, 400)
+    if end_lat is None:
+        return JSONResponse({"error": f"도착지 주소를 찾을 수 없음: {end}"}, 400)
+
+    url = core.graphhopper_url(f"{start_lat},{start_lon}", f"{end_lat},{end_lon}", vehicle)
+    zoom, full = core.polyline_args(req.args)
+    try:
+        key = core.graphhopper_cache_key((start_lat, start_lon), (end_lat, end_lon), vehicle)
+        cached = core.route_cache.get("graphhopper", key)
+        if cached is not None:
+            return JSONResponse(core.display_points(cached, zoom, full))
+
+        data = (await http_client.aget("graphhopper", url)).json()
+        if "paths" in data:
+            path = core.format_graphhopper_path(data)
+            core.route_cache.set("graphhopper", key, path)
+            return JSONResponse(core.display_points(path, zoom, full))
+        return JSONResponse({"error": "경로를 찾을 수 없음", "details": data}, 500)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, 500)
+
+
+async def otp_route(req):
+    from_addr = req.args.get("from")
+    to_addr = req.args.get("to")
+    date = req.args.get("date")
+    time = req.args.get("time")
+
+    if not all([from_addr, to_addr, date, time]):
+        return JSONResponse({"error": "모든 파라미터 필요"}, 400)
+
+    (from_lat, from_lon), (to_lat, to_lon) = await asyncio.gather(
+        resolve_point(from_addr), resolve_point(to_addr)
+    )
+    if any(value in (None, "") for value in (from_lat, from_lon, to_lat, to_lon)):  # 0.0은 올바른 좌표
+        return JSONResponse({"error": "주소를 위도/경도로 변환할 수 없음"}, 400)
+
+    params = core.otp_params(from_lat, from_lon, to_lat, to_lon, date, time)
+    try:
+        key = core.otp_cache_key((from_lat, from_lon), (to_lat, to_lon), date, time)
+        cached = core.route_cache.get("otp", key)
+        if cached is not None:
+            return JSONResponse(cached)
+
+        response = await http_client.aget("otp", core.OTP_SERVER_URL, params=params)
+        if response.status_code != 200:
+            return JSONResponse(
+                {"error": "OTP 서버 호출 실패", "status": response.status_code, "text": response.text}, 500
+            )
+        data = response.json()
+        if "plan" in data:
+            plan = core.format_otp_plan(data)
+            core.route_cache.set("otp", key, plan)
+            return JSONResponse(plan)
+        return JSONResponse({"error": "대중교통 경로를 찾을 수 없음", "details": data}, 500)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, 500)
+
+
+async def resolve_route_point_async(value):
+    """app.resolve_route_point의 비동기 버전"""
+    if "," in value:
+        point = core.parse_point(*value.split(",", 1))
+        if point is not None:
+            return point
+    lat, lng = await geocode_async(value)
+    return (float(lat), float(lng)) if lat is not None else None
+
+
+async def graphhopper_options_async(start, end, vehicle):
+    key = core.graphhopper_cache_key(start, end, vehicle)
+    path = core.route_cache.get("graphhopper", key)
+    if path is None:
+        url = core.graphhopper_url(f"{start[0]},{start[1]}", f"{end[0]},{end[1]}", vehicle)
+        path = core.graphhopper_path((await http_client.aget("graphhopper", url)).json())
+        core.route_cache.set("graphhopper", key, path)
+    return core.graphhopper_options(path, vehicle)
+
+
+async def otp_options_async(start, end, date, time_of_day):
+    key = core.otp_cache_key(start, end, date, time_of_day)
+    plan = core.route_cache.get("otp", key)
+    if plan is None:
+        params = core.otp_params(*start, *end, date, time_of_day)
+        response = await http_client.aget("otp", core.OTP_SERVER_URL, params=params)
+        if response.status_code != 200:
+            raise ValueError(f"OTP 서버 호출 실패 ({response.status_code})")
+        plan = core.otp_plan(response.json())
+        core.route_cache.set("otp", key, plan)
+    return core.otp_options(plan)
+
+
+async def route_job(provider, mode, coro):
+    """제공자 하나를 마감 시간 안에 호출. 실패해도 오류 항목 목록을 돌려줌"""
+    try:
+        return await asyncio.wait_for(coro, core.ROUTE_DEADLINES[provider])
+    except asyncio.TimeoutError:
+        return [core.route_error(provider, mode, "시간 초과")]
+    except Exception as e:
+        return [core.route_error(provider, mode, str(e))]
+
+
+async def routes(req):
+    parsed = core.route_request_args(req.args)
+    if isinstance(parsed, str):
+        return JSONResponse({"error": parsed}, 400)
+    from_addr, to_addr, vehicles, date, time_of_day = parsed
+
+    start, end = await asyncio.gather(
+        resolve_route_point_async(from_addr), resolve_route_point_async(to_addr)
+    )
+    if start is None:
+        return JSONResponse({"error": f"출발지 주소를 찾을 수 없음: {from_addr}"}, 400)
+    if end is None:
+        return JSONResponse({"error": f"도착지 주소를 찾을 수 없음: {to_addr}"}, 400)
+
+    tasks = [
+        asyncio.ensure_future(route_job("graphhopper", vehicle, graphhopper_options_async(start, end, vehicle)))
+        for vehicle in vehicles
+    ]
+    if date and time_of_day:
+        tasks.append(asyncio.ensure_future(
+            route_job("otp", "transit", otp_options_async(start, end, date, time_of_day))
+        ))
+
+    zoom, full = core.polyline_args(req.args)
+    if req.args.get("stream") != "1":
+        items = [core.display_points(item, zoom, full)
+                 for result in await asyncio.gather(*tasks) for item in result]
+        return JSONResponse(core.merge_routes(start, end, items))
+
+    async def generate():
+        yield {"from": list(start), "to": list(end)}
+        for next_done in asyncio.as_completed(tasks):
+            for item in await next_done:
+                yield core.display_points(item, zoom, full)
+
+    return NDJSONResponse(generate(), headers={"X-Accel-Buffering": "no"})
+
+
+async def bundle_job(leg, coro):
+    """여행 묶음 한 가지를 마감 시간 안에 실행. 실패해도 {"leg": ..., "error": ...}를 돌려줌"""
+    try:
+        return core.bundle_leg(leg, await asyncio.wait_for(coro, core.TRIP_BUNDLE_DEADLINES[leg]))
+    except asyncio.TimeoutError:
+        return core.bundle_leg(leg, error="시간 초과")
+    except Exception as e:
+        return core.bundle_leg(leg, error=str(e))
+
+
+async def trip_bundle(req):
+    try:
+        origin, destination, depart_date, return_date, days, budget, places = \
+            core.trip_bundle_args(req.get_json() or {})
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, 400)
+
+    # 항공권과 숙소가 같이 기다림 (한쪽이 마감돼 취소돼도 다른 쪽은 계속 기다리도록 shield)
+    codes = asyncio.ensure_future(iata_codes_async(origin, destination))
+
+    # 스레드에서 도는 항공권/호텔 조회는 wait_for로 취소되지 않으므로 업스트림 호출 자체에 마감 시간을 넘김
+    started = time.monotonic()
+    flights_deadline = started + core.TRIP_BUNDLE_DEADLINES["flights"]
+    hotels_deadline = started + core.TRIP_BUNDLE_DEADLINES["hotels"]
+
+    async def flights():
+        from_code, to_code = await asyncio.shield(codes)
+        return await asyncio.to_thread(
+            core.bundle_flights, from_code, to_code, origin, destination, depart_date, return_date, flights_deadline
+        )
+
+    async def hotels():
+        return await asyncio.to_thread(core.bundle_hotels, (await asyncio.shield(codes))[1], hotels_deadline)
+
+    async def itinerary():
+        result = await cached_generate_async(
+            "plan_trip", cache_key(places, days, budget), core.build_plan_prompt(places, days, budget),
+            core.parse_itinerary, similar={"places": places}, scope=core.plan_scope(places, days, budget),
+        )
+        if not result:
+            raise ValueError("AI 일정 생성 실패")
+        return {"data": result}
+
+    tasks = [
+        asyncio.ensure_future(bundle_job("itinerary", itinerary())),
+        asyncio.ensure_future(bundle_job("flights", flights())),
+        asyncio.ensure_future(bundle_job("hotels", hotels())),
+    ]
+
+    if req.args.get("stream") != "1":
+        items = await asyncio.gather(*tasks)
+        return JSONResponse(core.merge_trip_bundle(origin, destination, days, items))
+
+    async def generate():
+        try:
+            yield {"from": origin, "to": destination, "days": days}
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks + [codes]:  # 클라이언트가 끊은 경우 남은 작업 취소
+                task.cancel()
+
+    return NDJSONResponse(generate(), headers={"X-Accel-Buffering": "no"})
+
+
+ROUTES = {
+    ("POST", "/recommend"): recommend,
+    ("POST", "/getCityInfo"): get_city_info,
+    ("POST", "/api/plan_trip"): plan_trip,
+    ("POST", "/api/plan_trip/stream"): plan_trip_stream,
+    ("POST", "/search_flight"): search_flight,
+    ("GET", "/api/hotel"): get_hotels,
+    ("GET", "/api/graphhopper_route"): graphhopper_route,
+    ("GET", "/api/otp_route"): otp_route,
+    ("GET", "/api/routes"): routes,
+    ("POST", "/api/trip_bundle"): trip_bundle,
+}
+
+
+# ==============================
+# 🔹 ASGI 앱
+# ==============================
+flask_fallback = WsgiToAsgi(core.app)
+
+# async 핸들러는 스레드를 붙잡지 않으므로 Flask(MAX_CONCURRENT_REQUESTS)보다 넉넉하게
+# (Flask로 넘기는 경로는 app.py의 before_request가 따로 센다)
+ASGI_MAX_CONCURRENT_REQUESTS = int(os.getenv("ASGI_MAX_CONCURRENT_REQUESTS", "512"))
+request_limiter = resilience.ConcurrencyLimiter(ASGI_MAX_CONCURRENT_REQUESTS)
+
+
+def record_request_duration(scope, response, started):
+    metrics.REQUEST_SECONDS.observe(
+        time.perf_counter() - started,
+        route=scope["path"],  # ROUTES에 있는 고정 경로만 여기로 옴
+        method=scope["method"],
+        status=getattr(response, "status", 200),
+    )
+
+
+def upstream_unavailable(e):
+    """app.upstream_unavailable과 같은 응답 (fallback이 없는 핸들러용)"""
+    status = 429 if e.reason == "rate_limited" else 503
+    return JSONResponse({"error": str(e)}, status, headers={"Retry-After": str(e.retry_after)})
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await http_client.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    handler = ROUTES.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+    if handler is None:
+        await flask_fallback(scope, receive, send)
+        return
+
+    started = time.perf_counter()
+    if not request_limiter.try_enter():
+        response = JSONResponse(
+            {"error": "요청이 많아 잠시 후 다시 시도해주세요."}, 503, headers={"Retry-After": "1"}
+        )
+        record_request_duration(scope, response, started)
+        await send_response(send, response)
+        return
+    try:
+        body = await read_body(receive)
+        try:
+            response = await handler(Request(scope, body))
+        except resilience.UpstreamUnavailable as e:
+            response = upstream_unavailable(e)
+        record_request_duration(scope, response, started)  # 스트리밍 응답은 첫 응답까지 (Flask와 같음)
+        await send_response(send, response)
+    finally:
+        request_limiter.exit()
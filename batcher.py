@@ -0,0 +1,100 @@
+# ==============================
+# 🔹 마이크로 배처
+# ==============================
+# 짧은 시간(window) 안에 들어온 요청을 모아 process(items)를 한 번만 호출하고
+# 결과를 기다리던 요청마다 나눠 줍니다.
+# region.html에서 한 나라의 도시를 연달아 누를 때 /getCityInfo마다
+# Gemini를 따로 부르지 않고 한 번의 프롬프트로 묶는 데 씁니다.
+#
+# 사용 예:
+#     batcher = MicroBatcher(describe_cities, key=lambda item: cache_key(*item))
+#     description = batcher.submit(("서울", "한국")).result()
+
+import threading
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """process(items) → {key: 결과}. 결과에 없는 항목은 None으로 끝난다.
+
+    - window초 동안 모으거나 max_batch개가 차면 바로 처리
+    - 같은 키가 대기 중이거나 처리 중이면 그 Future를 같이 기다림
+    """
+
+    def __init__(self, process, key=lambda item: item, window=0.05, max_batch=8):
+        self._process = process
+        self._key = key
+        self.window = window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pending = {}    # key -> (item, Future), 다음 배치에 들어갈 항목
+        self._inflight = {}   # key -> Future, 처리 중인 항목
+        self._timer = None
+        self._stats = {"batches": 0, "items": 0}
+
+    def submit(self, item):
+        key = self._key(item)
+        batch = None
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None and key in self._pending:
+                future = self._pending[key][1]
+            if future is not None:
+                return future
+
+            future = Future()
+            self._pending[key] = (item, future)
+            if len(self._pending) >= self.max_batch:
+                batch = self._take()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if batch:
+            # 꽉 찬 배치는 기다리지 않고 바로 처리 (다음 submit을 막지 않도록 별도 스레드)
+            threading.Thread(target=self._run, args=(batch,), daemon=True).start()
+        return future
+
+    def stats(self):
+        with self._lock:
+            batches, items = self._stats["batches"], self._stats["items"]
+            return {
+                "batches": batches,
+                "items": items,
+                "avg_batch_size": round(items / batches, 2) if batches else 0.0,
+            }
+
+    def _flush(self):
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self._run(batch)
+
+    def _take(self):
+        """대기 중인 항목을 꺼내 처리 중으로 옮김 (호출 시 _lock 보유)"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        for key, (_, future) in batch.items():
+            self._inflight[key] = future
+        if batch:
+            self._stats["batches"] += 1
+            self._stats["items"] += len(batch)
+        return batch
+
+    def _run(self, batch):
+        try:
+            results = self._process([item for item, _ in batch.values()])
+            error = None
+        except Exception as e:
+            results, error = {}, e
+        with self._lock:
+            for key in batch:
+                self._inflight.pop(key, None)
+        for key, (_, future) in batch.items():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results.get(key))
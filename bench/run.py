@@ -0,0 +1,389 @@
+# ==============================
+# 🔹 오프라인 벤치마크
+# ==============================
+# 외부 API 대역 서버(standins.py)를 띄우고 app.py(또는 asgi.py)를 그 서버에 연결한 뒤
+# 엔드포인트별로 동시 접속 수를 바꿔 가며 요청을 보내 p50/p95/p99와 처리량을 잽니다.
+# API 키나 네트워크 없이 돌아가므로 배포 전에 성능 회귀를 확인하는 데 씁니다.
+#
+# 실행 예:
+#   python bench/run.py                                   # 전체 시나리오, 동시 접속 1/8/32
+#   python bench/run.py --scenarios recommend,hotel --concurrency 16 --requests 400
+#   python bench/run.py --unique                          # 매 요청 파라미터를 바꿔 캐시를 피함
+#   python bench/run.py --latency gemini=3000 --error-rate gemini=0.2
+#   python bench/run.py --json before.json                # 결과 저장
+#   python bench/run.py --baseline before.json            # p95가 20% 넘게 나빠지면 종료 코드 1
+#   python bench/run.py --server asgi                     # uvicorn asgi:app
+#
+# 결과 표의 upstream 열은 그 시나리오 동안 대역 서버가 받은 호출 수입니다 (캐시 효과 확인용).
+
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import standins
+
+REPO_DIR = os.path.dirname(standins.BENCH_DIR)
+DEFAULT_CONCURRENCY = "1,8,32"
+DEFAULT_REQUESTS = 200
+DEFAULT_WARMUP = 10
+REQUEST_TIMEOUT = 60
+START_TIMEOUT = 30
+
+SERVERS = {
+    "flask": [sys.executable, "-m", "flask", "--app", "app", "run",
+              "--host", "127.0.0.1", "--port", "{port}", "--no-reload", "--no-debugger", "--with-threads"],
+    "asgi": [sys.executable, "-m", "uvicorn", "asgi:app",
+             "--host", "127.0.0.1", "--port", "{port}", "--log-level", "warning"],
+}
+
+# 벤치마크가 재려는 것은 app.py 자체이므로 업스트림 보호 장치는 넉넉하게 (--keep-limits로 끔)
+UNLIMITED_ENV = {
+    **{f"{upstream.upper()}_RATE_LIMIT": "100000/100000" for upstream in standins.UPSTREAMS},
+    "MAX_CONCURRENT_REQUESTS": "100000",
+    "ASGI_MAX_CONCURRENT_REQUESTS": "100000",
+}
+
+
+# ==============================
+# 🔹 시나리오
+# 각 함수는 번호 i → (method, path, JSON body 또는 None)
+# 기본은 i를 --variants개로 돌려 쓰고 (캐시가 데워진 상태), --unique면 매번 다른 값
+# ==============================
+THEMES = ["관광", "휴양", "문화", "음식", "모험", "자연", "쇼핑", "힐링"]
+RECOMMEND_REGIONS = [
+    ("아시아", None), ("유럽", None), ("유럽", "프랑스"), ("아시아", "일본"),
+    ("아프리카", None), ("남아메리카", "페루"), ("오세아니아", None), ("북아메리카", "캐나다"),
+]
+CITIES = [
+    ("파리", "프랑스"), ("리옹", "프랑스"), ("로마", "이탈리아"), ("밀라노", "이탈리아"),
+    ("도쿄", "일본"), ("오사카", "일본"), ("방콕", "태국"), ("치앙마이", "태국"),
+    ("시드니", "호주"), ("멜버른", "호주"), ("뉴욕", "미국"), ("시카고", "미국"),
+]
+FLIGHT_ROUTES = [("서울", "파리"), ("서울", "도쿄"), ("부산", "오사카"), ("서울", "뉴욕"), ("서울", "방콕")]
+ROUTE_POINTS = [
+    ("37.5665,126.9780", "35.1796,129.0756"),
+    ("37.5547,126.9707", "37.4563,126.7052"),
+    ("35.1796,129.0756", "35.8714,128.6014"),
+]
+ADDRESSES = ["서울 중구 세종대로 110", "부산 해운대구 해운대해변로 264", "대구 중구 동성로 2가"]
+PLAN_PLACES = [["파리"], ["도쿄", "오사카"], ["로마", "피렌체"], ["방콕"], ["시드니", "멜버른"]]
+
+
+def shifted_point(point, i):
+    """--unique용: 좌표를 격자 크기(ROUTE_GRID_DEG)보다 크게 밀어서 경로 캐시를 피함"""
+    lat, lng = map(float, point.split(","))
+    return f"{lat + (i % 97) * 0.002:.4f},{lng + (i // 97) * 0.002:.4f}"
+
+
+def flight_date(i):
+    return time.strftime("%Y-%m-%d", time.localtime(time.time() + (30 + i % 300) * 86400))
+
+
+def scenario_recommend(i, unique):
+    continent, country = RECOMMEND_REGIONS[i % len(RECOMMEND_REGIONS)]
+    body = {"theme": THEMES[i % len(THEMES)], "continent": continent, "country": country}
+    if unique:
+        body["subregion"] = f"bench-{i}"  # 카탈로그/캐시 모두 지나 Gemini까지
+    return "POST", "/recommend", body
+
+
+def scenario_city_info(i, unique):
+    city, country = CITIES[i % len(CITIES)]
+    return "POST", "/getCityInfo", {"city": f"{city} {i}" if unique else city, "country": country}
+
+
+def scenario_search_flight(i, unique):
+    origin, destination = FLIGHT_ROUTES[i % len(FLIGHT_ROUTES)]
+    depart = flight_date(i if unique else i % 3)
+    return "POST", "/search_flight", {
+        "from": origin, "to": destination, "depart_date": depart, "return_date": flight_date((i if unique else i % 3) + 5),
+    }
+
+
+def scenario_hotel(i, unique):
+    filters = [{}, {"q": "hotel"}, {"q": "ibis"}, {"chain": "MC,NV"}, {"limit": 25}]
+    city = f"P{i % 26:02d}" if unique else "PAR"
+    return "GET", "/api/hotel?" + urlencode({"city": city, **filters[i % len(filters)]}), None
+
+
+def scenario_graphhopper_route(i, unique):
+    if i % 4 == 3:
+        start, end = ADDRESSES[i % len(ADDRESSES)], ROUTE_POINTS[0][1]  # 지오코딩 포함
+    else:
+        start, end = ROUTE_POINTS[i % len(ROUTE_POINTS)]
+    if unique:
+        start = shifted_point(ROUTE_POINTS[i % len(ROUTE_POINTS)][0], i)
+    vehicle = ("car", "bike", "foot")[i % 3]
+    return "GET", "/api/graphhopper_route?" + urlencode({"start": start, "end": end, "vehicle": vehicle, "zoom": 12}), None
+
+
+def scenario_otp_route(i, unique):
+    start, end = ROUTE_POINTS[i % len(ROUTE_POINTS)]
+    if unique:
+        start = shifted_point(start, i)
+    return "GET", "/api/otp_route?" + urlencode({"from": start, "to": end, "date": "2025-05-01", "time": "09:00"}), None
+
+
+def scenario_routes(i, unique):
+    start, end = ROUTE_POINTS[i % len(ROUTE_POINTS)]
+    if unique:
+        start = shifted_point(start, i)
+    return "GET", "/api/routes?" + urlencode(
+        {"from": start, "to": end, "date": "2025-05-01", "time": "09:00", "zoom": 12}
+    ), None
+
+
+def scenario_plan_trip(i, unique):
+    places = PLAN_PLACES[i % len(PLAN_PLACES)]
+    days = 1 + i % 4
+    budget = 500000 + (i * 10000 if unique else 0)
+    if unique:
+        places = places + [f"bench-{i}"]
+    return "POST", "/api/plan_trip", {"places": places, "days": days, "budget": budget}
+
+
+SCENARIOS = {
+    "recommend": scenario_recommend,
+    "city_info": scenario_city_info,
+    "search_flight": scenario_search_flight,
+    "hotel": scenario_hotel,
+    "graphhopper_route": scenario_graphhopper_route,
+    "otp_route": scenario_otp_route,
+    "routes": scenario_routes,
+    "plan_trip": scenario_plan_trip,
+}
+
+
+# ==============================
+# 🔹 부하 생성 / 측정
+# ==============================
+def send(port, method, path, body):
+    """(status, 경과 시간 초). 연결 실패는 status 0"""
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    headers = {"Content-Type": "application/json"} if data is not None else {}
+    started = time.perf_counter()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=REQUEST_TIMEOUT)
+    try:
+        conn.request(method, path, body=data, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        status = response.status
+    except (OSError, http.client.HTTPException):
+        status = 0
+    finally:
+        conn.close()
+    return status, time.perf_counter() - started
+
+
+def percentile(sorted_values, pct):
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def run_level(port, scenario, concurrency, requests, warmup, variants, unique, offset):
+    """동시 접속 concurrency로 requests개를 보내고 결과 요약"""
+    def make(i):
+        return scenario(i if unique else i % variants, unique)
+
+    for i in range(warmup):
+        send(port, *make(offset + i))
+
+    counter = iter(range(offset + warmup, offset + warmup + requests))
+    counter_lock = threading.Lock()
+    results = []
+
+    def worker():
+        local = []
+        while True:
+            with counter_lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            local.append(send(port, *make(i)))
+        return local
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for local in pool.map(lambda _: worker(), range(concurrency)):
+            results.extend(local)
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(seconds for _, seconds in results)
+    statuses = [status for status, _ in results]
+    return {
+        "requests": len(results),
+        "ok": sum(1 for status in statuses if 200 <= status < 400),
+        "errors": sum(1 for status in statuses if status == 0 or (status >= 500 and status != 503)),
+        "rejected": sum(1 for status in statuses if status in (429, 503)),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "throughput_rps": round(len(results) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+# ==============================
+# 🔹 app 서버 실행
+# ==============================
+def free_port():
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app(server, port, env):
+    command = [part.replace("{port}", str(port)) for part in SERVERS[server]]
+    process = subprocess.Popen(command, cwd=REPO_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("app 서버가 시작하지 못했습니다:\n" + process.stderr.read().decode("utf-8", "replace"))
+        status, _ = send(port, "GET", "/api/cache_stats", None)
+        if status == 200:
+            return process
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"app 서버가 {START_TIMEOUT}초 안에 응답하지 않았습니다.")
+
+
+def app_environment(base_url, workdir, keep_limits):
+    env = {**os.environ, **standins.app_env(base_url)}
+    if not keep_limits:
+        env.update(UNLIMITED_ENV)
+    # 디스크 캐시/저장 파일은 실행마다 새로 (이전 실행 결과가 측정에 섞이지 않도록)
+    env.update({
+        "CACHE_DB_PATH": "",
+        "IATA_CACHE_DB": "",
+        "GEOCODE_CACHE_DB": "",
+        "CITY_STORE_PATH": os.path.join(workdir, "city_info.jsonl"),
+        "LEARNED_DESTINATIONS_PATH": os.path.join(workdir, "learned_destinations.jsonl"),
+    })
+    return env
+
+
+# ==============================
+# 🔹 결과 출력 / 비교
+# ==============================
+COLUMNS = ("scenario", "c", "requests", "errors", "rejected", "p50_ms", "p95_ms", "p99_ms", "throughput_rps", "upstream")
+
+
+def print_table(rows):
+    table = [COLUMNS] + [tuple(str(row[column]) for column in COLUMNS) for row in rows]
+    widths = [max(len(line[i]) for line in table) for i in range(len(COLUMNS))]
+    for n, line in enumerate(table):
+        print("  ".join(value.rjust(width) if n and i else value.ljust(width)
+                        for i, (value, width) in enumerate(zip(line, widths))))
+
+
+def format_calls(calls):
+    return ",".join(f"{name}={count}" for name, count in sorted(calls.items())) or "-"
+
+
+def compare(rows, baseline_path, max_regression):
+    """baseline보다 p95가 max_regression 넘게 느려진 (시나리오, 동시 접속) 목록"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(row["scenario"], row["c"]): row for row in json.load(f)["results"]}
+    regressions = []
+    for row in rows:
+        before = baseline.get((row["scenario"], row["c"]))
+        if before and before["p95_ms"] and row["p95_ms"] > before["p95_ms"] * (1 + max_regression):
+            regressions.append((row["scenario"], row["c"], before["p95_ms"], row["p95_ms"]))
+    return regressions
+
+
+def broken_scenarios(rows):
+    """성공 응답이 하나도 없었던 (시나리오, 동시 접속) 목록 (대역 서버/설정 문제라서 숫자가 의미 없음)"""
+    return [(row["scenario"], row["c"]) for row in rows if row["requests"] and not row["ok"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="app.py 오프라인 벤치마크")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="쉼표로 구분 (기본: 전체)")
+    parser.add_argument("--concurrency", default=DEFAULT_CONCURRENCY, help="동시 접속 수 목록 (예: 1,8,32)")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="동시 접속 수마다 보낼 요청 수")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--variants", type=int, default=20, help="돌려 쓸 파라미터 조합 수 (캐시 적중률 조절)")
+    parser.add_argument("--unique", action="store_true", help="매 요청 다른 파라미터 (캐시를 피함)")
+    parser.add_argument("--latency", action="append", help="대역 서버 지연 업스트림=ms (예: gemini=800)")
+    parser.add_argument("--error-rate", action="append", help="대역 서버 오류율 업스트림=비율 (예: amadeus=0.05)")
+    parser.add_argument("--server", choices=sorted(SERVERS), default="flask")
+    parser.add_argument("--port", type=int, help="이미 떠 있는 app 서버 포트 (대역 서버 환경 변수는 직접 설정)")
+    parser.add_argument("--keep-limits", action="store_true", help="속도 제한/동시 요청 상한을 기본값 그대로")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="결과를 JSON으로 저장")
+    parser.add_argument("--baseline", help="비교할 이전 --json 결과")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="허용하는 p95 증가 비율")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(unknown)} (가능: {', '.join(SCENARIOS)})")
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    stand_ins = standins.StandIns(
+        standins.parse_rates(args.latency), standins.parse_rates(args.error_rate), seed=args.seed
+    )
+    server, base_url = standins.start(stand_ins)
+    process = None
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        try:
+            port = args.port
+            if port is None:
+                port = free_port()
+                process = start_app(args.server, port, app_environment(base_url, workdir, args.keep_limits))
+            print(f"대역 서버 {base_url}, app 서버 127.0.0.1:{port} ({args.server})")
+            print(f"지연(ms): {stand_ins.latency_ms}, 오류율: {stand_ins.error_rate or '-'}\n")
+
+            offset = 0
+            for name in names:
+                for level in levels:
+                    stand_ins.calls(reset=True)
+                    summary = run_level(port, SCENARIOS[name], level, args.requests, args.warmup,
+                                        args.variants, args.unique, offset)
+                    offset += args.requests + args.warmup
+                    rows.append({"scenario": name, "c": level, **summary,
+                                 "upstream": format_calls(stand_ins.calls())})
+                    print(f"  {name} c={level}: p95 {summary['p95_ms']}ms, {summary['throughput_rps']} req/s")
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=10)
+            server.shutdown()
+
+    print()
+    print_table(rows)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": rows}, f, ensure_ascii=False, indent=2)
+    broken = broken_scenarios(rows)
+    for scenario, level in broken:
+        print(f"✖ 실패: {scenario} c={level} 요청이 모두 실패했습니다 (측정값을 쓸 수 없음)")
+    if broken:
+        sys.exit(1)
+    if args.baseline:
+        regressions = compare(rows, args.baseline, args.max_regression)
+        for scenario, level, before, after in regressions:
+            print(f"⚠ 회귀: {scenario} c={level} p95 {before}ms → {after}ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+# ==============================
+# 🔹 외부 API 대역 서버 (벤치마크용)
+# ==============================
+# Gemini / Unsplash / Amadeus / Nominatim / GraphHopper / OTP 흉내를 내는 HTTP 서버 하나.
+# bench/recordings/*.json에 저장해 둔 응답을 그대로 돌려주고,
+# 업스트림별로 응답 지연(평균 ± 편차)과 오류율(503)을 정할 수 있습니다.
+#
+# app.py는 환경 변수(app_env()가 만드는 값)로 이 서버를 가리키게 합니다.
+#
+# 단독 실행 (app.py를 직접 띄워서 손으로 시험할 때):
+#   python bench/standins.py --port 9100 --latency gemini=1500 --error-rate unsplash=0.1
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RECORDINGS_DIR = os.path.join(BENCH_DIR, "recordings")
+
+UPSTREAMS = ("gemini", "unsplash", "amadeus", "nominatim", "graphhopper", "otp")
+
+# 평소 응답 시간에 가까운 기본 지연(ms)
+DEFAULT_LATENCY_MS = {
+    "gemini": 1200,
+    "unsplash": 120,
+    "amadeus": 300,
+    "nominatim": 150,
+    "graphhopper": 200,
+    "otp": 250,
+}
+JITTER = 0.25  # 지연의 ±25%
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+
+_BATCH_LINE_RE = re.compile(r"^\s*(\d+)\.\s", re.MULTILINE)
+_DAYS_RE = re.compile(r"여행 기간:\s*(\d+)일")
+
+
+def load_recordings(directory=RECORDINGS_DIR):
+    recordings = {}
+    for upstream in UPSTREAMS:
+        with open(os.path.join(directory, f"{upstream}.json"), encoding="utf-8") as f:
+            recordings[upstream] = json.load(f)
+    return recordings
+
+
+def parse_rates(values, default=None):
+    """["gemini=800", "otp=50"] → {"gemini": 800.0, "otp": 50.0} (이름 없는 값은 전체에 적용)"""
+    rates = dict(default or {})
+    for value in values or ():
+        for part in value.split(","):
+            name, sep, number = part.partition("=")
+            if not sep:
+                rates.update({upstream: float(name) for upstream in UPSTREAMS})
+            elif name not in UPSTREAMS:
+                raise ValueError(f"알 수 없는 업스트림: {name}")
+            else:
+                rates[name] = float(number)
+    return rates
+
+
+class StandIns:
+    """대역 서버 설정과 호출 통계 (요청 처리 스레드들이 공유)"""
+
+    def __init__(self, latency_ms=None, error_rate=None, recordings=None, seed=None):
+        self.latency_ms = {**DEFAULT_LATENCY_MS, **(latency_ms or {})}
+        self.error_rate = dict(error_rate or {})
+        self.recordings = recordings or load_recordings()
+        self._random = random.Random(seed)
+        self._calls = Counter()
+        self._lock = threading.Lock()
+
+    def delay(self, upstream):
+        base = self.latency_ms.get(upstream, 0) / 1000
+        with self._lock:
+            return max(0.0, base * (1 + self._random.uniform(-JITTER, JITTER)))
+
+    def should_fail(self, upstream):
+        with self._lock:
+            self._calls[upstream] += 1
+            return self._random.random() < self.error_rate.get(upstream, 0.0)
+
+    def calls(self, reset=False):
+        with self._lock:
+            calls = dict(self._calls)
+            if reset:
+                self._calls.clear()
+        return calls
+
+    # ------------------------------
+    # Gemini 응답 본문 (프롬프트 종류에 맞는 녹화 텍스트)
+    # ------------------------------
+    def gemini_text(self, prompt):
+        gemini = self.recordings["gemini"]
+        if "번호를 키로" in prompt:
+            numbers = _BATCH_LINE_RE.findall(prompt) or ["1"]
+            return json.dumps({n: gemini["city_info_batch_item"] for n in numbers}, ensure_ascii=False)
+        if "여행 기간" in prompt:
+            match = _DAYS_RE.search(prompt)
+            days = int(match.group(1)) if match else 1
+            return json.dumps([{**gemini["plan_day"], "day": day} for day in range(1, days + 1)],
+                              ensure_ascii=False)
+        if '"description"' in prompt and "추천" not in prompt:
+            return gemini["city_info"]
+        return gemini["recommend"]
+
+    def gemini_response(self, text):
+        return {
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": self.recordings["gemini"]["usage"],
+        }
+
+
+def route(method, path):
+    """(업스트림, 녹화 키) 또는 None"""
+    if path.startswith("/v1beta/models/") or path.startswith("/v1/models/"):
+        return ("gemini", "stream") if path.endswith(":streamGenerateContent") else ("gemini", "generate")
+    if path == "/search/photos":
+        return "unsplash", None
+    if path == "/v1/security/oauth2/token":
+        return "amadeus", "token"
+    if path == "/v1/reference-data/locations/hotels/by-city":
+        return "amadeus", "hotels_by_city"
+    if path == "/v1/reference-data/locations":
+        return "amadeus", "locations"
+    if path == "/v2/shopping/flight-offers":
+        return "amadeus", "flight_offers"
+    if path == "/search":
+        return "nominatim", None
+    if path == "/api/1/route":
+        return "graphhopper", None
+    if path.startswith("/otp/") and path.endswith("/plan"):
+        return "otp", None
+    return None
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (app.py의 커넥션 풀과 같은 조건)
+    server_version = "bench-standin"
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def log_message(self, format, *args):
+        pass  # 요청마다 로그를 찍으면 그 자체가 병목
+
+    def _handle(self):
+        standins = self.server.standins
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        matched = route(self.command, urlsplit(self.path).path)
+        if matched is None:
+            self._send_json(404, {"error": f"녹화된 응답 없음: {self.command} {self.path}"})
+            return
+
+        upstream, key = matched
+        failed = standins.should_fail(upstream)
+        delay = standins.delay(upstream)
+        # amadeus SDK는 Content-Type이 정확히 "application/json"일 때만 본문을 파싱함 (charset이 붙으면 ResponseError)
+        content_type = "application/json" if upstream == "amadeus" else JSON_CONTENT_TYPE
+        if failed:
+            time.sleep(delay)
+            self._send_json(503, {"error": "stand-in injected failure"}, content_type)
+            return
+
+        if upstream == "gemini":
+            prompt = _gemini_prompt(body)
+            text = standins.gemini_text(prompt)
+            if key == "stream":
+                self._send_gemini_stream(standins, text, delay)
+                return
+            time.sleep(delay)
+            self._send_json(200, standins.gemini_response(text))
+            return
+
+        time.sleep(delay)
+        recorded = standins.recordings[upstream]
+        self._send_json(200, recorded[key] if key else recorded, content_type)
+
+    def _send_json(self, status, payload, content_type=None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type or JSON_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_gemini_stream(self, standins, text, delay, pieces=4):
+        """REST streamGenerateContent 형식: 응답 객체들의 JSON 배열을 조금씩 (chunked)"""
+        self.send_response(200)
+        self.send_header("Content-Type", JSON_CONTENT_TYPE)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        size = max(1, -(-len(text) // pieces))
+        parts = [text[i:i + size] for i in range(0, len(text), size)]
+        for i, part in enumerate(parts):
+            time.sleep(delay / len(parts))
+            chunk = ("[" if i == 0 else ",\n") + json.dumps(standins.gemini_response(part), ensure_ascii=False)
+            self._write_chunk(chunk.encode("utf-8"))
+        self._write_chunk(b"]")
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+
+def _gemini_prompt(body):
+    try:
+        request = json.loads(body or b"{}")
+        return "".join(part.get("text", "") for content in request.get("contents", [])
+                       for part in content.get("parts", []))
+    except (ValueError, AttributeError):
+        return ""
+
+
+def start(standins, host="127.0.0.1", port=0):
+    """대역 서버를 백그라운드 스레드로 띄움 → (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.daemon_threads = True
+    server.standins = standins
+    threading.Thread(target=server.serve_forever, daemon=True, name="standins").start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def app_env(base_url):
+    """app.py를 대역 서버에 연결하는 환경 변수 (API 키는 가짜 값)"""
+    return {
+        "GEMINI_API_KEY": "bench",
+        "UNSPLASH_ACCESS_KEY": "bench",
+        "AMADEUS_CLIENT_ID": "bench",
+        "AMADEUS_CLIENT_SECRET": "bench",
+        "GEMINI_API_ENDPOINT": base_url,
+        "UNSPLASH_API_URL": base_url,
+        "AMADEUS_BASE_URL": base_url,
+        "NOMINATIM_URL": f"{base_url}/search",
+        "GRAPHHOPPER_URL": f"{base_url}/api/1/route",
+        "OTP_SERVER_URL": f"{base_url}/otp/routers/default/plan",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="외부 API 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", action="append", help="업스트림=ms (예: gemini=800,otp=50)")
+    parser.add_argument("--error-rate", action="append", help="업스트림=비율 (예: unsplash=0.1)")
+    args = parser.parse_args()
+
+    standins = StandIns(parse_rates(args.latency), parse_rates(args.error_rate))
+    server, base_url = start(standins, args.host, args.port)
+    print(f"대역 서버: {base_url}")
+    print("app.py 환경 변수:")
+    for name, value in app_env(base_url).items():
+        print(f"  export {name}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+# ==============================
+# 🔹 응답 캐시 (메모리 LRU + 선택적 SQLite)
+# ==============================
+# Gemini 등 느린 업스트림 응답을 엔드포인트(namespace)별 TTL로 보관합니다.
+# 메모리에서는 LRU 방식으로 오래 안 쓴 항목부터 밀어내고,
+# db_path를 주면 SQLite 파일에도 기록해서 서버를 재시작해도 유지됩니다.
+# SQLite의 만료된 행은 열 때와 쓰기 중 purge_interval초마다 한 번씩 지웁니다
+# (읽지 않는 키도 파일에 계속 쌓이지 않도록).
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DB_PURGE_INTERVAL = 10 * 60  # 초
+
+
+def cache_key(*parts):
+    """요청 파라미터를 정규화해서 캐시 키 문자열로 만든다.
+
+    None / 빈 문자열은 같은 값으로 보고, 대소문자와 앞뒤 공백은 무시한다.
+    리스트는 순서를 유지한 채 각 항목을 정규화한다.
+    """
+    normalized = []
+    for part in parts:
+        if isinstance(part, (list, tuple)):
+            normalized.append(",".join(_normalize(p) for p in part))
+        else:
+            normalized.append(_normalize(part))
+    return "|".join(normalized)
+
+
+def _normalize(value):
+    if value is None:
+        return ""
+    return " ".join(str(value).split()).lower()
+
+
+class TTLCache:
+    """namespace별 TTL을 가지는 스레드 안전 LRU 캐시"""
+
+    def __init__(self, maxsize=1024, ttls=None, default_ttl=3600, db_path=None,
+                 purge_interval=DB_PURGE_INTERVAL):
+        self.maxsize = maxsize
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.purge_interval = purge_interval
+        self._items = OrderedDict()   # (namespace, key) -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._stats = {}              # namespace -> {"hits": n, "misses": n}
+        self._db = None
+        self._next_purge = 0.0
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+            self._db_purge(time.time())
+            self._db.commit()
+
+    def ttl_for(self, namespace):
+        return self.ttls.get(namespace, self.default_ttl)
+
+    def get(self, namespace, key):
+        """캐시된 값을 반환하고, 없거나 만료됐으면 None"""
+        now = time.time()
+        with self._lock:
+            entry = self._items.get((namespace, key))
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._items.move_to_end((namespace, key))
+                    self._count(namespace, "hits")
+                    return value
+                del self._items[(namespace, key)]
+
+            row = self._db_get(namespace, key, now)
+            if row is not None:
+                # 디스크에서 읽은 값은 메모리에도 올려둔다
+                value, expires_at = row
+                self._store(namespace, key, value, expires_at)
+                self._count(namespace, "hits")
+                return value
+
+            self._count(namespace, "misses")
+            return None
+
+    def set(self, namespace, key, value, ttl=None):
+        """값을 저장한다. value는 JSON 직렬화 가능해야 한다."""
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttl_for(namespace))
+        with self._lock:
+            self._store(namespace, key, value, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    (namespace, key, json.dumps(value, ensure_ascii=False), expires_at),
+                )
+                if now >= self._next_purge:
+                    self._db_purge(now)
+                self._db.commit()
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._items.pop((namespace, key), None)
+            if self._db is not None:
+                self._db.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+                )
+                self._db.commit()
+
+    def stats(self):
+        """namespace별 hit/miss 카운터와 현재 메모리 항목 수"""
+        with self._lock:
+            result = {}
+            for namespace, counts in self._stats.items():
+                total = counts["hits"] + counts["misses"]
+                result[namespace] = {
+                    "hits": counts["hits"],
+                    "misses": counts["misses"],
+                    "hit_ratio": round(counts["hits"] / total, 3) if total else 0.0,
+                    "ttl": self.ttl_for(namespace),
+                }
+            result["_size"] = len(self._items)
+            return result
+
+    # ------------------------------
+    # 내부 함수 (호출 시 _lock 보유)
+    # ------------------------------
+    def _store(self, namespace, key, value, expires_at):
+        self._items[(namespace, key)] = (expires_at, value)
+        self._items.move_to_end((namespace, key))
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def _count(self, namespace, field):
+        counts = self._stats.setdefault(namespace, {"hits": 0, "misses": 0})
+        counts[field] += 1
+
+    def _db_purge(self, now):
+        """만료된 행을 모두 지운다 (commit은 호출한 쪽에서)"""
+        self._db.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        self._next_purge = now + self.purge_interval
+
+    def _db_get(self, namespace, key, now):
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at <= now:
+            self._db.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+            self._db.commit()
+            return None
+        return json.loads(value), expires_at
+
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 호출을 하나로 합친다.
+
+    먼저 온 스레드가 fn()을 실행하고, 나머지는 그 결과(또는 예외)를 공유한다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> _Call
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class StaleWhileRevalidateCache:
+    """짧은 TTL 캐시 + 오래된 값 제공 중 백그라운드 갱신
+
+    - fresh_ttl 이내: 캐시 값 그대로 ("hit")
+    - stale_ttl 이내: 오래된 값을 바로 돌려주고 백그라운드에서 한 번만 갱신 ("stale")
+    - 그 외: 로더를 호출하되 같은 키의 동시 요청은 한 번으로 합침 ("miss")
+    """
+
+    def __init__(self, fresh_ttl, stale_ttl, executor, maxsize=512):
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+        self._executor = executor
+        self._items = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._flight = SingleFlight()
+        self._stats = {"hits": 0, "stale": 0, "misses": 0}
+
+    def get_or_load(self, key, loader):
+        """(value, age_seconds, status)"""
+        now = time.time()
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                self._items.move_to_end(key)
+        if entry is not None:
+            stored_at, value = entry
+            age = now - stored_at
+            if age < self.fresh_ttl:
+                self._count("hits")
+                return value, age, "hit"
+            if age < self.stale_ttl:
+                self._count("stale")
+                self._refresh_in_background(key, loader)
+                return value, age, "stale"
+
+        self._count("misses")
+        value = self._flight.do(key, lambda: self._load(key, loader))
+        return value, 0.0, "miss"
+
+    def stats(self):
+        """hit(fresh) / stale / miss 횟수와 현재 항목 수 (stale도 캐시에서 답한 것으로 셈)"""
+        with self._lock:
+            counts = dict(self._stats)
+            size = len(self._items)
+        total = sum(counts.values())
+        served = counts["hits"] + counts["stale"]
+        return {**counts, "hit_ratio": round(served / total, 3) if total else 0.0, "size": size}
+
+    def _count(self, field):
+        with self._lock:
+            self._stats[field] += 1
+
+    def _load(self, key, loader):
+        value = loader()
+        with self._lock:
+            self._items[key] = (time.time(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return value
+
+    def _refresh_in_background(self, key, loader):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._flight.do(key, lambda: self._load(key, loader))
+            except Exception:
+                pass  # 실패하면 다음 요청에서 다시 시도
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(refresh)
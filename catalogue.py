@@ -0,0 +1,159 @@
+# ==============================
+# 🔹 여행지 카탈로그 (추천 엔진)
+# ==============================
+# 여행지 목록을 한 번 색인해 두고 추천/필터를 색인으로 처리합니다.
+# - region / season / theme 값마다 역색인(값 → slot 집합)을 둡니다.
+# - 점수 계산은 후보 slot에 대해서만 NumPy 배열 연산으로 합니다.
+# - 상위 k개는 전체 정렬 대신 heapq.nlargest로 고릅니다.
+# - add / remove로 실행 중에 여행지를 넣고 뺄 수 있습니다.
+#   삭제된 slot은 비워 뒀다가 다음 add에서 다시 씁니다.
+#
+# 점수 규칙 (Untitled-1.py의 recommend_travel과 동일)
+#   계절 일치 +2, 사계절 여행지 +1, 테마 일치 +3, 사용자 유형이 테마에 포함 +2
+#   빈 값도 원래 코드와 똑같이 계산합니다.
+#   - 사계절 여행지는 계절을 고르지 않아도 +1
+#   - 사용자 유형이 ""이면 모든 테마에 포함되므로 전부 +2
+
+import heapq
+from collections import defaultdict
+
+import numpy as np
+
+INDEXED_FIELDS = ("region", "season", "theme")
+ALL_SEASONS = "사계절"
+
+SEASON_SCORE = 2
+ALL_SEASONS_SCORE = 1
+THEME_SCORE = 3
+USER_TYPE_SCORE = 2
+
+_NO_CODE = -1   # 필드 값이 없는 slot / 빈 slot
+_UNKNOWN = -2   # 카탈로그에 없는 값 (어떤 slot과도 일치하지 않음)
+
+
+class Catalogue:
+    """fields: 역색인을 둘 필드 (recommend()는 season / theme 필드가 있어야 함)"""
+
+    def __init__(self, items=(), fields=INDEXED_FIELDS, capacity=64):
+        self._fields = tuple(fields)
+        self._items = []   # slot → 여행지 dict (삭제되면 None)
+        self._free = []    # 비어 있는 slot
+        self._index = {field: defaultdict(set) for field in self._fields}
+        self._vocab = {field: {} for field in self._fields}  # 값 → 정수 코드
+        self._codes = {field: np.full(capacity, _NO_CODE, dtype=np.int32)
+                       for field in self._fields}            # slot → 코드
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return len(self._items) - len(self._free)
+
+    def __iter__(self):
+        return (item for item in self._items if item is not None)
+
+    def get(self, slot):
+        return self._items[slot] if 0 <= slot < len(self._items) else None
+
+    def add(self, item):
+        """여행지를 넣고 slot 번호를 돌려준다."""
+        if self._free:
+            slot = self._free.pop()
+            self._items[slot] = item
+        else:
+            slot = len(self._items)
+            self._items.append(item)
+            self._reserve(slot + 1)
+
+        for field in self._fields:
+            value = item.get(field)
+            if value is None:
+                self._codes[field][slot] = _NO_CODE
+                continue
+            self._codes[field][slot] = self._vocab[field].setdefault(value, len(self._vocab[field]))
+            self._index[field][value].add(slot)
+        return slot
+
+    def remove(self, slot):
+        """slot의 여행지를 뺀다. 없으면 False"""
+        item = self.get(slot)
+        if item is None:
+            return False
+        for field in self._fields:
+            value = item.get(field)
+            postings = self._index[field].get(value)
+            if postings is not None:
+                postings.discard(slot)
+                if not postings:
+                    del self._index[field][value]
+            self._codes[field][slot] = _NO_CODE
+        self._items[slot] = None
+        self._free.append(slot)
+        return True
+
+    def filter(self, **criteria):
+        """모든 조건(필드=값)이 일치하는 여행지 (넣은 순서대로)"""
+        slots = None
+        for field, value in criteria.items():
+            postings = self._index[field].get(value, set())
+            slots = set(postings) if slots is None else slots & postings
+            if not slots:
+                return []
+        if slots is None:
+            return list(self)
+        return [self._items[slot] for slot in sorted(slots)]
+
+    def recommend(self, season=None, theme=None, user_type=None, region=None, k=3):
+        """점수가 높은 순서로 최대 k개. region을 주면 그 지역만"""
+        candidates = self._candidates(season, theme, user_type)
+        if region is not None:
+            candidates &= self._index["region"].get(region, set())
+        if not candidates:
+            return []
+
+        slots = np.fromiter(sorted(candidates), dtype=np.intp, count=len(candidates))
+        scores = self._score(slots, season, theme, user_type)
+        top = heapq.nlargest(k, range(len(slots)), key=scores.__getitem__)
+        return [self._items[slots[i]] for i in top if scores[i] > 0]
+
+    def _candidates(self, season, theme, user_type):
+        """점수가 0보다 클 수 있는 slot (역색인 합집합)"""
+        season_index, theme_index = self._index["season"], self._index["theme"]
+        candidates = set(season_index.get(ALL_SEASONS, set()))
+        candidates |= season_index.get(season, set())
+        candidates |= theme_index.get(theme, set())
+        for value in self._user_type_themes(user_type):
+            candidates |= theme_index[value]
+        return candidates
+
+    def _score(self, slots, season, theme, user_type):
+        season_codes = self._codes["season"][slots]
+        theme_codes = self._codes["theme"][slots]
+        exact = season_codes == self._code("season", season)
+        all_seasons = season_codes == self._code("season", ALL_SEASONS)
+        scores = np.where(exact, SEASON_SCORE, np.where(all_seasons, ALL_SEASONS_SCORE, 0)).astype(np.int32)
+        scores += THEME_SCORE * (theme_codes == self._code("theme", theme))
+        user_type_codes = [self._vocab["theme"][value] for value in self._user_type_themes(user_type)]
+        if user_type_codes:
+            scores += USER_TYPE_SCORE * np.isin(theme_codes, user_type_codes)
+        return scores
+
+    def _user_type_themes(self, user_type):
+        """사용자 유형이 포함된 테마 값들 (테마 종류만 훑음, ""는 모든 테마에 포함)"""
+        if user_type is None:
+            return []
+        user_type = user_type.lower()
+        return [value for value in self._index["theme"] if user_type in value.lower()]
+
+    def _code(self, field, value):
+        return self._vocab[field].get(value, _UNKNOWN)
+
+    def _reserve(self, size):
+        capacity = len(self._codes[self._fields[0]])
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for field in self._fields:
+            codes = np.full(capacity, _NO_CODE, dtype=np.int32)
+            codes[:len(self._codes[field])] = self._codes[field]
+            self._codes[field] = codes
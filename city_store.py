@@ -0,0 +1,54 @@
+# ==============================
+# 🔹 도시 설명/이미지 사전 저장소
+# ==============================
+# region.html의 도시 목록은 countries.json으로 정해져 있으므로
+# warmup_city_info.py로 미리 만든 설명/이미지 URL을 파일에 저장해 두고
+# /getCityInfo가 먼저 여기서 찾습니다.
+#
+# 형식: JSON Lines (한 줄에 도시 하나)
+#   {"city": "서울", "country": "한국", "description": "...", "image": "https://..."}
+# 한 줄씩 바로 기록하므로 warm-up이 중간에 끊겨도 이어서 돌릴 수 있습니다.
+
+import json
+import os
+import threading
+
+from cache import cache_key
+
+CITY_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "city_info.jsonl")
+
+
+class CityInfoStore:
+    def __init__(self, path=CITY_STORE_PATH):
+        self.path = path
+        self._items = {}  # cache_key(city, country) -> 항목
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        item = json.loads(line)
+                    except ValueError:
+                        continue  # 기록 도중 끊긴 마지막 줄
+                    self._items[cache_key(item["city"], item["country"])] = item
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, city_country):
+        return cache_key(*city_country) in self._items
+
+    def get(self, city, country):
+        return self._items.get(cache_key(city, country))
+
+    def put(self, city, country, description, image):
+        item = {"city": city, "country": country, "description": description, "image": image}
+        line = json.dumps(item, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self._items[cache_key(city, country)] = item
+        return item
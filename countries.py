@@ -0,0 +1,110 @@
+# ==============================
+# 🔹 countries.json 로더
+# ==============================
+# 대륙 → 하위 지역 → 국가 → 도시(위도, 경도) 구조의 countries.json을
+# 한 번만 읽어서 여러 기능(지오코딩, 지역 API 등)이 같이 씁니다.
+# 파일 안에서 일부 지역이 다른 대륙 밑에 중첩되어 있으므로
+# 하위 지역 이름으로 실제 대륙을 다시 정해 줍니다.
+
+import functools
+import json
+import os
+import re
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+COUNTRIES_PATH = os.path.join(BASE_DIR, "countries.json")
+PLACE_NAMES_PATH = os.path.join(BASE_DIR, "place_names.json")
+
+CONTINENTS = ["아시아", "유럽", "아프리카", "북아메리카", "남아메리카", "오세아니아"]
+
+SUBREGION_TO_CONTINENT = {
+    "동아시아": "아시아",
+    "동남아시아": "아시아",
+    "남아시아": "아시아",
+    "중앙아시아": "아시아",
+    "서아시아": "아시아",
+    "북유럽": "유럽",
+    "서유럽": "유럽",
+    "남유럽": "유럽",
+    "동유럽": "유럽",
+    "북아프리카": "아프리카",
+    "중앙아프리카": "아프리카",
+    "북미": "북아메리카",
+    "중미": "북아메리카",
+    "카리브": "북아메리카",
+    "남미": "남아메리카",
+    "오스트레일리아": "오세아니아",
+    "태평양제도": "오세아니아",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def load_countries(path=COUNTRIES_PATH):
+    """countries.json 원본 (프로세스당 한 번만 읽음)"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@functools.lru_cache(maxsize=None)
+def load_place_names(path=PLACE_NAMES_PATH):
+    """한국어 지명 → 영어 지명"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def english_name(name):
+    return load_place_names().get(name)
+
+
+NAME_SEPARATORS = re.compile(r"[\s\-_.'’]+")
+
+
+def normalize_name(name):
+    """대소문자, 공백, 하이픈 등을 무시한 비교용 이름 (지오코딩 / IATA 색인이 같이 씀)"""
+    return NAME_SEPARATORS.sub("", name).lower()
+
+
+def iter_countries(data=None):
+    """(대륙, 하위 지역, 국가, 정보) 순회. 같은 국가가 여러 번 나오면 처음 것만."""
+    data = load_countries() if data is None else data
+    seen = set()
+    for path, country, info in _walk(data, []):
+        if country in seen:
+            continue
+        seen.add(country)
+        subregion = path[-1] if path else ""
+        continent = SUBREGION_TO_CONTINENT.get(subregion, path[0] if path else "")
+        yield continent, subregion, country, info
+
+
+@functools.lru_cache(maxsize=None)
+def country_regions():
+    """국가 → (대륙, 하위 지역)"""
+    return {country: (continent, subregion) for continent, subregion, country, _ in iter_countries()}
+
+
+def country_cities(country):
+    """국가의 도시 이름 목록 (countries.json 순서). 없는 국가면 빈 리스트"""
+    return list(_country_infos().get(country, {}).get("cities", {}))
+
+
+@functools.lru_cache(maxsize=None)
+def _country_infos():
+    return {country: info for _, _, country, info in iter_countries()}
+
+
+def iter_cities(data=None):
+    """(대륙, 하위 지역, 국가, 도시, 위도, 경도) 순회"""
+    for continent, subregion, country, info in iter_countries(data):
+        for city, (lat, lng) in info.get("cities", {}).items():
+            yield continent, subregion, country, city, lat, lng
+
+
+def _walk(node, path):
+    for key, value in node.items():
+        if not isinstance(value, dict):
+            continue
+        if "lat" in value and "lng" in value:
+            yield path, key, value
+        else:
+            yield from _walk(value, path + [key])
@@ -0,0 +1,105 @@
+# ==============================
+# 🔹 추천 여행지 카탈로그 (/recommend 1단계)
+# ==============================
+# destinations.json(기본 목록)과 Gemini가 추천했던 여행지(learned_destinations.jsonl)를
+# 테마 / 대륙 / 하위 지역 / 국가로 색인해 두고, /recommend가 Gemini보다 먼저 찾습니다.
+# Gemini 추천 결과는 learn()으로 다시 넣으므로 같은 조건은 다음부터 카탈로그에서 답합니다.
+#
+# learned_destinations.jsonl 형식 (한 줄에 여행지 하나)
+#   {"name": "...", "country": "...", "description": "...", "theme": "...", "continent": "...", "subregion": "..."}
+
+import json
+import os
+import random
+import threading
+
+from cache import cache_key
+from catalogue import Catalogue
+from countries import BASE_DIR, country_regions
+
+DESTINATIONS_PATH = os.path.join(BASE_DIR, "destinations.json")
+LEARNED_DESTINATIONS_PATH = os.path.join(BASE_DIR, "learned_destinations.jsonl")
+FIELDS = ("theme", "continent", "subregion", "country")
+
+
+class DestinationCatalogue:
+    def __init__(self, seed_path=DESTINATIONS_PATH, learned_path=LEARNED_DESTINATIONS_PATH):
+        self.learned_path = learned_path
+        self._catalogue = Catalogue(fields=FIELDS)
+        self._keys = set()  # cache_key(이름, 국가, 테마) — 같은 여행지를 두 번 넣지 않음
+        self._lock = threading.Lock()
+
+        if seed_path and os.path.exists(seed_path):
+            with open(seed_path, encoding="utf-8") as f:
+                for place in json.load(f):
+                    self._add(self._with_regions(place))
+        if learned_path and os.path.exists(learned_path):
+            with open(learned_path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        self._add(json.loads(line))
+                    except ValueError:
+                        continue  # 기록 도중 끊긴 마지막 줄
+
+    def __len__(self):
+        return len(self._catalogue)
+
+    def pick(self, theme=None, continent=None, subregion=None, country=None, k=3):
+        """조건에 맞는 여행지 k곳 (국가를 지정하지 않았으면 국가가 겹치지 않게).
+
+        k곳을 채우지 못하면 None
+        """
+        criteria = {field: value
+                    for field, value in zip(FIELDS, (theme, continent, subregion, country))
+                    if value}
+        with self._lock:
+            matches = self._catalogue.filter(**criteria)
+        if len(matches) < k:
+            return None
+
+        random.shuffle(matches)  # 같은 조건이라도 매번 다른 조합
+        picked, countries = [], set()
+        for place in matches:
+            if not country and place["country"] in countries:
+                continue
+            countries.add(place["country"])
+            picked.append({"name": place["name"], "country": place["country"],
+                           "description": place.get("description", "")})
+            if len(picked) == k:
+                return picked
+        return None
+
+    def learn(self, places, theme=None, continent=None, subregion=None):
+        """Gemini 추천 결과를 카탈로그와 파일에 추가 (이미 있는 여행지는 건너뜀)"""
+        lines = []
+        with self._lock:
+            for place in places:
+                record = self._with_regions({
+                    "name": place["name"],
+                    "country": place["country"],
+                    "description": place.get("description", ""),
+                    "theme": theme,
+                }, continent, subregion)
+                if self._add(record):
+                    lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+            if lines and self.learned_path:
+                with open(self.learned_path, "a", encoding="utf-8") as f:
+                    f.writelines(lines)
+        return len(lines)
+
+    def _add(self, place):
+        key = cache_key(place.get("name"), place.get("country"), place.get("theme"))
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        self._catalogue.add(place)
+        return True
+
+    @staticmethod
+    def _with_regions(place, continent=None, subregion=None):
+        """국가로 대륙/하위 지역을 채움 (countries.json에 없는 국가는 요청 값 사용)"""
+        continent, subregion = country_regions().get(place.get("country"), (continent, subregion))
+        return {**place, "continent": continent, "subregion": subregion}
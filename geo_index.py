@@ -0,0 +1,92 @@
+# ==============================
+# 🔹 도시 좌표 인덱스 (가까운 도시 / 반경 검색 / 역지오코딩)
+# ==============================
+# countries.json의 도시 좌표를 서버 시작 시 NumPy 배열로 한 번 정리해 두고,
+# 요청마다 모든 도시까지의 haversine 거리를 배열 연산 한 번으로 계산합니다.
+# 도시 수가 수백~수천 개 수준이라 트리 구조 없이도 충분히 빠릅니다.
+
+import numpy as np
+
+from countries import iter_cities
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+class CityIndex:
+    """도시 좌표 배열과 메타데이터 (인덱스 i가 서로 대응)"""
+
+    def __init__(self, rows):
+        # rows: (대륙, 하위 지역, 국가, 도시, 위도, 경도)
+        self._meta = [row[:4] for row in rows]
+        coords = np.array([row[4:6] for row in rows], dtype=np.float64).reshape(-1, 2)
+        self._lat = np.radians(coords[:, 0])
+        self._lng = np.radians(coords[:, 1])
+        self._cos_lat = np.cos(self._lat)
+        self._coords = coords
+
+    @classmethod
+    def from_countries(cls, data=None):
+        return cls(list(iter_cities(data)))
+
+    def __len__(self):
+        return len(self._meta)
+
+    def distances_km(self, lat, lng):
+        """(lat, lng)에서 모든 도시까지의 거리(km) 배열"""
+        lat, lng = np.radians(lat), np.radians(lng)
+        a = (np.sin((self._lat - lat) / 2) ** 2
+             + np.cos(lat) * self._cos_lat * np.sin((self._lng - lng) / 2) ** 2)
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+    def nearest(self, lat, lng, n=5):
+        """가까운 순서로 도시 n개"""
+        if not len(self) or n <= 0:
+            return []
+        distances = self.distances_km(lat, lng)
+        n = min(n, len(self))
+        # 전체 정렬 대신 상위 n개만 고른 뒤 그 안에서 정렬
+        idx = np.argpartition(distances, n - 1)[:n]
+        idx = idx[np.argsort(distances[idx], kind="stable")]
+        return [self._item(i, distances[i]) for i in idx]
+
+    def within(self, lat, lng, radius_km, limit=None):
+        """반경 radius_km 안의 도시를 가까운 순서로"""
+        if not len(self):
+            return []
+        distances = self.distances_km(lat, lng)
+        idx = np.flatnonzero(distances <= radius_km)
+        idx = idx[np.argsort(distances[idx], kind="stable")]
+        if limit is not None:
+            idx = idx[:limit]
+        return [self._item(i, distances[i]) for i in idx]
+
+    def locate(self, lat, lng):
+        """좌표가 속한 대륙/국가 (가장 가까운 도시 기준). 인덱스가 비었으면 None"""
+        nearest = self.nearest(lat, lng, 1)
+        return nearest[0] if nearest else None
+
+    def _item(self, i, distance):
+        continent, subregion, country, city = self._meta[i]
+        return {
+            "continent": continent,
+            "subregion": subregion,
+            "country": country,
+            "city": city,
+            "lat": float(self._coords[i, 0]),
+            "lng": float(self._coords[i, 1]),
+            "distance_km": round(float(distance), 2),
+        }
+
+
+def parse_point(lat, lng):
+    """쿼리 문자열 값 → (위도, 경도). 범위를 벗어나거나 숫자가 아니면 None"""
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return lat, lng
+
+
+city_index = CityIndex.from_countries()
@@ -0,0 +1,129 @@
+# ==============================
+# 🔹 지오코딩 (로컬 인덱스 + Nominatim fallback)
+# ==============================
+# 1) countries.json의 국가/도시 좌표로 만든 메모리 인덱스에서 먼저 찾는다.
+#    한국어/영어 이름의 완전 일치 → 접두어 일치 순서.
+#    접두어는 한 곳만 가리킬 때(또는 단어 단위로 한 곳과 맞을 때)만 쓰고,
+#    여러 곳에 걸리면("Par" → Paris / Paro / Paraguay) Nominatim에 넘긴다.
+# 2) 없으면 Nominatim에 물어보고 결과를 SQLite 캐시에 저장한다.
+#    Nominatim 사용 정책(초당 1건)은 resilience.py의 "nominatim" 속도 제한이 지키고
+#    (NOMINATIM_RATE_LIMIT로 변경), 같은 주소를 동시에 찾는 요청은 한 번의 호출로 합친다.
+
+import bisect
+import itertools
+import os
+
+import http_client
+from cache import SingleFlight, TTLCache, cache_key
+from countries import NAME_SEPARATORS, english_name, iter_countries, normalize_name
+
+NOMINATIM_URL = os.getenv("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+GEOCODE_TTL = 30 * 24 * 60 * 60       # 찾은 주소: 30일
+GEOCODE_MISS_TTL = 24 * 60 * 60       # 못 찾은 주소: 1일
+MIN_PREFIX_LENGTH = 2
+
+
+class LocalGeocoder:
+    """countries.json 기반 지명 → 좌표 인덱스"""
+
+    def __init__(self):
+        self._exact = {}  # 정규화된 이름 -> (lat, lng)
+        self._word_prefixes = {}  # 정규화된 이름 -> 앞 단어들만 이은 이름 ("riodejaneiro" -> {"rio", "riode", ...})
+        for _, _, country, info in iter_countries():
+            # 국가보다 도시를 우선 (도시 이름이 국가 이름과 같은 경우: 싱가포르 등)
+            for city, (lat, lng) in info.get("cities", {}).items():
+                self._add(city, lat, lng)
+            self._add(country, info["lat"], info["lng"])
+        self._keys = sorted(self._exact)
+
+    def _add(self, name, lat, lng):
+        for label in (name, english_name(name)):
+            if label:
+                key = normalize_name(label)
+                self._exact.setdefault(key, (lat, lng))
+                words = [word for word in NAME_SEPARATORS.split(label.lower()) if word]
+                self._word_prefixes.setdefault(key, set()).update(itertools.accumulate(words))
+
+    def lookup(self, query):
+        """(lat, lng) 또는 None"""
+        key = normalize_name(query)
+        if not key:
+            return None
+        hit = self._exact.get(key)
+        if hit is not None:
+            return hit
+        if len(key) < MIN_PREFIX_LENGTH:
+            return None
+
+        # 접두어 일치: 걸리는 곳이 하나일 때만, 여러 곳이면 단어 단위로 맞는 곳이 하나일 때만
+        i = bisect.bisect_left(self._keys, key)
+        matches = []
+        while i < len(self._keys) and self._keys[i].startswith(key):
+            matches.append(self._keys[i])
+            i += 1
+        hit = self._unique(matches)
+        if hit is None:
+            hit = self._unique([name for name in matches if key in self._word_prefixes[name]])
+        return hit
+
+    def _unique(self, names):
+        """이름들이 모두 같은 좌표면 그 좌표, 아니면 None"""
+        points = {self._exact[name] for name in names}
+        return points.pop() if len(points) == 1 else None
+
+
+class NominatimGeocoder:
+    """Nominatim 호출 (중복 요청 병합 + 영구 캐시, 속도 제한은 http_client → resilience)"""
+
+    def __init__(self, cache):
+        self._cache = cache
+        self._flight = SingleFlight()
+
+    def lookup(self, address):
+        key = cache_key(address)
+        cached = self._cache.get("geocode", key)
+        if cached is not None:
+            return tuple(cached) if cached else None
+        return self._flight.do(key, lambda: self._fetch(key, address))
+
+    def _fetch(self, key, address):
+        # 기다리는 동안 다른 요청이 채웠을 수 있음
+        cached = self._cache.get("geocode", key)
+        if cached is not None:
+            return tuple(cached) if cached else None
+
+        resp = http_client.get(
+            "nominatim",
+            NOMINATIM_URL,
+            params={"q": address, "format": "json", "limit": 1},
+            headers={"User-Agent": "FlaskApp"},
+        )
+        data = resp.json()
+        if data:
+            result = (float(data[0]["lat"]), float(data[0]["lon"]))
+            self._cache.set("geocode", key, list(result), ttl=GEOCODE_TTL)
+            return result
+        self._cache.set("geocode", key, [], ttl=GEOCODE_MISS_TTL)
+        return None
+
+
+class Geocoder:
+    def __init__(self, cache_db_path=None):
+        self.local = LocalGeocoder()
+        self.remote = NominatimGeocoder(
+            TTLCache(maxsize=4096, default_ttl=GEOCODE_TTL, db_path=cache_db_path)
+        )
+
+    def geocode(self, address):
+        """주소 → (lat, lng). 못 찾으면 (None, None)"""
+        hit = self.local.lookup(address)
+        if hit is not None:
+            return hit
+        try:
+            hit = self.remote.lookup(address)
+        except Exception:
+            return None, None
+        return hit if hit is not None else (None, None)
+
+
+geocoder = Geocoder(os.getenv("GEOCODE_CACHE_DB", "geocode_cache.sqlite3") or None)
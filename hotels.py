@@ -0,0 +1,116 @@
+# ==============================
+# 🔹 도시별 호텔 목록 (/api/hotel)
+# ==============================
+# Amadeus hotels/by-city는 페이지 없이 도시의 호텔 전체(파리는 수백 곳)를 돌려줍니다.
+# 한 번 받은 목록을 cityCode별로 HotelList에 담아 두고
+# 페이지 나누기, 이름 앞글자 검색, 체인 필터를 모두 로컬에서 처리합니다.
+#
+# - 레코드는 __slots__ 클래스로 필요한 필드만 보관 (원본 JSON dict는 버림)
+# - 정규화한 이름 순으로 정렬 → 앞글자 검색은 bisect 두 번
+# - 체인 코드별로 정렬 위치 목록을 따로 두어 체인 필터도 bisect로 범위만 자름
+# - cursor는 마지막으로 보낸 (이름, hotelId)라서 목록이 갱신돼도 중복/누락이 없음
+
+import base64
+import bisect
+import heapq
+import itertools
+import json
+
+_MAX_CHAR = "\U0010ffff"
+
+
+def normalize_name(name):
+    """정렬/검색용 이름 (대소문자, 연속 공백 무시)"""
+    return " ".join(str(name or "").split()).casefold()
+
+
+def encode_cursor(key):
+    raw = json.dumps(list(key), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """encode_cursor의 역변환. 잘못된 값이면 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        name, hotel_id = json.loads(raw.decode("utf-8"))
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError("cursor 값이 올바르지 않습니다.")
+    return str(name), str(hotel_id)
+
+
+class HotelRecord:
+    __slots__ = ("hotel_id", "name", "chain_code")
+
+    def __init__(self, hotel_id, name, chain_code):
+        self.hotel_id = hotel_id
+        self.name = name
+        self.chain_code = chain_code
+
+    @classmethod
+    def from_api(cls, item):
+        # API가 null을 보내는 필드도 있음 ("chainCode": null)
+        return cls(
+            str(item.get("hotelId") or "N/A"), str(item.get("name") or "N/A"), str(item.get("chainCode") or "N/A")
+        )
+
+    @property
+    def sort_key(self):
+        return normalize_name(self.name), self.hotel_id
+
+    def to_dict(self):
+        return {"hotelName": self.name, "hotelId": self.hotel_id, "chainCode": self.chain_code}
+
+
+class HotelList:
+    """한 도시의 호텔 전체 (만든 뒤에는 바꾸지 않으므로 잠금 없이 공유)"""
+
+    def __init__(self, records):
+        unique = {}
+        for record in records:
+            unique.setdefault(record.hotel_id, record)  # 같은 호텔이 두 번 오는 경우
+        self._records = sorted(unique.values(), key=lambda record: record.sort_key)
+        self._keys = [record.sort_key for record in self._records]
+        self._chains = {}  # 체인 코드 → 정렬 위치 목록 (오름차순)
+        for position, record in enumerate(self._records):
+            self._chains.setdefault(record.chain_code.upper(), []).append(position)
+
+    @classmethod
+    def from_api(cls, data):
+        """by-city 응답의 data 배열 → HotelList"""
+        return cls(HotelRecord.from_api(item) for item in data)
+
+    def __len__(self):
+        return len(self._records)
+
+    def chains(self):
+        """체인 코드별 호텔 수"""
+        return {code: len(positions) for code, positions in self._chains.items()}
+
+    def page(self, limit=10, cursor=None, prefix=None, chains=()):
+        """(호텔 dict 목록, 다음 cursor 또는 None, 조건에 맞는 전체 수)"""
+        lo, hi = 0, len(self._keys)
+        if prefix:
+            prefix = normalize_name(prefix)
+            lo = bisect.bisect_left(self._keys, (prefix,))
+            hi = bisect.bisect_left(self._keys, (prefix + _MAX_CHAR,), lo)
+        start = lo
+        if cursor:
+            start = max(lo, bisect.bisect_right(self._keys, decode_cursor(cursor)))
+
+        if chains:
+            total, slices = 0, []
+            for code in {code.upper() for code in chains}:
+                positions = self._chains.get(code, [])
+                first = bisect.bisect_left(positions, lo)
+                end = bisect.bisect_left(positions, hi, first)
+                total += end - first
+                slices.append(itertools.islice(positions, bisect.bisect_left(positions, start, first, end), end))
+            candidates = heapq.merge(*slices)
+        else:
+            total = hi - lo
+            candidates = range(start, hi)
+
+        picked = [self._records[position] for position in itertools.islice(candidates, limit + 1)]
+        next_cursor = encode_cursor(picked[limit - 1].sort_key) if len(picked) > limit else None
+        return [record.to_dict() for record in picked[:limit]], next_cursor, total
@@ -0,0 +1,228 @@
+# ==============================
+# 🔹 외부 API 공용 HTTP 클라이언트
+# ==============================
+# 업스트림(호스트)마다 커넥션 풀을 가진 requests.Session을 하나씩 두고
+# keep-alive로 TCP/TLS 연결을 재사용합니다.
+# - 업스트림별 connect/read 타임아웃
+# - 멱등(GET) 요청만 백오프와 함께 재시도
+# - deadline을 주면 재시도까지 포함해서 그 시각 안에 끝나도록 타임아웃을 줄임
+#   (마감이 지난 요청이 워커 스레드를 계속 붙잡지 않도록)
+# - 업스트림별 응답 시간 기록 (/api/upstream_stats 요약 + /metrics 히스토그램)
+# - 업스트림별 속도 제한 / 서킷 브레이커 (resilience.py)
+#   → 거절되면 요청을 보내지 않고 resilience.UpstreamUnavailable
+# ASGI 모드(asgi.py)에서는 같은 설정으로 httpx.AsyncClient를 씁니다.
+
+import asyncio
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+import resilience
+
+# (connect, read) 타임아웃(초)과 GET 재시도 횟수
+UPSTREAMS = {
+    "unsplash":    {"timeout": (3.05, 4),  "retries": 1},
+    "nominatim":   {"timeout": (3.05, 5),  "retries": 1},
+    "graphhopper": {"timeout": (3.05, 10), "retries": 2},
+    "otp":         {"timeout": (2, 15),    "retries": 1},
+    "amadeus":     {"timeout": (3.05, 10), "retries": 2},
+}
+DEFAULT_UPSTREAM = {"timeout": (3.05, 10), "retries": 1}
+
+POOL_SIZE = 20  # 업스트림별 최대 keep-alive 연결 수
+ASYNC_MAX_CONNECTIONS = 200  # ASGI 모드: 업스트림별 최대 동시 연결 수
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+BACKOFF_FACTOR = 0.3
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_async_clients = {}
+_latency = {}   # upstream -> {"count", "errors", "total", "max"}
+_latency_lock = threading.Lock()
+
+
+def _config(upstream):
+    return UPSTREAMS.get(upstream, DEFAULT_UPSTREAM)
+
+
+def get_session(upstream):
+    """업스트림 전용 Session (처음 호출 시 생성)"""
+    session = _sessions.get(upstream)
+    if session is not None:
+        return session
+    with _sessions_lock:
+        session = _sessions.get(upstream)
+        if session is None:
+            retry = Retry(
+                total=_config(upstream)["retries"],
+                backoff_factor=BACKOFF_FACTOR,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset(["GET"]),  # POST는 재시도하지 않음
+                raise_on_status=False,
+                # Retry-After(수십 초일 수 있음)만큼 자면 deadline으로 줄인 타임아웃이 소용없음
+                respect_retry_after_header=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=retry
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[upstream] = session
+    return session
+
+
+def deadline_timeout(upstream, method, deadline):
+    """deadline(time.monotonic() 기준)까지 재시도를 포함해 끝나도록 줄인 (connect, read) 타임아웃"""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError(f"{upstream} 마감 시간 초과")
+    connect, read = _config(upstream)["timeout"]
+    attempts = (_config(upstream)["retries"] if method == "GET" else 0) + 1
+    budget = remaining / attempts
+    return min(connect, budget), min(read, budget)
+
+
+def request(upstream, method, url, deadline=None, **kwargs):
+    """업스트림 설정(타임아웃/재시도)을 적용해서 요청하고 응답 시간을 기록"""
+    kwargs.setdefault("timeout", _config(upstream)["timeout"])
+    guard = resilience.guard(upstream)
+    wait = guard.admit()
+    if wait:
+        time.sleep(wait)
+    if deadline is not None:
+        try:
+            kwargs["timeout"] = deadline_timeout(upstream, method, deadline)
+        except TimeoutError:
+            guard.breaker.release()  # 호출하지 않고 끝남 (half-open 시험 기회를 돌려줌)
+            raise
+    start = time.perf_counter()
+    response = None
+    try:
+        response = get_session(upstream).request(method, url, **kwargs)
+        return response
+    finally:
+        _record(upstream, time.perf_counter() - start, response is not None)
+        guard.record(response is not None and not resilience.is_failure_status(response.status_code))
+
+
+def get(upstream, url, **kwargs):
+    return request(upstream, "GET", url, **kwargs)
+
+
+def post(upstream, url, **kwargs):
+    return request(upstream, "POST", url, **kwargs)
+
+
+# ------------------------------
+# 비동기 클라이언트 (ASGI 모드, httpx 필요)
+# ------------------------------
+def get_async_client(upstream):
+    """업스트림 전용 httpx.AsyncClient (이벤트 루프 안에서 처음 호출 시 생성)"""
+    import httpx
+
+    client = _async_clients.get(upstream)
+    if client is None:
+        connect, read = _config(upstream)["timeout"]
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(
+                max_connections=ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=POOL_SIZE,
+            ),
+        )
+        _async_clients[upstream] = client
+    return client
+
+
+async def arequest(upstream, method, url, deadline=None, **kwargs):
+    """request()의 비동기 버전. GET만 백오프와 함께 재시도한다.
+    호출한 쪽이 취소하면(wait_for 마감 등) 업스트림 실패로 세지 않는다."""
+    import httpx
+
+    retries = _config(upstream)["retries"] if method == "GET" else 0
+    guard = resilience.guard(upstream)
+    wait = guard.admit()
+    if wait:
+        await asyncio.sleep(wait)
+    if deadline is not None:
+        try:
+            connect, read = deadline_timeout(upstream, method, deadline)
+        except TimeoutError:
+            guard.breaker.release()  # 호출하지 않고 끝남 (half-open 시험 기회를 돌려줌)
+            raise
+        kwargs["timeout"] = httpx.Timeout(read, connect=connect)
+    start = time.perf_counter()
+    result = None
+    cancelled = False
+    try:
+        for attempt in range(retries + 1):
+            backoff = BACKOFF_FACTOR * (2 ** attempt)
+            last_attempt = attempt == retries or (
+                deadline is not None and time.monotonic() + backoff >= deadline
+            )
+            try:
+                response = await get_async_client(upstream).request(method, url, **kwargs)
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+            else:
+                if last_attempt or response.status_code not in RETRY_STATUSES:
+                    result = response
+                    return response
+            await asyncio.sleep(backoff)
+    except asyncio.CancelledError:
+        cancelled = True
+        guard.breaker.release()
+        raise
+    finally:
+        if not cancelled:
+            _record(upstream, time.perf_counter() - start, result is not None)
+            guard.record(result is not None and not resilience.is_failure_status(result.status_code))
+
+
+async def aget(upstream, url, **kwargs):
+    return await arequest(upstream, "GET", url, **kwargs)
+
+
+async def apost(upstream, url, **kwargs):
+    return await arequest(upstream, "POST", url, **kwargs)
+
+
+async def aclose():
+    """ASGI 서버 종료 시 비동기 클라이언트 정리"""
+    clients = list(_async_clients.values())
+    _async_clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def _record(upstream, elapsed, ok):
+    metrics.observe_upstream(upstream, elapsed, ok)
+    with _latency_lock:
+        stats = _latency.setdefault(
+            upstream, {"count": 0, "errors": 0, "total": 0.0, "max": 0.0}
+        )
+        stats["count"] += 1
+        if not ok:
+            stats["errors"] += 1
+        stats["total"] += elapsed
+        stats["max"] = max(stats["max"], elapsed)
+
+
+def latency_stats():
+    """업스트림별 호출 수, 에러 수, 평균/최대 응답 시간(ms)"""
+    with _latency_lock:
+        return {
+            upstream: {
+                "count": s["count"],
+                "errors": s["errors"],
+                "avg_ms": round(s["total"] / s["count"] * 1000, 1) if s["count"] else 0.0,
+                "max_ms": round(s["max"] * 1000, 1),
+            }
+            for upstream, s in _latency.items()
+        }
@@ -0,0 +1,90 @@
+# ==============================
+# 🔹 도시명 → IATA 코드 변환
+# ==============================
+# iata_cities.json(주요 도시의 IATA 코드, 한국어/영어 이름, 별칭)으로 만든
+# 메모리 인덱스에서 먼저 찾고, 오타는 유사도 매칭으로 보정합니다.
+# 데이터셋에 없는 도시만 Amadeus 위치 검색을 호출하며,
+# 그 결과는 SQLite 캐시에 저장해서 재시작 후에도 다시 묻지 않습니다.
+
+import difflib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import SingleFlight, cache_key
+from countries import normalize_name
+
+IATA_CITIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "iata_cities.json")
+IATA_TTL = 30 * 24 * 60 * 60        # Amadeus에서 찾은 코드: 30일
+IATA_MISS_TTL = 24 * 60 * 60        # 못 찾은 도시: 1일
+FUZZY_CUTOFF = 0.8
+
+_CODE_PATTERN = re.compile(r"^[A-Z]{3}$")
+
+
+class IataResolver:
+    def __init__(self, lookup_remote, cache, overrides=None, path=IATA_CITIES_PATH):
+        """
+        lookup_remote: 도시명 → IATA 코드(또는 None)를 돌려주는 Amadeus 검색 함수
+        cache: Amadeus 결과를 저장할 TTLCache
+        overrides: 데이터셋보다 우선하는 직접 매핑
+        """
+        self._lookup_remote = lookup_remote
+        self._cache = cache
+        self._flight = SingleFlight()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="iata")
+        self._index = {}  # 정규화된 이름 -> 코드
+        self._codes = set()
+
+        with open(path, encoding="utf-8") as f:
+            for entry in json.load(f):
+                self._codes.add(entry["code"])
+                for name in [entry["en"], entry["ko"], *entry.get("aliases", [])]:
+                    self._index.setdefault(normalize_name(name), entry["code"])
+        for name, code in (overrides or {}).items():
+            self._index[normalize_name(name)] = code
+            self._codes.add(code)
+        self._names = list(self._index)
+
+    def resolve_local(self, city_name):
+        """데이터셋만으로 변환 (네트워크 호출 없음)"""
+        if not city_name:
+            return None
+        name = city_name.strip()
+        if _CODE_PATTERN.match(name):
+            return name  # 사용자가 코드를 직접 입력한 경우 (대문자 3글자)
+        key = normalize_name(name)
+        code = self._index.get(key)
+        if code:
+            return code
+        close = difflib.get_close_matches(key, self._names, n=1, cutoff=FUZZY_CUTOFF)
+        if close:
+            return self._index[close[0]]
+        # "Del"처럼 도시명일 수도 있는 입력은 이름으로 못 찾았을 때만 코드로 봄
+        return key.upper() if key.upper() in self._codes else None
+
+    def resolve(self, city_name):
+        code = self.resolve_local(city_name)
+        if code or not city_name:
+            return code
+
+        key = cache_key(city_name)
+        cached = self._cache.get("iata", key)
+        if cached is not None:
+            return cached or None
+        return self._flight.do(key, lambda: self._resolve_remote(key, city_name))
+
+    def resolve_pair(self, origin, destination):
+        """출발지/도착지를 동시에 변환"""
+        origin_future = self._executor.submit(self.resolve, origin)
+        destination_code = self.resolve(destination)
+        return origin_future.result(), destination_code
+
+    def _resolve_remote(self, key, city_name):
+        code = self._lookup_remote(city_name)
+        if code:
+            self._cache.set("iata", key, code, ttl=IATA_TTL)
+        else:
+            self._cache.set("iata", key, "", ttl=IATA_MISS_TTL)
+        return code
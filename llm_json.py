@@ -0,0 +1,202 @@
+# ==============================
+# 🔹 LLM 출력 JSON 파서
+# ==============================
+# Gemini 출력에서 JSON을 꺼내는 공용 함수들입니다.
+# - 문자 단위 상태 기계로 한 번만 훑기 때문에 입력 길이에 비례하는 시간이 듭니다.
+# - ```json 코드 펜스나 앞뒤 설명 문장은 자연스럽게 건너뜁니다.
+# - 큰따옴표 문자열 안의 작은따옴표(아포스트로피)는 그대로 둡니다.
+#   작은따옴표로 감싼 문자열은 파싱에 실패했을 때만 큰따옴표로 바꿔서 다시 시도합니다.
+#   괄호 짝을 맞출 때는 두 가지 따옴표 문자열을 모두 건너뜁니다 ('a]b' 안의 ]는 무시).
+# - 스트리밍 출력(청크)에도 그대로 쓸 수 있고, 중간에 잘린 배열은
+#   완성된 원소까지만 살려냅니다.
+# - 스키마(필수 필드 → 타입)에 맞지 않는 원소는 버립니다.
+# - 실패는 metrics.LLM_JSON_PARSE_FAILURES에 이유별로 셉니다.
+
+import json
+
+from metrics import LLM_JSON_PARSE_FAILURES
+
+
+class JsonScanner:
+    """첫 번째 균형 잡힌 JSON 배열/객체를 찾는 증분 스캐너
+
+    feed()에 청크를 넣다가 값이 닫히면 그 텍스트를 돌려준다.
+    on_item이 있으면 배열의 최상위 원소가 닫힐 때마다 원소 텍스트로 호출한다.
+    """
+
+    def __init__(self, openers="[{", on_item=None):
+        self._openers = openers
+        self._on_item = on_item
+        self._value = []         # 현재 값의 문자들
+        self._item_start = None  # 현재 최상위 원소가 시작된 위치
+        self._root = None        # 최상위 괄호 종류
+        self._depth = 0
+        self._quote = None       # 현재 문자열을 연 따옴표 (문자열 밖이면 None)
+        self._escape = False
+        self.result = None       # 완성된 값의 텍스트
+
+    def feed(self, chunk):
+        for ch in chunk:
+            if self.result is not None:
+                break
+            if self._depth == 0:
+                if ch in self._openers:
+                    self._root = ch
+                    self._depth = 1
+                    self._value = [ch]
+                continue
+
+            self._value.append(ch)
+            if self._quote is not None:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == self._quote:
+                    self._quote = None
+                continue
+
+            if ch in "\"'":
+                self._quote = ch
+            elif ch in "[{":
+                if self._depth == 1:
+                    self._item_start = len(self._value) - 1
+                self._depth += 1
+            elif ch in "]}":
+                self._depth -= 1
+                if self._depth == 1 and self._item_start is not None:
+                    if self._on_item is not None and self._root == "[":
+                        self._on_item("".join(self._value[self._item_start:]))
+                    self._item_start = None
+                elif self._depth == 0:
+                    self.result = "".join(self._value)
+        return self.result
+
+
+class JsonArrayStream:
+    """첫 번째 JSON 배열의 최상위 원소를 완성되는 대로 돌려주는 파서
+
+    사용 예:
+        parser = JsonArrayStream(ITINERARY_SCHEMA)
+        for chunk in chunks:
+            for item in parser.feed(chunk):
+                ...
+    """
+
+    def __init__(self, item_schema=None):
+        self._item_schema = item_schema
+        self._pending = []
+        self._scanner = JsonScanner("[", on_item=self._pending.append)
+
+    def feed(self, chunk):
+        self._scanner.feed(chunk)
+        items = []
+        for text in self._pending:
+            item = loads_lenient(text)
+            if item is None:
+                LLM_JSON_PARSE_FAILURES.inc(reason="invalid")
+            elif not matches_schema(item, self._item_schema):
+                LLM_JSON_PARSE_FAILURES.inc(reason="schema")
+            else:
+                items.append(item)
+        self._pending.clear()
+        return items
+
+    @property
+    def result(self):
+        """배열 전체가 닫혔으면 그 텍스트, 아니면 None"""
+        return self._scanner.result
+
+
+def loads_lenient(text):
+    """json.loads, 실패하면 작은따옴표 문자열을 바꿔서 한 번 더. 둘 다 실패하면 None"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    try:
+        return json.loads(requote(text))
+    except ValueError:
+        return None
+
+
+def requote(text):
+    """작은따옴표로 감싼 문자열을 큰따옴표 문자열로 바꾼다.
+
+    큰따옴표 문자열 안의 작은따옴표는 건드리지 않는다.
+    """
+    out = []
+    quote = None  # 현재 문자열을 연 따옴표
+    escape = False
+    for ch in text:
+        if quote is None:
+            if ch in "\"'":
+                quote = ch
+                out.append('"')
+            else:
+                out.append(ch)
+            continue
+
+        if escape:
+            escape = False
+            if quote == "'" and ch == "'":
+                out[-1] = "'"  # \' → '
+            else:
+                out.append(ch)
+        elif ch == "\\":
+            escape = True
+            out.append(ch)
+        elif ch == quote:
+            quote = None
+            out.append('"')
+        elif ch == '"':
+            out.append('\\"')  # 작은따옴표 문자열 안의 큰따옴표
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def matches_schema(value, schema):
+    """schema: {필드: 타입} (모두 필수). None이면 항상 통과"""
+    if schema is None:
+        return True
+    if not isinstance(value, dict):
+        return False
+    return all(isinstance(value.get(field), kind) for field, kind in schema.items())
+
+
+def parse_array(text, item_schema=None):
+    """텍스트에서 첫 번째 JSON 배열을 꺼내 스키마에 맞는 원소만 돌려준다.
+
+    배열이 중간에 잘렸으면 완성된 원소까지만 돌려준다.
+    """
+    item_texts = []
+    value = JsonScanner("[", on_item=item_texts.append).feed(text)
+    parsed = loads_lenient(value) if value is not None else None
+    if not isinstance(parsed, list):
+        # 배열 전체를 못 읽으면 원소 단위로 살릴 수 있는 것만
+        LLM_JSON_PARSE_FAILURES.inc(reason="truncated" if item_texts else "missing")
+        parsed = [loads_lenient(item) for item in item_texts]
+    valid = [item for item in parsed if item is not None]
+    items = [item for item in valid if matches_schema(item, item_schema)]
+    if len(valid) < len(parsed):
+        LLM_JSON_PARSE_FAILURES.inc(len(parsed) - len(valid), reason="invalid")
+    if len(items) < len(valid):
+        LLM_JSON_PARSE_FAILURES.inc(len(valid) - len(items), reason="schema")
+    return items
+
+
+def parse_object(text, schema=None):
+    """텍스트에서 첫 번째 JSON 객체를 꺼낸다. 없거나 스키마에 맞지 않으면 None"""
+    value = JsonScanner("{").feed(text)
+    if value is None:
+        LLM_JSON_PARSE_FAILURES.inc(reason="missing")
+        return None
+    parsed = loads_lenient(value)
+    if not isinstance(parsed, dict):
+        LLM_JSON_PARSE_FAILURES.inc(reason="invalid")
+        return None
+    if not matches_schema(parsed, schema):
+        LLM_JSON_PARSE_FAILURES.inc(reason="schema")
+        return None
+    return parsed
@@ -0,0 +1,204 @@
+# ==============================
+# 🔹 지표 수집 (Prometheus 텍스트 형식, /metrics)
+# ==============================
+# prometheus_client 없이 필요한 만큼만 구현했습니다.
+# - Counter / Histogram: 요청 경로에서 갱신 (라벨 튜플로 dict 조회 + bisect 한 번)
+# - register_collector(fn): 캐시 적중률처럼 이미 다른 곳에서 세고 있는 값은
+#   /metrics를 읽을 때만 fn()으로 가져옴 → 요청 경로 비용 없음
+#
+# 사용 예:
+#     REQUESTS = Counter("app_requests_total", "처리한 요청 수", ("route",))
+#     REQUESTS.inc(route="/recommend")
+#     LATENCY.observe(0.12, upstream="gemini")
+
+import bisect
+import threading
+
+# 초 단위 (Gemini 호출은 수 초~수십 초까지 걸림)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# 문자 수 단위 (프롬프트 / LLM 응답 크기)
+SIZE_BUCKETS = (100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_metrics = []      # 등록 순서대로 출력
+_collectors = []   # fn() → [(이름, 종류, 설명, [(라벨 dict, 값), ...]), ...]
+_registry_lock = threading.Lock()
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}   # 라벨 값 튜플 → 값
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _metrics.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key):
+        return dict(zip(self.labelnames, key))
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, self._labels(key), value) for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DURATION_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)  # value <= bucket인 첫 칸 (마지막 칸은 +Inf)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        samples = []
+        for key, counts, total in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append((self.name + "_bucket", {**labels, "le": _format_bound(bound)}, cumulative))
+            samples.append((self.name + "_sum", labels, total))
+            samples.append((self.name + "_count", labels, cumulative))
+        return samples
+
+
+def register_collector(fn):
+    """/metrics를 읽을 때마다 fn()을 호출해서 결과를 함께 출력"""
+    with _registry_lock:
+        _collectors.append(fn)
+    return fn
+
+
+def render():
+    """등록된 모든 지표 → Prometheus 텍스트 형식"""
+    with _registry_lock:
+        metrics, collectors = list(_metrics), list(_collectors)
+
+    lines = []
+    for metric in metrics:
+        _write_family(lines, metric.name, metric.kind, metric.help, metric.samples())
+
+    # 같은 이름은 여러 수집 함수에서 와도 한 묶음으로 (Prometheus는 이름당 TYPE 한 번)
+    collected = {}
+    for collect in collectors:
+        try:
+            families = collect()
+        except Exception:
+            continue  # 수집 하나가 실패해도 나머지는 출력
+        for name, kind, help_text, values in families:
+            family = collected.setdefault(name, (kind, help_text, []))
+            family[2].extend((name, labels, value) for labels, value in values)
+    for name, (kind, help_text, samples) in collected.items():
+        _write_family(lines, name, kind, help_text, samples)
+    return "\n".join(lines) + "\n"
+
+
+def _write_family(lines, name, kind, help_text, samples):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for sample_name, labels, value in samples:
+        lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+# ==============================
+# 🔹 공용 지표
+# ==============================
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "경로별 요청 처리 시간 (스트리밍 응답은 첫 응답까지)",
+    ("route", "method", "status"),
+)
+UPSTREAM_SECONDS = Histogram(
+    "upstream_request_duration_seconds",
+    "외부 API 호출 시간 (재시도 포함)",
+    ("upstream", "outcome"),
+)
+LLM_PROMPT_CHARS = Histogram(
+    "llm_prompt_chars", "Gemini 프롬프트 길이(문자 수)", ("mode",), buckets=SIZE_BUCKETS,
+)
+LLM_RESPONSE_CHARS = Histogram(
+    "llm_response_chars", "Gemini 응답 길이(문자 수)", ("mode",), buckets=SIZE_BUCKETS,
+)
+LLM_JSON_PARSE_FAILURES = Counter(
+    "llm_json_parse_failures_total",
+    "LLM 출력 JSON 파싱 실패 (missing: JSON 없음, invalid: 파싱 불가, truncated: 잘린 배열, schema: 스키마 불일치)",
+    ("reason",),
+)
+
+
+def observe_upstream(upstream, elapsed, ok):
+    UPSTREAM_SECONDS.observe(elapsed, upstream=upstream, outcome="ok" if ok else "error")
+
+
+def observe_llm(prompt, text, mode="sync"):
+    LLM_PROMPT_CHARS.observe(len(prompt), mode=mode)
+    LLM_RESPONSE_CHARS.observe(len(text or ""), mode=mode)
+
+
+def cache_families(name, stats):
+    """TTLCache / SemanticCache / StaleWhileRevalidateCache의 stats() → 적중/실패 수와 적중률"""
+    requests, ratios = [], []
+    for namespace, counts in stats.items():
+        if namespace.startswith("_") or not isinstance(counts, dict):
+            continue
+        for result in ("hits", "misses", "stale"):
+            if result in counts:
+                requests.append(({"cache": name, "namespace": namespace, "result": result}, counts[result]))
+        if "hit_ratio" in counts:
+            ratios.append(({"cache": name, "namespace": namespace}, counts["hit_ratio"]))
+    return [
+        ("cache_requests_total", "counter", "캐시 조회 결과별 횟수", requests),
+        ("cache_hit_ratio", "gauge", "캐시 적중률", ratios),
+    ]
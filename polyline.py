@@ -0,0 +1,105 @@
+# ==============================
+# 🔹 인코딩된 폴리라인 (Google / GraphHopper 형식) 처리
+# ==============================
+# 긴 자동차 경로는 points가 수천 개라 브라우저가 디코딩/그리기에 오래 걸립니다.
+# 서버에서 좌표 배열로 디코딩한 뒤 Douglas–Peucker로 줄이고 다시 인코딩합니다.
+# 허용 오차는 지도 줌 레벨의 1픽셀 크기로 정하므로 화면에서는 차이가 보이지 않습니다.
+
+import functools
+import math
+
+import numpy as np
+
+TILE_SIZE = 256        # Leaflet / OSM 타일 한 장의 픽셀 수
+MAX_ZOOM = 18
+FIT_WIDTH_PX = 1024    # 줌을 주지 않았을 때 경로 전체가 들어간다고 보는 지도 폭
+
+
+def decode(encoded, precision=5):
+    """인코딩된 폴리라인 → (n, 2) 배열 [[위도, 경도], ...]"""
+    values = []
+    value = shift = 0
+    for ch in encoded:
+        byte = ord(ch) - 63
+        value |= (byte & 0x1F) << shift
+        shift += 5
+        if byte < 0x20:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+    deltas = np.array(values[:len(values) // 2 * 2], dtype=np.int64).reshape(-1, 2)
+    return np.cumsum(deltas, axis=0) / 10 ** precision
+
+
+def encode(coords, precision=5):
+    """[[위도, 경도], ...] → 인코딩된 폴리라인"""
+    points = np.round(np.asarray(coords, dtype=np.float64).reshape(-1, 2) * 10 ** precision).astype(np.int64)
+    deltas = np.diff(points, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    out = []
+    for delta in deltas.tolist():
+        value = ~(delta << 1) if delta < 0 else delta << 1
+        while value >= 0x20:
+            out.append(chr((0x20 | (value & 0x1F)) + 63))
+            value >>= 5
+        out.append(chr(value + 63))
+    return "".join(out)
+
+
+def simplify(coords, tolerance):
+    """Douglas–Peucker. tolerance는 경도 기준 도(degree) 단위 (위도에 따라 보정)"""
+    coords = np.asarray(coords, dtype=np.float64)
+    n = len(coords)
+    if n < 3 or tolerance <= 0:
+        return coords
+
+    # 경도 간격을 위도에 맞춰 줄인 평면 좌표에서 거리를 잰다
+    xy = np.column_stack((coords[:, 1] * math.cos(math.radians(coords[:, 0].mean())), coords[:, 0]))
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        dx, dy = xy[last] - xy[first]
+        rel = xy[first + 1:last] - xy[first]
+        length = math.hypot(dx, dy)
+        if length:
+            distances = np.abs(dx * rel[:, 1] - dy * rel[:, 0]) / length
+        else:
+            distances = np.hypot(rel[:, 0], rel[:, 1])
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            middle = first + 1 + farthest
+            keep[middle] = True
+            stack.append((first, middle))
+            stack.append((middle, last))
+    return coords[keep]
+
+
+def tolerance_for_zoom(zoom, lat=0.0):
+    """줌 레벨에서 화면 1픽셀이 차지하는 크기 (simplify용 단위)"""
+    return 360.0 * math.cos(math.radians(lat)) / (TILE_SIZE * 2 ** zoom)
+
+
+def fit_zoom(coords, width_px=FIT_WIDTH_PX):
+    """경로 전체가 width_px 폭 지도에 들어가는 줌 레벨"""
+    lat0 = math.radians(coords[:, 0].mean())
+    extent = max(np.ptp(coords[:, 1]), np.ptp(coords[:, 0]) / max(math.cos(lat0), 1e-6))
+    if extent <= 0:
+        return MAX_ZOOM
+    return int(min(MAX_ZOOM, max(0, math.floor(math.log2(360.0 * width_px / (TILE_SIZE * extent))))))
+
+
+@functools.lru_cache(maxsize=256)
+def simplify_encoded(encoded, zoom=None):
+    """인코딩된 폴리라인을 줌 레벨에 맞게 줄임. (인코딩 결과, 원래 점 수, 줄인 점 수)
+
+    zoom이 None이면 경로 전체가 한 화면에 들어가는 줌을 쓴다.
+    """
+    coords = decode(encoded)
+    if len(coords) < 3:
+        return encoded, len(coords), len(coords)
+    if zoom is None:
+        zoom = fit_zoom(coords)
+    simplified = simplify(coords, tolerance_for_zoom(zoom, coords[:, 0].mean()))
+    return encode(simplified), len(coords), len(simplified)
@@ -1,8 +1,16 @@
 from flask import Flask, request, jsonify, render_template
 import os
+import sys
+import threading
+from collections import deque
 from openai import OpenAI
 import json
 
+# 상위 폴더의 공용 모듈 (catalogue.py, cache.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cache import TTLCache, cache_key
+from catalogue import Catalogue
+
 app = Flask(__name__)
 
 # OpenAI 클라이언트 설정
@@ -18,6 +26,27 @@ travel_data = [
     {"name": "부산 해운대", "region": "한국", "theme": "액티비티", "description": "해수욕과 다양한 해양 스포츠"}
 ]
 
+# 1단계: 카탈로그 색인 조회 (catalogue.py) → 2단계: GPT 응답 캐시 → 3단계: GPT 호출
+# GPT 결과는 카탈로그에도 추가해서 다음부터 1단계에서 답합니다.
+# 추가한 여행지는 MAX_LEARNED개까지만 두고 오래된 것부터 뺍니다 (원래 travel_data는 유지).
+GPT_CACHE_TTL = 6 * 60 * 60
+MAX_LEARNED = 1000
+
+catalogue = Catalogue(travel_data, fields=("region", "theme"))
+catalogue_lock = threading.Lock()
+learned_slots = deque()  # GPT 결과로 추가한 slot (오래된 순)
+gpt_cache = TTLCache(maxsize=512, ttls={"recommend": GPT_CACHE_TTL})
+
+def learn(recommendations, country, theme):
+    """GPT 추천 결과를 카탈로그에 추가"""
+    with catalogue_lock:
+        for place in recommendations:
+            if not isinstance(place, dict):
+                continue
+            learned_slots.append(catalogue.add({**place, "region": country, "theme": theme}))
+            if len(learned_slots) > MAX_LEARNED:
+                catalogue.remove(learned_slots.popleft())
+
 # HTML 페이지 라우트
 @app.route('/')
 def index():
@@ -27,11 +56,19 @@ def index():
 @app.route('/recommend', methods=['POST'])
 def recommend():
     data = request.get_json()
-    country = data.get('country', '')
-    theme = data.get('theme', '')
+    country = (data.get('country') or '').strip()
+    theme = (data.get('theme') or '').strip()
+
+    # 카탈로그 색인 조회
+    with catalogue_lock:
+        filtered_results = catalogue.filter(region=country, theme=theme)
+    if filtered_results:
+        return recommend_response(filtered_results, "catalogue")
 
-    # 기존 필터링
-    filtered_results = [t for t in travel_data if t['region'] == country and t['theme'] == theme]
+    key = cache_key(country, theme)
+    cached = gpt_cache.get("recommend", key)
+    if cached is not None:
+        return recommend_response(cached, "cache")
 
     # GPT에게 추천 요청
     prompt = f"""
@@ -47,26 +84,36 @@ def recommend():
             max_tokens=300
         )
         gpt_text = response.choices[0].message.content
+        tier = "llm"
 
         # GPT 출력 파싱
         try:
             recommendations = json.loads(gpt_text.replace("'", '"'))
+            if not recommendations:
+                raise ValueError("빈 추천 목록")
+            # 제대로 파싱된 결과만 캐시하고 카탈로그에 추가
+            gpt_cache.set("recommend", key, recommendations)
+            learn(recommendations, country, theme)
         except:
             # JSON 파싱 실패 시 fallback
             recommendations = [
                 {"name": "추천 여행지", "region": country, "description": gpt_text}
             ]
+            tier = "fallback"
 
     except Exception as e:
         # GPT 호출 실패 시 fallback
         recommendations = [
             {"name": "추천 여행지", "region": country, "description": f"⚠ GPT 호출 실패: {e}"}
         ]
+        tier = "fallback"
 
-    # 기존 필터 결과 + GPT 추천 통합
-    combined_results = filtered_results + recommendations
+    return recommend_response(recommendations, tier)
 
-    return jsonify(combined_results)
+def recommend_response(results, tier):
+    response = jsonify(results)
+    response.headers["X-Recommend-Tier"] = tier  # catalogue / cache / llm / fallback
+    return response
 
 if __name__ == "__main__":
     app.run(debug=True)
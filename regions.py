@@ -0,0 +1,91 @@
+# ==============================
+# 🔹 지역 데이터 API용 사전 인코딩
+# ==============================
+# countries.json을 서버 시작 시 한 번 읽어서
+#   대륙 → 국가 → {subregion, lat, lng, cities}
+# 구조로 정리해 두고, 요청된 하위 트리의 JSON / gzip / brotli 바이트와
+# ETag를 한 번만 만들어 재사용합니다.
+
+import functools
+import gzip
+import hashlib
+import json
+import os
+
+from countries import COUNTRIES_PATH, CONTINENTS, iter_countries
+
+try:
+    import brotli
+except ImportError:  # brotli가 없으면 gzip만 사용
+    brotli = None
+
+
+def _build_tree():
+    tree = {continent: {} for continent in CONTINENTS}
+    for continent, subregion, country, info in iter_countries():
+        tree.setdefault(continent, {})[country] = {
+            "subregion": subregion,
+            "lat": info["lat"],
+            "lng": info["lng"],
+            "cities": info.get("cities", {}),
+        }
+    return tree
+
+
+REGION_TREE = _build_tree()
+LAST_MODIFIED = int(os.path.getmtime(COUNTRIES_PATH))  # Last-Modified 헤더용 타임스탬프
+
+
+def subtree(continent=None, country=None):
+    """요청 경로에 해당하는 데이터. 없는 대륙/국가면 None
+
+    - 대륙/국가 없음: 대륙 → 국가 → {subregion, lat, lng} (도시 제외)
+    - 대륙만: 국가 → {subregion, lat, lng} (도시 제외)
+    - 대륙 + 국가: {subregion, lat, lng, cities}
+    """
+    if continent is None:
+        return {cont: _without_cities(countries) for cont, countries in REGION_TREE.items()}
+    countries = REGION_TREE.get(continent)
+    if countries is None:
+        return None
+    if country is None:
+        return _without_cities(countries)
+    return countries.get(country)
+
+
+def _without_cities(countries):
+    return {
+        name: {k: v for k, v in info.items() if k != "cities"}
+        for name, info in countries.items()
+    }
+
+
+class EncodedPayload:
+    """한 번 만든 JSON 본문과 압축본, ETag"""
+
+    __slots__ = ("identity", "gzip", "br", "etag")
+
+    def __init__(self, payload):
+        self.identity = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.gzip = gzip.compress(self.identity, compresslevel=9)
+        self.br = brotli.compress(self.identity) if brotli is not None else None
+        self.etag = hashlib.sha1(self.identity).hexdigest()[:16]
+
+    def body_for(self, accept_encoding):
+        """(본문, Content-Encoding 또는 None, ETag)
+
+        압축 방식마다 본문 바이트가 다르므로 ETag도 따로 둔다.
+        """
+        accepted = {part.split(";")[0].strip() for part in (accept_encoding or "").split(",")}
+        if self.br is not None and "br" in accepted:
+            return self.br, "br", self.etag + "-br"
+        if "gzip" in accepted:
+            return self.gzip, "gzip", self.etag + "-gz"
+        return self.identity, None, self.etag
+
+
+@functools.lru_cache(maxsize=512)
+def encoded_subtree(continent=None, country=None):
+    """EncodedPayload 또는 None (경로별로 한 번만 인코딩)"""
+    payload = subtree(continent, country)
+    return EncodedPayload(payload) if payload is not None else None
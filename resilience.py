@@ -0,0 +1,266 @@
+# ==============================
+# 🔹 업스트림 호출 예산 (속도 제한 / 서킷 브레이커 / 부하 차단)
+# ==============================
+# Gemini, Unsplash, Amadeus, GraphHopper 등이 느려지거나 장애가 나면
+# 모든 핸들러가 계속 호출하고 타임아웃까지 기다리다 워커가 바닥납니다.
+#
+# - TokenBucket: 업스트림 할당량에 맞춘 초당 호출 수. 잠깐(max_wait) 기다려도
+#   토큰이 안 생기면 바로 UpstreamUnavailable
+# - CircuitBreaker: 연속 failure_threshold번 실패하면 reset_timeout초 동안 호출하지 않고
+#   바로 UpstreamUnavailable → 핸들러의 기존 fallback(placeholder 이미지, 기본 추천 등)으로
+#   그 뒤 한 번만 시험 호출(half-open)해서 성공하면 다시 닫힘
+# - ConcurrencyLimiter: 앱 전체 동시 처리 요청 수 상한 (넘으면 503으로 바로 거절)
+#
+# 업스트림별 설정은 PROVIDERS, 환경 변수 <UPSTREAM>_RATE_LIMIT="초당 호출 수[/버스트]"로 바꿀 수 있습니다.
+# 예: GEMINI_RATE_LIMIT=2/5
+# call()/acall()로 감싼 SDK 호출(Gemini, Amadeus SDK)은 여기서 응답 시간도 기록합니다
+# (http_client를 거치는 호출은 http_client가 기록).
+
+import asyncio
+import contextlib
+import os
+import threading
+import time
+
+import metrics
+
+PROVIDERS = {
+    #               초당 호출 수, 버스트, 토큰 대기 상한(초)
+    "gemini":      {"rate": 5,   "burst": 10, "max_wait": 0.5},
+    "unsplash":    {"rate": 1.4, "burst": 20, "max_wait": 0},    # 5000회/시간
+    "amadeus":     {"rate": 10,  "burst": 10, "max_wait": 0.5},  # test 환경 10 TPS
+    "graphhopper": {"rate": 2,   "burst": 5,  "max_wait": 0.5},
+    "nominatim":   {"rate": 1,   "burst": 1,  "max_wait": 2},    # 이용 정책: 초당 1회
+    "otp":         {"rate": 20,  "burst": 40, "max_wait": 0.2},  # 자체 서버
+}
+DEFAULT_PROVIDER = {"rate": 10, "burst": 10, "max_wait": 0.5}
+
+FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+FAILURE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class UpstreamUnavailable(Exception):
+    """속도 제한에 걸렸거나 서킷이 열려 있어서 호출하지 않음"""
+
+    def __init__(self, upstream, reason, retry_after=1):
+        super().__init__(f"{upstream} 호출 불가 ({reason})")
+        self.upstream = upstream
+        self.reason = reason          # "rate_limited" / "circuit_open"
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait=0.0):
+        """토큰 하나를 예약하고 기다려야 할 시간(초)을 돌려줌. max_wait를 넘으면 None (예약 안 함)"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+            if wait > max_wait:
+                return None
+            self._tokens -= 1  # 음수가 되면 뒤에 오는 호출이 그만큼 더 기다림
+            return wait
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        """닫혀 있으면 True, half-open이면 시험 호출 한 번만 True"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def retry_after(self):
+        if self._opened_at is None:
+            return 0
+        return max(1, int(self.reset_timeout - (time.monotonic() - self._opened_at)) + 1)
+
+    def release(self):
+        """allow() 뒤 호출하지 않고 끝난 경우 (half-open 시험 기회를 돌려줌)"""
+        with self._lock:
+            self._probing = False
+
+    def record(self, ok):
+        with self._lock:
+            self._probing = False
+            if ok:
+                self._failures = 0
+                self._opened_at = None
+                return
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()  # half-open 시험이 실패하면 다시 열림
+
+
+class UpstreamGuard:
+    """업스트림 하나의 속도 제한 + 서킷 브레이커"""
+
+    def __init__(self, name, rate, burst, max_wait=0.0):
+        self.name = name
+        self.max_wait = max_wait
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker()
+        self._stats = {"calls": 0, "failures": 0, "rate_limited": 0, "short_circuited": 0}
+        self._stats_lock = threading.Lock()
+
+    def admit(self):
+        """호출해도 되면 먼저 기다릴 시간(초), 아니면 UpstreamUnavailable"""
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise UpstreamUnavailable(self.name, "circuit_open", self.breaker.retry_after())
+        wait = self.bucket.reserve(self.max_wait)
+        if wait is None:
+            self.breaker.release()
+            self._count("rate_limited")
+            raise UpstreamUnavailable(self.name, "rate_limited")
+        self._count("calls")
+        return wait
+
+    def record(self, ok):
+        if not ok:
+            self._count("failures")
+        self.breaker.record(ok)
+
+    def stats(self):
+        with self._stats_lock:
+            return {**self._stats, "state": self.breaker.state}
+
+    def _count(self, field):
+        with self._stats_lock:
+            self._stats[field] += 1
+
+
+_guards = {}
+_guards_lock = threading.Lock()
+
+
+def _provider_config(name):
+    config = dict(PROVIDERS.get(name, DEFAULT_PROVIDER))
+    override = os.getenv(f"{name.upper()}_RATE_LIMIT")
+    if override:
+        rate, _, burst = override.partition("/")
+        config["rate"] = float(rate)
+        config["burst"] = float(burst) if burst else max(1.0, float(rate))
+    return config
+
+
+def guard(name):
+    """업스트림 전용 UpstreamGuard (처음 호출 시 생성)"""
+    upstream = _guards.get(name)
+    if upstream is not None:
+        return upstream
+    with _guards_lock:
+        upstream = _guards.get(name)
+        if upstream is None:
+            upstream = _guards[name] = UpstreamGuard(name, **_provider_config(name))
+    return upstream
+
+
+def is_failure_status(status_code):
+    return status_code in FAILURE_STATUSES
+
+
+@contextlib.contextmanager
+def call(name, is_failure=lambda error: True):
+    """with call("gemini"): ... — 블록 안의 예외를 실패로 기록 (is_failure가 False인 예외 제외)"""
+    upstream = guard(name)
+    wait = upstream.admit()
+    if wait:
+        time.sleep(wait)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        ok = not is_failure(e)
+        metrics.observe_upstream(name, time.perf_counter() - start, ok)
+        upstream.record(ok)
+        raise
+    except BaseException:
+        upstream.breaker.release()  # 스트리밍 중 연결이 끊긴 경우 등 (성공/실패로 세지 않음)
+        raise
+    metrics.observe_upstream(name, time.perf_counter() - start, True)
+    upstream.record(True)
+
+
+@contextlib.asynccontextmanager
+async def acall(name, is_failure=lambda error: True):
+    """call()의 비동기 버전 (토큰 대기 중 이벤트 루프를 막지 않음)"""
+    upstream = guard(name)
+    wait = upstream.admit()
+    if wait:
+        await asyncio.sleep(wait)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        ok = not is_failure(e)
+        metrics.observe_upstream(name, time.perf_counter() - start, ok)
+        upstream.record(ok)
+        raise
+    except BaseException:
+        upstream.breaker.release()  # 스트리밍 중 연결이 끊긴 경우 등 (성공/실패로 세지 않음)
+        raise
+    metrics.observe_upstream(name, time.perf_counter() - start, True)
+    upstream.record(True)
+
+
+def stats():
+    """업스트림별 호출/실패/거절 수와 서킷 상태"""
+    with _guards_lock:
+        guards = list(_guards.values())
+    return {upstream.name: upstream.stats() for upstream in guards}
+
+
+class ConcurrencyLimiter:
+    """동시에 처리 중인 요청 수 상한 (넘으면 기다리지 않고 거절)"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._active = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    def try_enter(self):
+        with self._lock:
+            if self._active >= self.limit:
+                self._rejected += 1
+                return False
+            self._active += 1
+            return True
+
+    def exit(self):
+        with self._lock:
+            self._active -= 1
+
+    def stats(self):
+        with self._lock:
+            return {"active": self._active, "limit": self.limit, "rejected": self._rejected}
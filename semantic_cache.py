@@ -0,0 +1,178 @@
+# ==============================
+# 🔹 유사 요청 캐시 (semantic cache)
+# ==============================
+# "파리 3일 일정"과 "Paris 3일 일정", "휴양"과 "휴양 여행"처럼
+# 표현만 조금 다른 요청은 정확한 키 캐시(TTLCache)에 걸리지 않습니다.
+# 요청 파라미터를 가벼운 로컬 벡터로 바꿔 NumPy 행렬에 모아 두고,
+# 코사인 유사도가 threshold 이상인 이전 응답을 돌려줍니다.
+#
+# 벡터 만들기 (외부 임베딩 서비스 없음)
+# - 한국어 지명은 place_names.json으로 영어 이름으로 맞춤 ("파리" → "paris")
+# - 단어 + 문자 3-gram을 해시해서 dim 차원에 더함 (부호 있는 feature hashing)
+# - 필드마다 따로 정규화한 뒤 weights만큼 곱해서 합침
+# scope가 다른 항목(예: 여행 기간이 다른 일정, 지역이 다른 추천)은 비교하지 않습니다.
+# 결과의 범위를 정하는 값(대륙/하위 지역/국가 등)은 벡터에 넣지 말고 scope_key()로 scope에 넣습니다.
+# 벡터에서는 "북유럽"과 "남유럽"처럼 글자가 거의 같은 값이 비슷하게 나오기 때문입니다.
+# 여행지 목록처럼 하나만 달라도 결과가 달라지는 값은 set_key()로 scope에 넣습니다.
+
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from countries import english_name
+
+_WORD_RE = re.compile(r"[\w']+")
+
+
+def _words(value):
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [word for item in value for word in _words(item)]
+    words = []
+    for word in _WORD_RE.findall(str(value)):
+        words.append((english_name(word) or word).lower())
+    return words
+
+
+def _features(words):
+    for word in words:
+        yield "w:" + word
+        padded = f"<{word}>"
+        for i in range(len(padded) - 2):
+            yield "g:" + padded[i:i + 3]
+
+
+def scope_key(*values):
+    """scope로 쓸 문자열 (지명은 embed와 같은 방식으로 맞춤: "파리" == "Paris")"""
+    return "|".join(" ".join(_words(value)) for value in values)
+
+
+def set_key(values):
+    """순서와 표기를 무시한 집합 scope ("파리, 로마" == "Rome, Paris", 하나라도 다르면 다른 값)"""
+    return "|".join(sorted({" ".join(_words(value)) for value in values or []} - {""}))
+
+
+def embed(fields, dim=1024, weights=None):
+    """{필드: 값} → 길이 1인 float32 벡터 (값이 모두 비면 0 벡터)"""
+    weights = weights or {}
+    vector = np.zeros(dim, dtype=np.float32)
+    for field, value in fields.items():
+        part = np.zeros(dim, dtype=np.float32)
+        for feature in _features(_words(value)):
+            h = zlib.crc32(f"{field}\0{feature}".encode("utf-8"))
+            part[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norm = np.linalg.norm(part)
+        if norm:
+            vector += part / norm * weights.get(field, 1.0)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticCache:
+    """namespace별 TTL을 가지는 유사도 기반 캐시 (스레드 안전, 크기 제한)"""
+
+    def __init__(self, threshold=0.92, maxsize=1024, dim=1024, ttls=None, default_ttl=3600, weights=None):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.dim = dim
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.weights = dict(weights or {})
+        self._vectors = np.zeros((maxsize, dim), dtype=np.float32)
+        self._scopes = np.full(maxsize, -1, dtype=np.int64)   # 행 → (namespace, scope) 코드, -1은 빈 행
+        self._expires = np.zeros(maxsize, dtype=np.float64)
+        self._last_used = np.zeros(maxsize, dtype=np.int64)
+        self._values = [None] * maxsize
+        self._scope_codes = {}   # (namespace, scope) → 코드
+        self._clock = 0          # LRU용 사용 순번
+        self._lock = threading.Lock()
+        self._stats = {}         # namespace → {"hits": n, "misses": n}
+
+    def ttl_for(self, namespace):
+        return self.ttls.get(namespace, self.default_ttl)
+
+    def get(self, namespace, fields, scope=""):
+        """가장 비슷한 캐시 값을 반환하고, threshold 미만이면 None"""
+        vector = embed(fields, self.dim, self.weights)
+        now = time.time()
+        with self._lock:
+            code = self._scope_codes.get((namespace, scope))
+            rows = self._live_rows(code, now) if code is not None else None
+            if rows is None or not len(rows) or not vector.any():
+                self._count(namespace, "misses")
+                return None
+            similarities = self._vectors[rows] @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self._count(namespace, "misses")
+                return None
+            row = rows[best]
+            self._touch(row)
+            self._count(namespace, "hits")
+            return self._values[row]
+
+    def set(self, namespace, fields, value, scope=""):
+        vector = embed(fields, self.dim, self.weights)
+        if not vector.any():
+            return
+        now = time.time()
+        with self._lock:
+            code = self._scope_codes.setdefault((namespace, scope), len(self._scope_codes))
+            row = self._same_row(code, vector, now)
+            if row is None:
+                row = self._free_row(now)
+            self._vectors[row] = vector
+            self._scopes[row] = code
+            self._expires[row] = now + self.ttl_for(namespace)
+            self._values[row] = value
+            self._touch(row)
+
+    def stats(self):
+        """namespace별 hit/miss 카운터와 현재 항목 수"""
+        with self._lock:
+            result = {}
+            for namespace, counts in self._stats.items():
+                total = counts["hits"] + counts["misses"]
+                result[namespace] = {
+                    "hits": counts["hits"],
+                    "misses": counts["misses"],
+                    "hit_ratio": round(counts["hits"] / total, 3) if total else 0.0,
+                    "ttl": self.ttl_for(namespace),
+                }
+            result["_size"] = int(np.count_nonzero(self._scopes >= 0))
+            result["_threshold"] = self.threshold
+            return result
+
+    # ------------------------------
+    # 내부 함수 (호출 시 _lock 보유)
+    # ------------------------------
+    def _live_rows(self, code, now):
+        return np.flatnonzero((self._scopes == code) & (self._expires > now))
+
+    def _same_row(self, code, vector, now):
+        """거의 같은 벡터가 이미 있으면 그 행 (덮어쓰기용)"""
+        rows = self._live_rows(code, now)
+        if not len(rows):
+            return None
+        similarities = self._vectors[rows] @ vector
+        best = int(np.argmax(similarities))
+        return int(rows[best]) if similarities[best] >= 0.999 else None
+
+    def _free_row(self, now):
+        """빈 행 → 만료된 행 → 가장 오래 안 쓴 행 순서로 고름"""
+        expired = np.flatnonzero((self._scopes < 0) | (self._expires <= now))
+        if len(expired):
+            return int(expired[0])
+        return int(np.argmin(self._last_used))
+
+    def _touch(self, row):
+        self._clock += 1
+        self._last_used[row] = self._clock
+
+    def _count(self, namespace, kind):
+        counts = self._stats.setdefault(namespace, {"hits": 0, "misses": 0})
+        counts[kind] += 1
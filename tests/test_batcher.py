@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from batcher import MicroBatcher
+
+
+def recording(results=None):
+    batches = []
+
+    def process(items):
+        batches.append(list(items))
+        return {item: item.upper() for item in items} if results is None else results
+
+    return process, batches
+
+
+def test_items_within_window_share_one_call():
+    process, batches = recording()
+    batcher = MicroBatcher(process, window=0.05, max_batch=8)
+    futures = [batcher.submit(item) for item in ("a", "b", "c")]
+    assert [f.result(timeout=1) for f in futures] == ["A", "B", "C"]
+    assert batches == [["a", "b", "c"]]
+    assert batcher.stats() == {"batches": 1, "items": 3, "avg_batch_size": 3.0}
+
+
+def test_same_key_waits_on_the_same_future():
+    process, batches = recording()
+    batcher = MicroBatcher(process, key=str.lower, window=0.05)
+    first, second = batcher.submit("a"), batcher.submit("A")
+    assert first is second
+    assert first.result(timeout=1) == "A"
+    assert batches == [["a"]]
+
+
+def test_full_batch_runs_without_waiting_for_the_window():
+    process, batches = recording()
+    batcher = MicroBatcher(process, window=10, max_batch=2)
+    futures = [batcher.submit(item) for item in ("a", "b")]
+    assert [f.result(timeout=1) for f in futures] == ["A", "B"]
+
+
+def test_missing_results_are_none_and_errors_reach_every_caller():
+    process, _ = recording(results={"a": 1})
+    batcher = MicroBatcher(process, window=0.01)
+    assert batcher.submit("b").result(timeout=1) is None
+
+    def failing(items):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher(failing, window=0.01)
+    futures = [batcher.submit(item) for item in ("a", "b")]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=1)
+
+
+def test_key_is_free_again_after_the_batch():
+    gate = threading.Event()
+
+    def process(items):
+        gate.wait(1)
+        return {item: item for item in items}
+
+    batcher = MicroBatcher(process, window=0.01)
+    first = batcher.submit("a")
+    gate.set()
+    first.result(timeout=1)
+    assert batcher.submit("a") is not first
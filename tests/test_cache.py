@@ -0,0 +1,31 @@
+import sqlite3
+import time
+
+from cache import TTLCache
+
+
+def db_keys(path):
+    with sqlite3.connect(path) as db:
+        return sorted(key for (key,) in db.execute("SELECT key FROM cache"))
+
+
+def test_expired_rows_are_purged_on_write(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = TTLCache(db_path=path, purge_interval=0)
+    cache.set("ns", "old", 1, ttl=0.01)
+    time.sleep(0.02)
+    cache.set("ns", "new", 2)
+    assert db_keys(path) == ["new"]
+
+
+def test_expired_rows_are_purged_on_open(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = TTLCache(db_path=path)
+    cache.set("ns", "old", 1, ttl=0.01)
+    cache.set("ns", "kept", 2)
+    time.sleep(0.02)
+    assert db_keys(path) == ["kept", "old"]  # purge_interval이 지나기 전에는 그대로
+
+    reopened = TTLCache(db_path=path)
+    assert db_keys(path) == ["kept"]
+    assert reopened.get("ns", "kept") == 2
@@ -0,0 +1,53 @@
+import importlib.util
+import itertools
+import os
+
+from catalogue import Catalogue
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_travel_data():
+    spec = importlib.util.spec_from_file_location("untitled_1", os.path.join(ROOT, "Untitled-1.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.travel_data
+
+
+def baseline_recommend(data, season, theme, user_type):
+    """카탈로그 도입 전 recommend_travel (셔플 전 순서)"""
+    results = []
+    for t in data:
+        score = 0
+        if t["season"] == season:
+            score += 2
+        elif t["season"] == "사계절":
+            score += 1
+        if t["theme"] == theme:
+            score += 3
+        if user_type.lower() in t["theme"].lower():
+            score += 2
+        if score > 0:
+            results.append((score, t))
+    results.sort(reverse=True, key=lambda x: x[0])
+    return [r[1] for r in results[:3]]
+
+
+def test_recommend_matches_baseline_including_blank_inputs():
+    data = load_travel_data()
+    catalogue = Catalogue(data)
+    seasons = ["", "봄", "여름", "가을", "겨울", "사계절"]
+    themes = ["", "힐링", "액티비티", "문화", "쇼핑", "미식"]
+    user_types = ["", "힐링형", "액티비티", "문화", "쇼핑"]
+    for season, theme, user_type in itertools.product(seasons, themes, user_types):
+        expected = baseline_recommend(data, season, theme, user_type)
+        assert catalogue.recommend(season, theme, user_type, k=3) == expected, (season, theme, user_type)
+
+
+def test_removed_slot_is_not_recommended_and_is_reused():
+    data = load_travel_data()
+    catalogue = Catalogue(data)
+    assert catalogue.remove(0)
+    assert all(item["name"] != "제주도" for item in catalogue.recommend("여름", "힐링", "", k=10))
+    assert catalogue.add(data[0]) == 0
+    assert catalogue.filter(region="한국", theme="힐링") == [data[0]]
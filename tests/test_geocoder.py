@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+pytest.importorskip("requests")  # geocoder → http_client
+os.environ.setdefault("GEOCODE_CACHE_DB", "")  # import 시 SQLite 파일을 만들지 않음
+
+from geocoder import LocalGeocoder
+
+PARIS = (48.8566, 2.3522)
+
+
+@pytest.fixture(scope="module")
+def local():
+    return LocalGeocoder()
+
+
+def test_exact_name_in_either_language(local):
+    assert local.lookup("파리") == PARIS
+    assert local.lookup(" PARIS ") == PARIS
+
+
+@pytest.mark.parametrize("query", ["Pa", "Par", "San", "New"])
+def test_ambiguous_prefix_falls_through(local, query):
+    assert local.lookup(query) is None
+
+
+def test_unique_prefix_and_leading_words_match(local):
+    rio = local.lookup("Rio de Janeiro")
+    assert rio is not None
+    assert local.lookup("Rio de") == rio
@@ -0,0 +1,27 @@
+from hotels import HotelList, HotelRecord
+
+
+def test_null_fields_fall_back_to_na():
+    record = HotelRecord.from_api({"hotelId": None, "name": None, "chainCode": None})
+    assert record.to_dict() == {"hotelName": "N/A", "hotelId": "N/A", "chainCode": "N/A"}
+
+
+def test_null_chain_code_does_not_break_the_list():
+    hotels = HotelList.from_api([
+        {"hotelId": "PARAAA01", "name": "Alpha Hotel", "chainCode": None},
+        {"hotelId": "PARBBB02", "name": "Beta Hotel", "chainCode": "MC"},
+    ])
+    assert len(hotels) == 2
+    assert hotels.chains() == {"N/A": 1, "MC": 1}
+    items, _, total = hotels.page(limit=10, chains=["mc"])
+    assert total == 1 and items[0]["hotelId"] == "PARBBB02"
+
+
+def test_cursor_pages_without_duplicates():
+    hotels = HotelList.from_api(
+        [{"hotelId": f"H{i:02d}", "name": f"Hotel {i:02d}", "chainCode": "XX"} for i in range(5)]
+    )
+    first, cursor, total = hotels.page(limit=3)
+    second, end, _ = hotels.page(limit=3, cursor=cursor)
+    assert total == 5 and end is None
+    assert [h["hotelId"] for h in first + second] == [f"H{i:02d}" for i in range(5)]
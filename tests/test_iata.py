@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from iata import IataResolver
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def resolver():
+    return IataResolver(lookup_remote=lambda name: None, cache=None)
+
+
+def test_names_aliases_and_typos(resolver):
+    assert resolver.resolve_local("파리") == resolver.resolve_local("Paris") == "PAR"
+    assert resolver.resolve_local("Pariss") == "PAR"
+
+
+def test_uppercase_code_is_taken_as_is(resolver):
+    assert resolver.resolve_local("LON") == "LON"
+    assert resolver.resolve_local(" ICN ") == "ICN"
+
+
+def test_city_name_wins_over_lowercase_code(resolver):
+    assert resolver.resolve_local("lon") == "LYS"  # lyon
+    assert resolver.resolve_local("Del") == "DEL"   # 맞는 도시명이 없으면 코드
+
+
+def test_import_has_no_side_effects(tmp_path):
+    code = "import sys, iata; print('geocoder' in sys.modules)"
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    out = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "False"
+    assert list(tmp_path.iterdir()) == []
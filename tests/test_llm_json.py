@@ -0,0 +1,27 @@
+from llm_json import JsonArrayStream, parse_array, parse_object
+
+
+def test_brackets_inside_single_quoted_strings():
+    text = "결과: [{'name': 'A]B', 'country': '{프랑스}'}, {'name': 'C', 'country': 'D'}] 끝"
+    assert parse_array(text, {"name": str, "country": str}) == [
+        {"name": "A]B", "country": "{프랑스}"},
+        {"name": "C", "country": "D"},
+    ]
+
+
+def test_apostrophe_inside_double_quoted_string():
+    text = '```json\n{"description": "it\'s [great]", "n": 1}\n```'
+    assert parse_object(text) == {"description": "it's [great]", "n": 1}
+
+
+def test_truncated_array_keeps_complete_items():
+    assert parse_array('[{"day": 1}, {"day": 2}, {"da') == [{"day": 1}, {"day": 2}]
+
+
+def test_stream_yields_items_across_chunks():
+    stream = JsonArrayStream({"day": int})
+    items = []
+    for chunk in ['[{"day": 1, "note": "a}', "'b'\"}, {'day'", ": 2}]"]:
+        items.extend(stream.feed(chunk))
+    assert items == [{"day": 1, "note": "a}'b'"}, {"day": 2}]
+    assert stream.result is not None
@@ -0,0 +1,44 @@
+import metrics
+
+
+def lines(prefix):
+    return [line for line in metrics.render().splitlines() if prefix in line]
+
+
+def test_counter_and_escaped_labels():
+    counter = metrics.Counter("test_events_total", "테스트 이벤트", ("kind",))
+    counter.inc(kind='a"b')
+    counter.inc(2, kind='a"b')
+    assert lines("test_events_total") == [
+        "# HELP test_events_total 테스트 이벤트",
+        "# TYPE test_events_total counter",
+        'test_events_total{kind="a\\"b"} 3',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("test_seconds", "테스트 시간", buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value)
+    assert lines("test_seconds")[2:] == [
+        'test_seconds_bucket{le="0.1"} 2',
+        'test_seconds_bucket{le="1.0"} 3',
+        'test_seconds_bucket{le="+Inf"} 4',
+        "test_seconds_sum 3.65",
+        "test_seconds_count 4",
+    ]
+
+
+def test_collectors_merge_families_and_skip_failures():
+    metrics.register_collector(lambda: metrics.cache_families("a", {"ns": {"hits": 1, "misses": 2, "hit_ratio": 0.333}}))
+    metrics.register_collector(lambda: metrics.cache_families("b", {"ns": {"hits": 4, "_size": 1}, "_total": 5}))
+
+    @metrics.register_collector
+    def broken():
+        raise RuntimeError("수집 실패")
+
+    requests = lines("cache_requests_total")
+    assert requests.count("# TYPE cache_requests_total counter") == 1
+    assert 'cache_requests_total{cache="a",namespace="ns",result="misses"} 2' in requests
+    assert 'cache_requests_total{cache="b",namespace="ns",result="hits"} 4' in requests
+    assert 'cache_hit_ratio{cache="a",namespace="ns"} 0.333' in lines("cache_hit_ratio")
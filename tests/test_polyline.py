@@ -0,0 +1,33 @@
+import numpy as np
+
+from polyline import decode, encode, simplify, simplify_encoded
+
+# Google 폴리라인 문서의 예제
+POINTS = [[38.5, -120.2], [40.7, -120.95], [43.252, -126.453]]
+ENCODED = "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+
+
+def test_encode_and_decode_reference_example():
+    assert encode(POINTS) == ENCODED
+    np.testing.assert_allclose(decode(ENCODED), POINTS)
+
+
+def test_round_trip_with_precision_6():
+    coords = [[37.566535, 126.977969], [37.551169, 126.988227]]
+    np.testing.assert_allclose(decode(encode(coords, precision=6), precision=6), coords)
+
+
+def test_simplify_drops_collinear_points_and_keeps_corners():
+    line = [[0.0, x] for x in np.linspace(0, 1, 50)] + [[1.0, 1.0]]
+    simplified = simplify(line, tolerance=1e-6)
+    np.testing.assert_allclose(simplified, [[0.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+
+
+def test_simplify_encoded_keeps_endpoints():
+    coords = np.column_stack((np.linspace(37.0, 37.5, 500), 127.0 + 0.001 * np.sin(np.linspace(0, 20, 500))))
+    encoded, before, after = simplify_encoded(encode(coords), zoom=10)
+    decoded = decode(encoded)
+    assert before == 500 and after == len(decoded) < before
+    np.testing.assert_allclose(decoded[[0, -1]], coords[[0, -1]], atol=1e-5)
+    short = encode(POINTS[:2])
+    assert simplify_encoded(short) == (short, 2, 2)   # 점 2개 이하는 그대로
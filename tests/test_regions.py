@@ -0,0 +1,27 @@
+import gzip
+import json
+
+from regions import encoded_subtree
+
+
+def test_subtrees_and_missing_paths():
+    top = json.loads(encoded_subtree().identity)
+    assert "cities" not in top["아시아"]["한국"]
+    country = json.loads(encoded_subtree("아시아", "한국").identity)
+    assert country["cities"]
+    assert encoded_subtree("없는 대륙") is None
+    assert encoded_subtree("아시아", "없는 나라") is None
+
+
+def test_payload_is_encoded_once_per_path():
+    assert encoded_subtree("아시아") is encoded_subtree("아시아")
+
+
+def test_etag_differs_per_encoding_and_gzip_matches_identity():
+    payload = encoded_subtree("아시아")
+    identity, encoding, etag = payload.body_for(None)
+    gz, gz_encoding, gz_etag = payload.body_for("gzip, deflate")
+    assert encoding is None and gz_encoding == "gzip"
+    assert gz_etag != etag and gz_etag.startswith(etag)
+    assert gzip.decompress(gz) == identity
+    assert encoded_subtree("유럽").etag != etag
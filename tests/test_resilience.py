@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from resilience import CircuitBreaker, TokenBucket, UpstreamGuard, UpstreamUnavailable
+
+
+def test_token_bucket_spends_burst_then_queues():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve(max_wait=0) is None          # 기다릴 수 없으면 예약하지 않음
+    first = bucket.reserve(max_wait=1)
+    second = bucket.reserve(max_wait=1)
+    assert 0 < first <= 0.1 and second == pytest.approx(first + 0.1, abs=0.01)
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record(False)
+    assert breaker.state == "closed"
+    breaker.record(False)
+    assert breaker.state == "open" and not breaker.allow()
+    assert breaker.retry_after() > 0
+
+
+def test_half_open_allows_a_single_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record(False)
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()              # 시험 호출이 끝날 때까지 다른 호출은 막음
+    breaker.release()                        # 호출하지 않고 끝나면 기회를 돌려줌
+    assert breaker.allow()
+    breaker.record(False)                    # 시험 실패 → 다시 열림
+    assert breaker.state == "open"
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record(True)
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_guard_rejects_open_circuit_and_rate_limit():
+    guard = UpstreamGuard("test", rate=1, burst=1, max_wait=0)
+    assert guard.admit() == 0.0
+    with pytest.raises(UpstreamUnavailable) as rate_limited:
+        guard.admit()
+    assert rate_limited.value.reason == "rate_limited"
+
+    for _ in range(guard.breaker.failure_threshold):
+        guard.record(False)
+    with pytest.raises(UpstreamUnavailable) as circuit_open:
+        guard.admit()
+    assert circuit_open.value.reason == "circuit_open"
+    assert guard.stats()["short_circuited"] == 1
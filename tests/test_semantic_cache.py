@@ -0,0 +1,45 @@
+from semantic_cache import SemanticCache, scope_key, set_key
+
+
+def recommend_cache():
+    cache = SemanticCache(threshold=0.92, maxsize=16)
+    cache.set("recommend", {"theme": "휴양"}, ["베르겐"], scope_key("유럽", "북유럽", None))
+    return cache
+
+
+def test_same_scope_matches():
+    cache = recommend_cache()
+    assert cache.get("recommend", {"theme": "휴양"}, scope_key("유럽", "북유럽", None)) == ["베르겐"]
+
+
+def test_different_subregion_does_not_match():
+    cache = recommend_cache()
+    assert cache.get("recommend", {"theme": "휴양"}, scope_key("유럽", "남유럽", None)) is None
+
+
+def test_similar_subregion_names_do_not_match():
+    cache = SemanticCache(threshold=0.92, maxsize=16)
+    cache.set("recommend", {"theme": "휴양"}, ["하노이"], scope_key("아시아", "동남아시아", None))
+    assert cache.get("recommend", {"theme": "휴양"}, scope_key("아시아", "동아시아", None)) is None
+
+
+def test_scope_key_normalizes_place_names():
+    assert scope_key("유럽", None, "프랑스") == scope_key("유럽", None, "France")
+
+
+def plan_cache():
+    cache = SemanticCache(threshold=0.92, maxsize=16)
+    cache.set("plan_trip", {"places": ["파리", "로마", "바르셀로나"]}, [{"day": 1}], set_key(["파리", "로마", "바르셀로나"]))
+    return cache
+
+
+def test_same_places_in_other_order_and_spelling_match():
+    cache = plan_cache()
+    places = ["Rome", "Barcelona", "Paris"]
+    assert cache.get("plan_trip", {"places": places}, set_key(places)) == [{"day": 1}]
+
+
+def test_added_or_removed_place_does_not_match():
+    cache = plan_cache()
+    for places in (["파리", "로마"], ["파리", "로마", "바르셀로나", "베를린"]):
+        assert cache.get("plan_trip", {"places": places}, set_key(places)) is None
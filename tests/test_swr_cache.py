@@ -0,0 +1,62 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cache import StaleWhileRevalidateCache
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+def test_hit_stale_then_miss(executor):
+    cache = StaleWhileRevalidateCache(fresh_ttl=0.05, stale_ttl=0.3, executor=executor)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_load("k", loader)[::2] == (1, "miss")
+    assert cache.get_or_load("k", loader)[::2] == (1, "hit")
+    time.sleep(0.06)
+    assert cache.get_or_load("k", loader)[::2] == (1, "stale")  # 오래된 값을 바로 돌려줌
+    executor.shutdown(wait=True)
+    assert cache.get_or_load("k", loader)[::2] == (2, "hit")    # 백그라운드 갱신 결과
+    time.sleep(0.31)
+    assert cache.get_or_load("k", loader)[::2] == (3, "miss")
+    assert cache.stats()["size"] == 1
+
+
+def test_concurrent_stale_requests_refresh_once(executor):
+    cache = StaleWhileRevalidateCache(fresh_ttl=0.01, stale_ttl=10, executor=executor)
+    cache.get_or_load("k", lambda: "old")
+    time.sleep(0.02)
+    release = threading.Event()
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        release.wait(1)
+        return "new"
+
+    results = [cache.get_or_load("k", slow_loader) for _ in range(5)]
+    release.set()
+    executor.shutdown(wait=True)
+    assert {value for value, _, _ in results} == {"old"}
+    assert len(calls) == 1
+
+
+def test_failed_load_is_not_cached(executor):
+    cache = StaleWhileRevalidateCache(fresh_ttl=10, stale_ttl=20, executor=executor)
+
+    def failing():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("k", failing)
+    assert cache.get_or_load("k", lambda: "ok")[::2] == ("ok", "miss")
@@ -0,0 +1,100 @@
+# ==============================
+# 🔹 도시 설명/이미지 warm-up 작업
+# ==============================
+# countries.json의 모든 대륙/하위 지역/국가/도시를 돌면서
+# Gemini 설명과 Unsplash 이미지 URL을 만들어 city_info.jsonl에 저장합니다.
+# 이미 저장된 도시는 건너뛰므로 중간에 멈춰도 다시 실행하면 이어서 진행합니다.
+#
+# 실행 예:
+#   python warmup_city_info.py                  # 전체
+#   python warmup_city_info.py --continent 유럽 --concurrency 4
+#   python warmup_city_info.py --limit 20       # 20개만
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import app as core
+import resilience
+from city_store import CITY_STORE_PATH, CityInfoStore
+from countries import iter_cities
+
+# 배치 작업이라 Unsplash 속도 제한(초당 1.4회)에 걸리면 거절 대신 토큰이 생길 때까지 기다림
+IMAGE_MAX_WAIT = 120  # 초
+IMAGE_ATTEMPTS = 3
+IMAGE_RETRY_DELAY = 2  # 초
+
+
+def fetch_image(city, country):
+    """이미지 URL, IMAGE_ATTEMPTS번 모두 실패하면 placeholder (설명은 다시 만들지 않음)"""
+    image = core.PLACEHOLDER_IMAGE
+    for attempt in range(IMAGE_ATTEMPTS):
+        if attempt:
+            time.sleep(IMAGE_RETRY_DELAY * attempt)
+        image = core.fetch_unsplash_image(f"{city} {country}")
+        if image != core.PLACEHOLDER_IMAGE:
+            break
+    return image
+
+
+def build_city_info(city, country):
+    """(description, image) — 둘 중 하나라도 실패하면 None
+
+    동시에 처리 중인 도시들은 app.city_info_batcher가 Gemini 호출 하나로 묶는다.
+    """
+    description = core.city_description_future(city, country).result()
+    if not description:
+        return None
+    image = fetch_image(city, country)
+    if image == core.PLACEHOLDER_IMAGE:
+        return None
+    return description, image
+
+
+def main():
+    parser = argparse.ArgumentParser(description="도시 설명/이미지 미리 만들기")
+    parser.add_argument("--store", default=CITY_STORE_PATH, help="저장 파일 (JSON Lines)")
+    parser.add_argument("--concurrency", type=int, default=core.CITY_INFO_BATCH_SIZE,
+                        help="동시 요청 수 (Gemini 호출은 이만큼씩 묶임)")
+    parser.add_argument("--continent", help="이 대륙만 처리")
+    parser.add_argument("--limit", type=int, help="최대 처리 도시 수")
+    args = parser.parse_args()
+
+    resilience.guard("unsplash").max_wait = IMAGE_MAX_WAIT
+    store = CityInfoStore(args.store)
+    todo = []
+    for continent, _, country, city, _, _ in iter_cities():
+        if args.continent and continent != args.continent:
+            continue
+        if (city, country) in store:
+            continue
+        todo.append((city, country))
+    if args.limit:
+        todo = todo[:args.limit]
+
+    print(f"저장됨: {len(store)}개, 이번에 처리: {len(todo)}개")
+    started = time.time()
+    done = failed = 0
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = {executor.submit(build_city_info, city, country): (city, country)
+                   for city, country in todo}
+        for future in as_completed(futures):
+            city, country = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = None
+                print(f"❌ {country} / {city}: {e}")
+            if result is None:
+                failed += 1
+                continue
+            store.put(city, country, *result)
+            done += 1
+            print(f"✅ [{done + failed}/{len(todo)}] {country} / {city}")
+
+    print(f"완료: 성공 {done}개, 실패 {failed}개 ({time.time() - started:.1f}초)")
+
+
+if __name__ == "__main__":
+    main()